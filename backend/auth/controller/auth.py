@@ -6,6 +6,7 @@ from auth.dto.auth_dto import LoginRequest, LoginResponse
 from auth.application.auth_app_service import AuthAppService
 from framework.util.logger import setup_logger
 from framework.container.container import get_service
+from framework.concurrency.executor import run_sync
 from functools import partial
 from framework.model.common import BaseResponse
 from framework.router.router_decorator import router_controller
@@ -28,7 +29,7 @@ def auth_controller(router: APIRouter):
         auth_app_service: AuthAppService = Depends(partial(get_service, AuthAppService))
     ):
         logger.info(f"尝试登录用户: {user_data.username}")
-        token_response,is_need_select_word_bank = auth_app_service.authenticate_user(user_data)
+        token_response,is_need_select_word_bank = await run_sync(auth_app_service.authenticate_user, user_data)
         return BaseResponse(
             code=0,
             message="登录成功",
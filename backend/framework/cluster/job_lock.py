@@ -0,0 +1,56 @@
+"""
+集群定时任务锁，多个gunicorn worker（或多个容器）都启动了定时任务调度器时，
+保证同一个定时任务在同一个周期内只在一个进程中执行
+
+实现：
+1. Postgres advisory lock 保证同一时刻只有一个进程在执行该任务
+2. 拿到锁后在共享状态表中占用 "job:<任务名>:<周期>"，周期已被占用说明其他进程已经执行过，跳过
+"""
+import zlib
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Iterator, Optional
+from sqlalchemy import text
+from framework.cluster import shared_state
+from framework.database.db_factory import engine
+from framework.util.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# advisory lock 的键前缀，避免与其他用途（如数据库迁移）的锁冲突
+JOB_LOCK_NAMESPACE = "zcg:job:"
+
+
+def job_lock_key(job_name: str) -> int:
+    """
+    任务名对应的 advisory lock 键
+    """
+    return zlib.crc32(f"{JOB_LOCK_NAMESPACE}{job_name}".encode('utf-8'))
+
+
+@contextmanager
+def cluster_job_lock(job_name: str, period: Optional[str] = None, period_ttl: timedelta = timedelta(days=1)) -> Iterator[bool]:
+    """
+    获取集群任务锁，返回是否获取成功，获取失败时调用方应跳过本次执行
+
+    使用方式:
+    with cluster_job_lock("morale_computer", "2024-01-01 10:00") as acquired:
+        if acquired:
+            ...
+    """
+    key = job_lock_key(job_name)
+    with engine.connect() as connection:
+        connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+        acquired = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key}).scalar()
+        if not acquired:
+            logger.info(f"定时任务正在其他进程中执行，跳过: {job_name}")
+            yield False
+            return
+        try:
+            if period is not None and not shared_state.try_claim(f"job:{job_name}:{period}", ttl=period_ttl):
+                logger.info(f"定时任务本周期已在其他进程中执行，跳过: {job_name}, 周期: {period}")
+                yield False
+                return
+            yield True
+        finally:
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
@@ -0,0 +1,156 @@
+"""
+集群事件通知模块，基于 Postgres LISTEN/NOTIFY 在多个进程之间广播事件，
+用于失效各个进程内的缓存（单词卡片缓存、背单词调度器等）
+
+发布事件时，当前上下文中有数据库会话则在该会话的事务中发送（事务提交后才会投递），
+否则交给后台线程发送；每个进程启动一个监听线程，收到其他进程的事件后调用订阅的处理函数
+"""
+import json
+import os
+import queue
+import select
+import socket
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List
+from sqlalchemy import text
+from framework.config.config import settings
+from framework.database.db_factory import engine, get_db_session
+from framework.util.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 通知通道
+CHANNEL = "zcg_cluster_event"
+# NOTIFY 的消息体上限为8000字节，留出余量
+MAX_PAYLOAD_BYTES = 7000
+NOTIFY_SQL = text("SELECT pg_notify(:channel, :payload)")
+
+
+def node_id() -> str:
+    """
+    当前进程的标识（主机名+进程号），多个容器中的进程号可能相同
+    """
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class ClusterNotifier:
+    """
+    集群事件通知器
+    """
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Callable[[Dict[str, Any]], None]]] = defaultdict(list)
+        self._lock = threading.Lock()
+        self._listener_thread = None
+        self._sender_thread = None
+        self._send_queue: "queue.Queue[str]" = queue.Queue()
+        self._running = False
+
+    @property
+    def enabled(self) -> bool:
+        return settings.CLUSTER_NOTIFY_ENABLED
+
+    def subscribe(self, event: str, handler: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        订阅事件，处理函数的参数为发布时的数据
+        """
+        with self._lock:
+            self._handlers[event].append(handler)
+        self._start()
+
+    def publish(self, event: str, data: Dict[str, Any], transactional: bool = True) -> None:
+        """
+        发布事件，只投递给其他进程（本进程的缓存由调用方直接处理）
+        param transactional: 是否在当前会话的事务中发送，在事务提交后的回调中发布时需传False
+        """
+        if not self.enabled:
+            return
+        payload = json.dumps({"event": event, "node": node_id(), "data": data}, ensure_ascii=False, default=str)
+        if len(payload.encode('utf-8')) > MAX_PAYLOAD_BYTES:
+            logger.warning(f"集群事件消息过大，未发送: event={event}, 长度={len(payload)}")
+            return
+        session = get_db_session() if transactional else None
+        # 只读事务中不能执行NOTIFY
+        if session is not None and not session.info.get('read_only'):
+            session.execute(NOTIFY_SQL, {"channel": CHANNEL, "payload": payload})
+        else:
+            self._start()
+            self._send_queue.put(payload)
+
+    def _start(self) -> None:
+        """启动监听线程和发送线程"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            self._listener_thread = threading.Thread(target=self._listen_loop, name="cluster-notify-listener", daemon=True)
+            self._listener_thread.start()
+            self._sender_thread = threading.Thread(target=self._send_loop, name="cluster-notify-sender", daemon=True)
+            self._sender_thread.start()
+        logger.info(f"集群事件通知已启动: channel={CHANNEL}, node={node_id()}")
+
+    def _send_loop(self) -> None:
+        """后台发送没有数据库会话时发布的事件"""
+        while self._running:
+            payload = self._send_queue.get()
+            try:
+                with engine.begin() as connection:
+                    connection.execute(NOTIFY_SQL, {"channel": CHANNEL, "payload": payload})
+            except Exception as e:
+                logger.error(f"集群事件发送失败: {e}")
+
+    def _listen_loop(self) -> None:
+        """监听事件，连接断开时重连"""
+        while self._running:
+            connection = None
+            try:
+                # 监听连接独占，不放回连接池
+                connection = engine.raw_connection()
+                connection.detach()
+                driver_connection = connection.driver_connection
+                driver_connection.autocommit = True
+                driver_connection.cursor().execute(f"LISTEN {CHANNEL}")
+                while self._running:
+                    if select.select([driver_connection], [], [], 5) == ([], [], []):
+                        continue
+                    driver_connection.poll()
+                    while driver_connection.notifies:
+                        self._dispatch(driver_connection.notifies.pop(0).payload)
+            except Exception as e:
+                logger.error(f"集群事件监听异常，5秒后重连: {e}")
+                time.sleep(5)
+            finally:
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+
+    def _dispatch(self, payload: str) -> None:
+        """调用事件的处理函数，忽略本进程发布的事件"""
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning(f"无效的集群事件消息: {payload}")
+            return
+        if message.get("node") == node_id():
+            return
+        for handler in list(self._handlers.get(message.get("event"), [])):
+            try:
+                handler(message.get("data") or {})
+            except Exception as e:
+                logger.error(f"集群事件处理失败: event={message.get('event')}, 错误: {e}")
+
+
+_notifier = ClusterNotifier()
+
+
+def get_cluster_notifier() -> ClusterNotifier:
+    """
+    获取集群事件通知器
+    """
+    return _notifier
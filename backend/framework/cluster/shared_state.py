@@ -0,0 +1,97 @@
+"""
+多进程共享状态模块，状态保存在 zcg.t_shared_state 表中，多个gunicorn worker之间共享
+当前上下文中有数据库会话时在该会话的事务中执行（随事务一起提交或回滚），否则单独开启一个事务
+"""
+import json
+from datetime import timedelta
+from typing import Any, Optional
+from sqlalchemy import text
+from framework.database.db_factory import engine, get_db_session
+from framework.util.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+CLAIM_SQL = text("""
+INSERT INTO zcg.t_shared_state (state_key, state_value, expires_at)
+VALUES (:state_key, CAST(:state_value AS jsonb), now() + CAST(:ttl AS interval))
+ON CONFLICT (state_key) DO UPDATE
+SET state_value = EXCLUDED.state_value, expires_at = EXCLUDED.expires_at, updated_at = now()
+WHERE zcg.t_shared_state.expires_at IS NOT NULL AND zcg.t_shared_state.expires_at <= now()
+RETURNING state_key
+""")
+
+SET_SQL = text("""
+INSERT INTO zcg.t_shared_state (state_key, state_value, expires_at)
+VALUES (:state_key, CAST(:state_value AS jsonb), now() + CAST(:ttl AS interval))
+ON CONFLICT (state_key) DO UPDATE
+SET state_value = EXCLUDED.state_value, expires_at = EXCLUDED.expires_at, updated_at = now()
+""")
+
+GET_SQL = text("""
+SELECT state_value FROM zcg.t_shared_state
+WHERE state_key = :state_key AND (expires_at IS NULL OR expires_at > now())
+""")
+
+PURGE_SQL = text("DELETE FROM zcg.t_shared_state WHERE expires_at IS NOT NULL AND expires_at <= now()")
+
+
+def _ttl(ttl: Optional[timedelta]) -> Optional[str]:
+    return f"{int(ttl.total_seconds())} seconds" if ttl is not None else None
+
+
+def _execute(statement, params: dict = None, fetch: bool = False):
+    """
+    执行SQL，有上下文会话时使用上下文会话
+    """
+    session = get_db_session()
+    if session is not None:
+        result = session.execute(statement, params or {})
+        return result.first() if fetch else result.rowcount
+    with engine.begin() as connection:
+        result = connection.execute(statement, params or {})
+        return result.first() if fetch else result.rowcount
+
+
+def try_claim(state_key: str, ttl: Optional[timedelta] = None, value: Any = True) -> bool:
+    """
+    原子地占用一个状态键，键不存在或已过期时占用成功返回True，已被占用时返回False
+    用于保证多个进程中只有一个进程执行某个操作
+    """
+    row = _execute(CLAIM_SQL, {
+        "state_key": state_key,
+        "state_value": json.dumps(value, ensure_ascii=False),
+        "ttl": _ttl(ttl)
+    }, fetch=True)
+    return row is not None
+
+
+def set_state(state_key: str, value: Any, ttl: Optional[timedelta] = None) -> None:
+    """
+    写入状态
+    """
+    _execute(SET_SQL, {
+        "state_key": state_key,
+        "state_value": json.dumps(value, ensure_ascii=False),
+        "ttl": _ttl(ttl)
+    })
+
+
+def get_state(state_key: str, default: Any = None) -> Any:
+    """
+    读取状态，不存在或已过期时返回默认值
+    """
+    row = _execute(GET_SQL, {"state_key": state_key}, fetch=True)
+    if row is None or row.state_value is None:
+        return default
+    return row.state_value
+
+
+def purge_expired() -> int:
+    """
+    删除已过期的状态
+    return: 删除的记录数
+    """
+    count = _execute(PURGE_SQL)
+    if count:
+        logger.info(f"已删除过期的共享状态: {count}")
+    return count
@@ -0,0 +1,133 @@
+"""
+业务线程池模块，async路由中调用同步的service（SQLAlchemy查询、requests调用等）时，
+通过 run_sync 把调用派发到有界线程池执行，避免阻塞事件循环
+
+调用时复制当前的 contextvars 上下文，service 中的 @transactional/@readonly
+在线程中创建的数据库会话只存在于这个上下文副本中，不会泄漏到其他请求
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from framework.config.config import settings
+from framework.exception.custom_exception import BusinessException
+from framework.util.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class ServiceExecutor:
+    """
+    有界业务线程池，统计排队数、执行数、排队耗时等指标
+    """
+
+    def __init__(self, max_workers: int, max_queue_size: int):
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="service")
+        self._lock = threading.Lock()
+        # 已提交还未结束的调用数（排队中和执行中），调用结束或被取消时在future的回调中减少
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._max_queued = 0
+        self._total_wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        在线程池中执行同步函数并等待结果
+        排队数超过上限时拒绝执行，避免请求无限堆积
+        """
+        with self._lock:
+            queue_depth = self._queued - self._running
+            if self.max_queue_size > 0 and queue_depth >= self.max_queue_size:
+                self._rejected += 1
+                logger.warning(f"业务线程池排队数已达上限: {queue_depth}，拒绝执行: {getattr(func, '__qualname__', func)}")
+                raise BusinessException(detail="服务繁忙，请稍后再试", code=503)
+            self._queued += 1
+            self._max_queued = max(self._max_queued, queue_depth + 1)
+        context = contextvars.copy_context()
+        call = functools.partial(self._execute, context, time.time(), func, args, kwargs)
+        future = self._executor.submit(call)
+        # 等待的协程被取消时（如客户端断开）还未执行的调用也被取消，_execute不会执行，排队数在回调中减少
+        future.add_done_callback(self._on_done)
+        return await asyncio.wrap_future(future)
+
+    def _on_done(self, future) -> None:
+        with self._lock:
+            self._queued -= 1
+
+    def _execute(self, context: contextvars.Context, submitted_at: float, func: Callable, args: tuple, kwargs: dict) -> Any:
+        wait_seconds = time.time() - submitted_at
+        with self._lock:
+            self._running += 1
+            self._total_wait_seconds += wait_seconds
+            self._max_wait_seconds = max(self._max_wait_seconds, wait_seconds)
+        try:
+            result = context.run(func, *args, **kwargs)
+            with self._lock:
+                self._completed += 1
+            return result
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取线程池指标
+        """
+        with self._lock:
+            finished = self._completed + self._failed
+            return {
+                "max_workers": self.max_workers,
+                "max_queue_size": self.max_queue_size,
+                "queue_depth": self._queued - self._running,
+                "max_queue_depth": self._max_queued,
+                "running": self._running,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(self._total_wait_seconds / finished * 1000, 3) if finished else 0.0,
+                "max_wait_ms": round(self._max_wait_seconds * 1000, 3),
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+_service_executor: Optional[ServiceExecutor] = None
+_service_executor_lock = threading.Lock()
+
+
+def get_service_executor() -> ServiceExecutor:
+    """
+    获取业务线程池（首次使用时创建）
+    """
+    global _service_executor
+    if _service_executor is None:
+        with _service_executor_lock:
+            if _service_executor is None:
+                _service_executor = ServiceExecutor(settings.SERVICE_EXECUTOR_WORKERS, settings.SERVICE_EXECUTOR_MAX_QUEUE)
+                logger.info(f"业务线程池已创建: max_workers={settings.SERVICE_EXECUTOR_WORKERS}, "
+                            f"max_queue_size={settings.SERVICE_EXECUTOR_MAX_QUEUE}")
+    return _service_executor
+
+
+async def run_sync(func: Callable, *args, **kwargs) -> Any:
+    """
+    在业务线程池中执行同步函数，用于async路由中调用同步的service方法
+
+    使用方式:
+    data = await run_sync(study_app_service.get_word_task_info, user_id, word_bank_id, batch_id, flag)
+    """
+    return await get_service_executor().run(func, *args, **kwargs)
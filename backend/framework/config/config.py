@@ -63,6 +63,21 @@ class Settings(BaseSettings):
     DB_USER: str = Field(default="user")
     DB_PASSWORD: str = Field(default="password")
     SQL_ECHO: bool = Field(default=False, description="是否打印SQL语句")  # 临时改为True用于调试
+    DB_MIGRATION_MODE: str = Field(default="apply", description="启动时数据库迁移模式：apply 自动执行；check 只检查；off 不处理")
+    SERVICE_EXECUTOR_WORKERS: int = Field(default=20)  # 业务线程池线程数，不宜超过数据库连接池大小(pool_size + max_overflow)
+    SERVICE_EXECUTOR_MAX_QUEUE: int = Field(default=200)  # 业务线程池最大排队数，超过后拒绝请求，0表示不限制
+    ASYNC_DB_ENABLED: bool = Field(default=False)  # 背单词热点接口是否使用异步数据库（asyncpg）
+    ASYNC_DB_POOL_SIZE: int = Field(default=10)  # 异步数据库连接池大小
+    ASYNC_DB_MAX_OVERFLOW: int = Field(default=20)  # 异步数据库连接池最大溢出连接数
+    GUNICORN_WORKERS: int = Field(default=2)  # gunicorn worker数
+    CLUSTER_NOTIFY_ENABLED: bool = Field(default=True)  # 是否通过 LISTEN/NOTIFY 在多个进程之间同步失效进程内缓存
+    JOB_SCHEDULER_ENABLED: bool = Field(default=True)  # 是否在本进程启动定时任务调度器
+    JOB_SCHEDULER_WORKERS: int = Field(default=4)  # 定时任务执行线程数
+    EVENT_BUS_WORKERS: int = Field(default=4)  # 事件总线线程池大小（async和request_reply处理器）
+    EVENT_REPLY_TIMEOUT_SECONDS: float = Field(default=3.0)  # request_reply处理器默认的最长等待时间（秒）
+    EVENT_OUTBOX_ENABLED: bool = Field(default=False)  # 是否将durable的async事件写入发件箱，进程崩溃后重新投递（有durable处理器时才启动重新投递任务）
+    EVENT_OUTBOX_LEASE_SECONDS: int = Field(default=60)  # 发件箱事件的租期（秒），超过租期未处理完成时重新投递，也是失败重试的初始退避时间
+    EVENT_OUTBOX_MAX_ATTEMPTS: int = Field(default=5)  # 发件箱事件的最大处理次数，超过后标记为失败
 
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> str:
@@ -71,6 +86,13 @@ class Settings(BaseSettings):
             f"@{self.DB_HOST}:{self.DB_PORT}/{self.DB_DATABASE}"
         )
 
+    @property
+    def SQLALCHEMY_ASYNC_DATABASE_URI(self) -> str:
+        return (
+            f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASSWORD}"
+            f"@{self.DB_HOST}:{self.DB_PORT}/{self.DB_DATABASE}"
+        )
+
     # JWT配置
     JWT_SECRET_KEY: str = Field(default=secrets.token_urlsafe(32))
     JWT_ALGORITHM: str = Field(default="HS256")
@@ -85,7 +107,36 @@ class Settings(BaseSettings):
     DIFY_API_URL: str = Field(default="app-xxxxxxxx")  # dify api
     DIFY_API_KEY: Dict[str, str] = Field(default={"app-xxxxxxxx": "app-xxxxxxxx"})  # dify api key
     DIFY_USER: str = Field(default="user")  # dify user
+    DIFY_TIMEOUT_SECONDS: float = Field(default=60.0)  # dify 读取超时（秒）
+    DIFY_CONNECT_TIMEOUT_SECONDS: float = Field(default=5.0)  # dify 连接超时（秒）
+    DIFY_MAX_RETRIES: int = Field(default=2)  # dify 网络错误、超时、429/5xx时的重试次数
+    DIFY_RETRY_BACKOFF_SECONDS: float = Field(default=0.5)  # dify 重试的初始退避时间（秒），之后按指数增长
+    DIFY_MAX_CONCURRENCY: int = Field(default=10)  # dify 最大并发请求数（同时也是连接池大小）
     NLTK_DATA_DIR: str = Field(default="~/nltk_data")  # nltk data dir
+    WORD_FORMS_INDEX_PATH: str = Field(default="data/word_forms_index.pkl")  # 离线单词形式索引文件路径
+    WORD_CARD_CACHE_SIZE: int = Field(default=5000)  # 单词卡片缓存条数，0表示不缓存
+    WORD_INIT_PARSE_WORKERS: int = Field(default=4)  # 词典图片导入时并发上传、解析的线程数
+    WORD_INIT_WRITE_BATCH_FILES: int = Field(default=20)  # 词典图片导入时一次保存的最大图片数
+    WORD_INIT_CHECKPOINT_DIR: str = Field(default="data/word_init_checkpoint")  # 词典图片解析结果检查点目录
+    WORD_BANK_STAT_RECONCILE_MINUTES: int = Field(default=60)  # 用户词库单词状态统计校准间隔（分钟），超过60分钟时必须是60的整数倍，最多1天
+    STUDY_SCHEDULER_ENABLED: bool = Field(default=True)  # 是否使用进程内背单词调度器选词
+    STUDY_SCHEDULER_CACHE_SIZE: int = Field(default=1000)  # 背单词调度器缓存的用户词库数
+    STUDY_SCHEDULER_TTL_SECONDS: int = Field(default=600)  # 背单词调度器有效期（秒），过期后从数据库重建
+    STUDY_SCHEDULE_POLICY: str = Field(default="legacy")  # 间隔重复策略：legacy（不启用）、sm2、fsrs
+    STUDY_PREFETCH_ENABLED: bool = Field(default=True)  # 是否在后台预取接下来要背的单词
+    STUDY_PREFETCH_SIZE: int = Field(default=5)  # 每次预取的单词数
+    STUDY_PREFETCH_WORKERS: int = Field(default=2)  # 预取线程数
+    PHRASE_JUDGE_CACHE_SIZE: int = Field(default=10000)  # 短语判题结果进程内缓存条数，0表示不缓存
+    PHRASE_JUDGE_CACHE_TTL_HOURS: int = Field(default=720)  # 短语判题结果缓存有效期（小时）
+    PHRASE_JUDGE_CACHE_PERSIST: bool = Field(default=True)  # 是否将短语判题结果保存到数据库，多进程共享、重启后仍有效
+    INCENTIVE_DEFERRED_ENABLED: bool = Field(default=False)  # 答题接口是否延迟计算激励（返回激励票据，客户端凭票据查询激励结果）
+    INCENTIVE_COALESCE_MS: int = Field(default=500)  # 同一用户词库在该时间（毫秒）内的多次答对合并为一次激励计算
+    INCENTIVE_DEFERRED_WORKERS: int = Field(default=2)  # 延迟激励计算线程数
+    INCENTIVE_TICKET_CACHE_SIZE: int = Field(default=10000)  # 进程内缓存的激励结果条数
+    INCENTIVE_TICKET_TTL_SECONDS: int = Field(default=600)  # 激励结果保存时间（秒）
+    INCENTIVE_MAX_WAIT_SECONDS: float = Field(default=10.0)  # 查询激励结果时的最长等待时间（秒）
+    INCENTIVE_AWARD_STATE_CACHE_SIZE: int = Field(default=5000)  # 进程内缓存的用户词库奖品状态数，0表示不缓存
+    INCENTIVE_AWARD_STATE_TTL_SECONDS: int = Field(default=3600)  # 用户词库奖品状态缓存有效期（秒），过期后从数据库重新加载
     
     class Config:
         env_file = str(env_file) if env_file.exists() else None
@@ -0,0 +1,99 @@
+"""
+异步数据库装饰器模块，定义用于异步DB操作的装饰器，语义与 db_decorator 中的同步装饰器一致：
+外层创建会话并负责提交/回滚和关闭，嵌套调用复用上下文中的会话
+"""
+from functools import wraps
+from sqlalchemy import text
+from framework.database.async_db_factory import (
+    create_async_session,
+    get_async_db_session,
+    set_async_db_session,
+    is_outer_async_session,
+    clear_async_db_session
+)
+from framework.util.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+def async_transactional(func=None, *, auto_commit=True):
+    """
+    异步事务管理装饰器，用于需要写操作的异步方法
+
+    使用方式:
+    @async_transactional
+    async def submit_answer_async(...):
+        session = get_async_db_session()
+        await session.execute(...)
+    """
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            # 检查是否在只读事务中
+            current_session = get_async_db_session()
+            if current_session is not None and not is_outer_async_session():
+                logger.warning(f"Attempting to start a transaction inside a readonly context: {func.__name__}")
+                raise RuntimeError("Cannot start a transaction inside a readonly context")
+
+            session = current_session
+            is_outer = False
+
+            # 如果上下文中没有会话，创建新的
+            if session is None:
+                session = create_async_session()
+                is_outer = True
+                set_async_db_session(session, is_outer=True)
+
+            try:
+                result = await func(*args, **kwargs)
+                if is_outer and auto_commit:
+                    await session.commit()
+                    logger.debug(f"Async transaction committed for {func.__name__}")
+                return result
+            except Exception as e:
+                if is_outer and auto_commit:
+                    await session.rollback()
+                    logger.debug(f"Async transaction rolled back for {func.__name__} due to: {str(e)}")
+                raise e
+            finally:
+                # 只有外层装饰器才关闭会话
+                if is_outer:
+                    await session.close()
+                    clear_async_db_session()
+                    logger.debug(f"Async session closed for {func.__name__}")
+        return wrapper
+
+    # 支持@async_transactional和@async_transactional(auto_commit=False)两种用法
+    if func is None:
+        return decorator
+    return decorator(func)
+
+def async_readonly(func=None):
+    """
+    异步只读操作装饰器，用于不需要写操作的异步方法
+    """
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            session = get_async_db_session()
+            is_outer = False
+
+            # 如果上下文中没有会话，创建新的只读会话
+            if session is None:
+                session = create_async_session()
+                is_outer = True
+                set_async_db_session(session, is_outer=True)
+                session.info['read_only'] = True
+                await session.execute(text('SET TRANSACTION READ ONLY'))
+
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                if is_outer:
+                    await session.close()
+                    clear_async_db_session()
+                    logger.debug(f"Async readonly session closed for {func.__name__}")
+        return wrapper
+
+    if func is None:
+        return decorator
+    return decorator(func)
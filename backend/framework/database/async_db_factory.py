@@ -0,0 +1,110 @@
+"""
+异步数据库模块，提供基于 asyncpg 的异步引擎、会话工厂和会话上下文管理
+与 db_factory 中的同步引擎并存，只在 ASYNC_DB_ENABLED 开启时创建
+"""
+import json
+import threading
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from framework.config.config import settings
+from framework.database.db_factory import CustomJSONEncoder
+from framework.util.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+_engine_lock = threading.Lock()
+
+# 异步会话上下文管理，与同步会话使用不同的ContextVar，互不影响
+async_db_session_context: ContextVar[AsyncSession] = ContextVar('async_db_session', default=None)
+is_outer_async_session_context: ContextVar[bool] = ContextVar('is_outer_async_session', default=False)
+
+
+def get_async_engine() -> AsyncEngine:
+    """
+    获取异步数据库引擎（首次使用时创建）
+    """
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        with _engine_lock:
+            if _async_engine is None:
+                _async_engine = create_async_engine(
+                    settings.SQLALCHEMY_ASYNC_DATABASE_URI,
+                    echo=settings.SQL_ECHO,
+                    pool_size=settings.ASYNC_DB_POOL_SIZE,
+                    max_overflow=settings.ASYNC_DB_MAX_OVERFLOW,
+                    pool_timeout=30,
+                    pool_recycle=3600,
+                    pool_pre_ping=True,
+                    json_serializer=lambda obj: json.dumps(obj, ensure_ascii=False, cls=CustomJSONEncoder),
+                    json_deserializer=lambda obj: json.loads(obj)
+                )
+                _async_session_factory = async_sessionmaker(bind=_async_engine, autoflush=False, expire_on_commit=False)
+                logger.info(f"异步数据库引擎已创建: pool_size={settings.ASYNC_DB_POOL_SIZE}, "
+                            f"max_overflow={settings.ASYNC_DB_MAX_OVERFLOW}")
+    return _async_engine
+
+
+def create_async_session() -> AsyncSession:
+    """
+    创建异步数据库会话
+    """
+    get_async_engine()
+    return _async_session_factory()
+
+
+def get_async_db_session() -> AsyncSession:
+    """
+    从上下文中获取异步数据库会话
+    """
+    return async_db_session_context.get()
+
+
+def set_async_db_session(session: AsyncSession, is_outer: bool = False) -> None:
+    """
+    设置异步数据库会话到上下文中
+    """
+    async_db_session_context.set(session)
+    is_outer_async_session_context.set(is_outer)
+
+
+def is_outer_async_session() -> bool:
+    """
+    判断当前异步会话是否是外层装饰器创建的
+    """
+    return is_outer_async_session_context.get()
+
+
+def clear_async_db_session() -> None:
+    """
+    清除上下文中的异步数据库会话
+    """
+    async_db_session_context.set(None)
+    is_outer_async_session_context.set(False)
+
+
+def get_async_pool_status() -> dict:
+    """
+    获取异步连接池状态信息，引擎未创建时返回空字典
+    """
+    if _async_engine is None:
+        return {}
+    pool = _async_engine.pool
+    return {
+        "pool_size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow()
+    }
+
+
+async def dispose_async_engine() -> None:
+    """
+    关闭异步数据库引擎
+    """
+    global _async_engine
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
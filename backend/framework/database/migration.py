@@ -0,0 +1,321 @@
+"""
+数据库迁移模块，按版本号顺序执行 scripts/database/migrations 目录下的SQL迁移脚本
+
+迁移脚本命名规则: V<版本号>__<描述>.sql，如 V001__add_study_hot_path_indexes.sql
+已执行的迁移记录在 zcg.t_schema_migration 表中，并保存脚本的校验和，
+已执行的脚本被修改后启动时会报错，避免线上库与脚本不一致
+
+脚本第一行为 "-- migration: no-transaction" 时，脚本中的语句逐条在事务外执行，
+用于 CREATE INDEX CONCURRENTLY 等不能在事务中执行的语句
+CREATE INDEX CONCURRENTLY 失败时会留下无效(INVALID)的索引，IF NOT EXISTS 重新执行时会跳过该索引，
+因此执行前先删除同名的无效索引，执行后确认索引有效，无效时迁移失败，不再执行后面的语句（如删除被替代的旧索引）
+"""
+import hashlib
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from framework.config.config import settings
+from framework.util.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 迁移脚本目录
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                              "scripts", "database", "migrations")
+# 迁移脚本文件名格式
+MIGRATION_FILE_PATTERN = re.compile(r'^V(\d+)__(\w+)\.sql$')
+# 不在事务中执行的标记
+NO_TRANSACTION_DIRECTIVE = "-- migration: no-transaction"
+# 并发创建索引语句，分组为索引的模式（可选）和名称，索引与表在同一个模式中
+CONCURRENT_INDEX_PATTERN = re.compile(
+    r'^CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+(?:IF\s+NOT\s+EXISTS\s+)?("?\w+"?)\s+ON\s+(?:ONLY\s+)?(?:("?\w+"?)\.)?',
+    re.IGNORECASE)
+# 查询索引是否有效，索引不存在时没有结果
+INDEX_VALID_SQL = text("""
+SELECT i.indisvalid FROM pg_index i
+JOIN pg_class c ON c.oid = i.indexrelid
+JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE n.nspname = COALESCE(:schema, current_schema()) AND c.relname = :name
+""")
+# 迁移时使用的advisory lock，保证多个进程同时启动时只有一个进程执行迁移
+MIGRATION_LOCK_KEY = 20250101
+
+# 启动时迁移模式
+MIGRATION_MODE_APPLY = "apply"  # 自动执行未执行的迁移
+MIGRATION_MODE_CHECK = "check"  # 只检查，存在未执行的迁移时打印警告
+MIGRATION_MODE_OFF = "off"  # 不处理
+
+CREATE_MIGRATION_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS zcg.t_schema_migration (
+    version int4 NOT NULL,
+    description varchar(255) NOT NULL,
+    checksum varchar(64) NOT NULL,
+    execution_ms int4 NOT NULL,
+    applied_at timestamptz DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    CONSTRAINT t_schema_migration_pk PRIMARY KEY (version)
+)
+"""
+
+
+class MigrationError(Exception):
+    """数据库迁移异常"""
+    pass
+
+
+@dataclass
+class Migration:
+    """迁移脚本"""
+    version: int
+    description: str
+    path: str
+    sql: str
+
+    @property
+    def checksum(self) -> str:
+        return hashlib.sha256(self.sql.encode('utf-8')).hexdigest()
+
+    @property
+    def transactional(self) -> bool:
+        return not self.sql.lstrip().startswith(NO_TRANSACTION_DIRECTIVE)
+
+    @property
+    def statements(self) -> List[str]:
+        return split_sql_statements(self.sql)
+
+
+def split_sql_statements(sql: str) -> List[str]:
+    """
+    按分号拆分SQL语句，忽略字符串、注释和 $$ 包裹的函数体中的分号
+    """
+    statements = []
+    current = []
+    i = 0
+    length = len(sql)
+    while i < length:
+        ch = sql[i]
+        # 单行注释
+        if sql.startswith('--', i):
+            end = sql.find('\n', i)
+            end = length if end < 0 else end
+            i = end
+            continue
+        # 多行注释
+        if sql.startswith('/*', i):
+            end = sql.find('*/', i + 2)
+            end = length if end < 0 else end + 2
+            i = end
+            continue
+        # 字符串和带引号的标识符
+        if ch in ("'", '"'):
+            end = i + 1
+            while end < length:
+                if sql[end] == ch:
+                    if end + 1 < length and sql[end + 1] == ch:
+                        end += 2
+                        continue
+                    break
+                end += 1
+            current.append(sql[i:end + 1])
+            i = end + 1
+            continue
+        # $tag$ ... $tag$ 包裹的函数体
+        dollar = re.match(r'\$\w*\$', sql[i:]) if ch == '$' else None
+        if dollar:
+            tag = dollar.group()
+            end = sql.find(tag, i + len(tag))
+            end = length if end < 0 else end + len(tag)
+            current.append(sql[i:end])
+            i = end
+            continue
+        if ch == ';':
+            statement = ''.join(current).strip()
+            if statement:
+                statements.append(statement)
+            current = []
+        else:
+            current.append(ch)
+        i += 1
+    statement = ''.join(current).strip()
+    if statement:
+        statements.append(statement)
+    return statements
+
+
+class MigrationRunner:
+    """
+    数据库迁移执行器
+    """
+
+    def __init__(self, engine: Engine, migrations_dir: str = MIGRATIONS_DIR):
+        self.engine = engine
+        self.migrations_dir = migrations_dir
+
+    def load_migrations(self) -> List[Migration]:
+        """
+        加载迁移脚本，按版本号排序
+        """
+        migrations = []
+        if not os.path.isdir(self.migrations_dir):
+            logger.warning(f"迁移脚本目录不存在: {self.migrations_dir}")
+            return migrations
+        for file_name in os.listdir(self.migrations_dir):
+            match = MIGRATION_FILE_PATTERN.match(file_name)
+            if not match:
+                continue
+            path = os.path.join(self.migrations_dir, file_name)
+            with open(path, 'r', encoding='utf-8') as f:
+                sql = f.read()
+            migrations.append(Migration(int(match.group(1)), match.group(2), path, sql))
+        migrations.sort(key=lambda m: m.version)
+        versions = [m.version for m in migrations]
+        if len(versions) != len(set(versions)):
+            raise MigrationError(f"迁移脚本版本号重复: {versions}")
+        return migrations
+
+    def _applied_checksums(self, connection: Connection) -> Dict[int, str]:
+        """
+        查询已执行的迁移
+        """
+        rows = connection.execute(text("SELECT version, checksum FROM zcg.t_schema_migration")).all()
+        return {row.version: row.checksum for row in rows}
+
+    def _pending_migrations(self, connection: Connection) -> List[Migration]:
+        """
+        校验已执行的迁移，返回未执行的迁移
+        """
+        applied = self._applied_checksums(connection)
+        pending = []
+        for migration in self.load_migrations():
+            checksum = applied.get(migration.version)
+            if checksum is None:
+                pending.append(migration)
+            elif checksum != migration.checksum:
+                raise MigrationError(f"迁移脚本在执行后被修改: {os.path.basename(migration.path)}")
+        return pending
+
+    def check(self) -> List[Migration]:
+        """
+        检查迁移状态，返回未执行的迁移
+        """
+        with self.engine.begin() as connection:
+            connection.execute(text(CREATE_MIGRATION_TABLE_SQL))
+            return self._pending_migrations(connection)
+
+    def apply(self) -> List[Migration]:
+        """
+        执行所有未执行的迁移，返回本次执行的迁移
+        """
+        with self.engine.connect() as connection:
+            connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+            connection.execute(text(CREATE_MIGRATION_TABLE_SQL))
+            connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            try:
+                # 拿到锁后再查询，其他进程可能已经执行完了迁移
+                pending = self._pending_migrations(connection)
+                for migration in pending:
+                    self._apply_one(connection, migration)
+                return pending
+            finally:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+
+    def _apply_one(self, connection: Connection, migration: Migration) -> None:
+        """
+        执行单个迁移
+        """
+        logger.info(f"开始执行数据库迁移: V{migration.version:03d} {migration.description}")
+        start = time.time()
+        statements = migration.statements
+        try:
+            if migration.transactional:
+                connection.exec_driver_sql("BEGIN")
+                try:
+                    for statement in statements:
+                        connection.exec_driver_sql(statement)
+                    self._record(connection, migration, start)
+                    connection.exec_driver_sql("COMMIT")
+                except Exception:
+                    connection.exec_driver_sql("ROLLBACK")
+                    raise
+            else:
+                for statement in statements:
+                    self._execute_no_transaction(connection, statement)
+                self._record(connection, migration, start)
+        except Exception as e:
+            raise MigrationError(f"数据库迁移执行失败: V{migration.version:03d} {migration.description}, 错误: {e}") from e
+        logger.info(f"数据库迁移执行完成: V{migration.version:03d} {migration.description}, 耗时: {time.time() - start:.3f}秒")
+
+    def _execute_no_transaction(self, connection: Connection, statement: str) -> None:
+        """
+        在事务外执行一条语句，并发创建索引时先删除上次失败留下的无效索引，创建后确认索引有效
+        """
+        match = CONCURRENT_INDEX_PATTERN.match(statement)
+        if match is None:
+            connection.exec_driver_sql(statement)
+            return
+        name, schema = (self._identifier(group) for group in match.groups())
+        qualified_name = f'"{schema}"."{name}"' if schema else f'"{name}"'
+        if self._index_valid(connection, schema, name) is False:
+            logger.warning(f"删除上次创建失败的无效索引: {qualified_name}")
+            connection.exec_driver_sql(f"DROP INDEX CONCURRENTLY IF EXISTS {qualified_name}")
+        connection.exec_driver_sql(statement)
+        if self._index_valid(connection, schema, name) is not True:
+            raise MigrationError(f"并发创建的索引无效: {qualified_name}")
+
+    def _index_valid(self, connection: Connection, schema: Optional[str], name: str) -> Optional[bool]:
+        """
+        查询索引是否有效，索引不存在时返回None
+        """
+        return connection.execute(INDEX_VALID_SQL, {"schema": schema, "name": name}).scalar()
+
+    @staticmethod
+    def _identifier(identifier: Optional[str]) -> Optional[str]:
+        """去掉标识符的引号，不带引号的标识符转为小写"""
+        if identifier is None:
+            return None
+        if identifier.startswith('"'):
+            return identifier.strip('"')
+        return identifier.lower()
+
+    def _record(self, connection: Connection, migration: Migration, start: float) -> None:
+        """
+        记录已执行的迁移
+        """
+        connection.execute(
+            text("INSERT INTO zcg.t_schema_migration (version, description, checksum, execution_ms) "
+                 "VALUES (:version, :description, :checksum, :execution_ms)"),
+            {
+                "version": migration.version,
+                "description": migration.description,
+                "checksum": migration.checksum,
+                "execution_ms": int((time.time() - start) * 1000)
+            }
+        )
+
+
+def run_migrations(mode: Optional[str] = None) -> None:
+    """
+    应用启动时执行或检查数据库迁移
+    """
+    from framework.database.db_factory import engine
+
+    mode = mode or settings.DB_MIGRATION_MODE
+    if mode == MIGRATION_MODE_OFF:
+        logger.info("数据库迁移已关闭")
+        return
+
+    runner = MigrationRunner(engine)
+    if mode == MIGRATION_MODE_APPLY:
+        applied = runner.apply()
+        logger.info(f"数据库迁移检查完成，本次执行迁移数: {len(applied)}")
+    elif mode == MIGRATION_MODE_CHECK:
+        pending = runner.check()
+        if pending:
+            logger.warning(f"存在未执行的数据库迁移: {[os.path.basename(m.path) for m in pending]}")
+        else:
+            logger.info("数据库迁移检查完成，没有未执行的迁移")
+    else:
+        raise MigrationError(f"无效的数据库迁移模式: {mode}")
@@ -1,66 +1,162 @@
 """
 事件总线模块，用于解耦模块间的直接依赖
+
+事件处理器通过 @event_handler 声明派发方式：
+1. sync（默认）：在触发事件的线程中同步执行，与触发方在同一个事务中
+2. async：触发方的事务提交后在事件线程池中执行，触发方不等待；durable=True且开启EVENT_OUTBOX_ENABLED时事件先写入发件箱，
+   进程崩溃后由定时任务重新投递（至少投递一次，处理器需要保证幂等），有durable处理器通过connect注册时才启动重新投递任务
+3. request_reply：在事件线程池中执行，触发方最多等待timeout秒，超时后该处理器的结果按None处理，处理器继续执行；
+   触发方在写事务中时按sync方式执行（事件线程池中的会话看不到未提交的数据，也不会随触发方的事务回滚）
 """
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from blinker import signal
-from typing import Any, Dict, List
+from sqlalchemy import event
+from framework.config.config import settings
+from framework.database.db_factory import get_db_session
+from framework.events import outbox
+from framework.scheduler.job_scheduler import get_job_scheduler
 from framework.util.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+
+class DispatchMode:
+    """事件派发方式"""
+    SYNC = "sync"
+    ASYNC = "async"
+    REQUEST_REPLY = "request_reply"
+
+
+def event_handler(mode: str = DispatchMode.SYNC, timeout: float = None, durable: bool = False):
+    """
+    声明事件处理器的派发方式
+
+    使用方式:
+    @event_handler(mode=DispatchMode.ASYNC, durable=True)
+    def handle_word_bank_switched(self, sender, **kwargs):
+        ...
+    param timeout: request_reply方式触发方的最长等待时间（秒），默认为EVENT_REPLY_TIMEOUT_SECONDS
+    param durable: async方式是否写入发件箱，保证进程崩溃后仍会被处理
+    """
+    def decorator(func):
+        func.event_dispatch_mode = mode
+        func.event_timeout = timeout
+        func.event_durable = durable
+        return func
+    return decorator
+
+
+def handler_name(handler: Callable) -> str:
+    """处理器名称：模块.类.方法"""
+    return f"{handler.__module__}.{handler.__qualname__}"
+
+
+@dataclass
+class HandlerMetrics:
+    """事件处理器执行指标（本进程）"""
+    mode: str = DispatchMode.SYNC
+    calls: int = 0
+    failures: int = 0
+    timeouts: int = 0  # request_reply方式触发方等待超时的次数
+    redeliveries: int = 0  # 从发件箱重新投递的次数
+    last_duration_ms: Optional[int] = None
+    max_duration_ms: int = 0
+    total_duration_ms: int = 0
+    total_queue_ms: int = 0  # 在事件线程池中排队等待的总时间
+    last_error: Optional[str] = None
+
+
 class EventBus:
     """事件总线单例类"""
     _instance = None
-    
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
-    
+
     def __init__(self):
         if hasattr(self, '_initialized'):
             return
-        
+
         # 定义事件信号
         self.study_completed_signal = signal('study_completed')
         self.word_bank_switched_signal = signal('word_bank_switched')
-        
+        self.words_saved_signal = signal('words_saved')
+        self._signals = {s.name: s for s in (self.study_completed_signal, self.word_bank_switched_signal, self.words_saved_signal)}
+
+        self._executor = ThreadPoolExecutor(max_workers=settings.EVENT_BUS_WORKERS, thread_name_prefix="event")
+        self._metrics: Dict[str, HandlerMetrics] = {}
+        self._metrics_lock = threading.Lock()
+        self._redeliver_registered = False
+
         self._initialized = True
         logger.info("事件总线已初始化")
-    
-    def trigger_study_completed(self, user_id: int, word_bank_id: int, memorized_ratio: float, slained_ratio: float, study_result: int) -> List[Any]:
+
+    def connect(self, event_signal, handler: Callable) -> None:
+        """
+        注册事件处理器，第一个durable的async处理器注册时启动发件箱重新投递任务
+
+        使用方式:
+        get_event_bus().connect(get_event_bus().word_bank_switched_signal, self.handle_word_bank_switched)
+        """
+        event_signal.connect(handler)
+        if (getattr(handler, "event_dispatch_mode", DispatchMode.SYNC) == DispatchMode.ASYNC
+                and getattr(handler, "event_durable", False) and settings.EVENT_OUTBOX_ENABLED):
+            self._register_redeliver()
+
+    def _register_redeliver(self) -> None:
+        with self._metrics_lock:
+            if self._redeliver_registered:
+                return
+            self._redeliver_registered = True
+        # 每分钟重新投递发件箱中到期未处理的事件
+        get_job_scheduler().register("event_outbox_redeliver", "* * * * *", self.redeliver, catch_up=False)
+
+    def trigger_study_completed(self, user_id: int, word_bank_id: int, memorized_ratio: float, slained_ratio: float, study_result: int,
+                                incentive_ticket: str = None) -> List[Any]:
         """
         触发学习完成事件，返回激励结果
+        param incentive_ticket: 激励票据，不为空时激励延迟计算，不返回奖品
         """
         try:
             # 发送事件并获取所有handler的返回值
-            results = self.study_completed_signal.send(
+            results = self.dispatch(
+                self.study_completed_signal,
                 'study_app_service',
                 user_id=user_id,
                 word_bank_id=word_bank_id,
                 memorized_ratio=memorized_ratio,
                 slained_ratio=slained_ratio,
-                study_result=study_result
+                study_result=study_result,
+                incentive_ticket=incentive_ticket
             )
-            
+
             # 收集所有handler的返回值
             award_lists = []
             for handler, result in results:
                 if result:
                     award_lists.extend(result)
-            
+
             logger.info(f"学习完成事件触发成功: user_id={user_id}, word_bank_id={word_bank_id}, 获得奖品数量={len(award_lists)}")
             return award_lists
-            
+
         except Exception as e:
             logger.error(f"触发学习完成事件失败: {e}")
             return []
-    
+
     def trigger_word_bank_switched(self, user_id: int, word_bank_id: int):
         """
         触发词库切换事件
         """
         try:
-            self.word_bank_switched_signal.send(
+            self.dispatch(
+                self.word_bank_switched_signal,
                 'study_app_service',
                 user_id=user_id,
                 word_bank_id=word_bank_id
@@ -69,9 +165,180 @@ class EventBus:
         except Exception as e:
             logger.error(f"触发词库切换事件失败: {e}")
 
+    def trigger_words_saved(self, word_bank_id: int, words: List[str]):
+        """
+        触发单词保存事件（新增或更新词库中的单词后），用于让依赖单词内容的缓存失效
+        """
+        try:
+            self.dispatch(
+                self.words_saved_signal,
+                'word_service',
+                word_bank_id=word_bank_id,
+                words=words
+            )
+            logger.info(f"单词保存事件触发成功: word_bank_id={word_bank_id}, 单词数量={len(words)}")
+        except Exception as e:
+            logger.error(f"触发单词保存事件失败: {e}")
+
+    def dispatch(self, event_signal, sender: str, **kwargs) -> List[Tuple[Callable, Any]]:
+        """
+        按各处理器声明的派发方式派发事件
+        return: sync和request_reply处理器的(处理器, 返回值)列表，async处理器不返回结果
+        sync处理器抛出的异常会传给触发方，与blinker的send一致
+        """
+        results = []
+        replies = []
+        for handler in event_signal.receivers_for(sender):
+            mode = getattr(handler, "event_dispatch_mode", DispatchMode.SYNC)
+            if mode == DispatchMode.ASYNC:
+                self._dispatch_async(event_signal.name, handler, sender, kwargs)
+            elif mode == DispatchMode.REQUEST_REPLY and not self._in_transaction():
+                replies.append((handler, self._submit(handler, sender, kwargs)))
+            else:
+                results.append((handler, self._call(handler, sender, kwargs, raise_error=True)))
+        for handler, future in replies:
+            results.append((handler, self._wait_reply(handler, future)))
+        return results
+
+    def redeliver(self) -> int:
+        """
+        重新投递发件箱中到期未处理的事件（进程崩溃时未处理的事件、处理失败等待重试的事件）
+        return: 重新投递的事件数
+        """
+        count = 0
+        while True:
+            rows = outbox.claim_due(limit=100, lease_seconds=settings.EVENT_OUTBOX_LEASE_SECONDS)
+            for row in rows:
+                handler = self._find_handler(row["event_name"], row["handler"], row["payload"].get("sender"))
+                if handler is None:
+                    outbox.fail(row["id"], f"事件处理器不存在: {row['handler']}", settings.EVENT_OUTBOX_MAX_ATTEMPTS,
+                                settings.EVENT_OUTBOX_LEASE_SECONDS)
+                    continue
+                with self._metrics_lock:
+                    self._metrics_for(handler).redeliveries += 1
+                self._deliver(row["id"], handler, row["payload"].get("sender"), row["payload"].get("kwargs") or {})
+                count += 1
+            if len(rows) < 100:
+                return count
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        获取各事件处理器的执行指标
+        """
+        with self._metrics_lock:
+            return {name: dict(asdict(metrics),
+                               avg_duration_ms=round(metrics.total_duration_ms / metrics.calls, 1) if metrics.calls else 0.0)
+                    for name, metrics in self._metrics.items()}
+
+    def _in_transaction(self) -> bool:
+        """当前上下文中是否有写事务"""
+        session = get_db_session()
+        return session is not None and not session.info.get('read_only')
+
+    def _dispatch_async(self, event_name: str, handler: Callable, sender: str, kwargs: Dict[str, Any]) -> None:
+        """
+        async方式：写入发件箱（durable），事务提交后提交到事件线程池，事务回滚时不投递
+        """
+        event_id = None
+        if getattr(handler, "event_durable", False) and settings.EVENT_OUTBOX_ENABLED:
+            event_id = outbox.add(event_name, handler_name(handler), {"sender": sender, "kwargs": kwargs},
+                                  lease_seconds=settings.EVENT_OUTBOX_LEASE_SECONDS)
+        submit = lambda *args: self._executor.submit(self._deliver, event_id, handler, sender, kwargs, time.time())
+        # 只读事务不会提交，直接投递
+        if self._in_transaction():
+            event.listen(get_db_session(), "after_commit", submit, once=True)
+        else:
+            submit()
+
+    def _deliver(self, event_id: Optional[int], handler: Callable, sender: str, kwargs: Dict[str, Any],
+                 queued_at: float = None) -> None:
+        """
+        执行async处理器，有发件箱事件时处理成功后删除事件，失败时等待重试
+        """
+        try:
+            self._call(handler, sender, kwargs, raise_error=True, queued_at=queued_at)
+        except Exception as e:
+            if event_id is not None:
+                self._ignore_error(outbox.fail, event_id, f"{e}\n{traceback.format_exc()}",
+                                   settings.EVENT_OUTBOX_MAX_ATTEMPTS, settings.EVENT_OUTBOX_LEASE_SECONDS)
+            return
+        if event_id is not None:
+            self._ignore_error(outbox.complete, event_id)
+
+    def _submit(self, handler: Callable, sender: str, kwargs: Dict[str, Any]):
+        queued_at = time.time()
+        return self._executor.submit(self._call, handler, sender, kwargs, True, queued_at)
+
+    def _wait_reply(self, handler: Callable, future) -> Any:
+        """
+        request_reply方式：等待处理器的返回值，超时后返回None，处理器继续执行
+        """
+        timeout = getattr(handler, "event_timeout", None) or settings.EVENT_REPLY_TIMEOUT_SECONDS
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            with self._metrics_lock:
+                self._metrics_for(handler).timeouts += 1
+            logger.warning(f"事件处理器超时，不再等待结果: {handler_name(handler)}, 超时时间: {timeout}秒")
+            return None
+        except Exception:
+            # 处理器的异常已在执行时记录
+            return None
+
+    def _call(self, handler: Callable, sender: str, kwargs: Dict[str, Any], raise_error: bool = False,
+              queued_at: float = None) -> Any:
+        """
+        执行处理器并记录指标
+        """
+        start = time.time()
+        error = None
+        try:
+            return handler(sender, **kwargs)
+        except Exception as e:
+            error = e
+            logger.error(f"事件处理器执行失败: {handler_name(handler)}, 错误: {e}")
+            if raise_error:
+                raise
+        finally:
+            duration_ms = int((time.time() - start) * 1000)
+            with self._metrics_lock:
+                metrics = self._metrics_for(handler)
+                metrics.calls += 1
+                metrics.failures += 1 if error is not None else 0
+                metrics.last_duration_ms = duration_ms
+                metrics.max_duration_ms = max(metrics.max_duration_ms, duration_ms)
+                metrics.total_duration_ms += duration_ms
+                metrics.total_queue_ms += int((start - queued_at) * 1000) if queued_at else 0
+                if error is not None:
+                    metrics.last_error = str(error)
+
+    def _metrics_for(self, handler: Callable) -> HandlerMetrics:
+        name = handler_name(handler)
+        metrics = self._metrics.get(name)
+        if metrics is None:
+            metrics = HandlerMetrics(mode=getattr(handler, "event_dispatch_mode", DispatchMode.SYNC))
+            self._metrics[name] = metrics
+        return metrics
+
+    def _find_handler(self, event_name: str, name: str, sender: str) -> Optional[Callable]:
+        event_signal = self._signals.get(event_name)
+        if event_signal is None:
+            return None
+        for handler in event_signal.receivers_for(sender):
+            if handler_name(handler) == name:
+                return handler
+        return None
+
+    def _ignore_error(self, func: Callable, *args) -> None:
+        """更新发件箱失败时只记录日志，事件在租期过后由定时任务重新投递"""
+        try:
+            func(*args)
+        except Exception as e:
+            logger.error(f"更新事件发件箱失败: {e}")
+
 # 全局事件总线实例
 event_bus = EventBus()
 
 def get_event_bus() -> EventBus:
     """获取事件总线实例"""
-    return event_bus 
\ No newline at end of file
+    return event_bus
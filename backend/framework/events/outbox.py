@@ -0,0 +1,103 @@
+"""
+事件发件箱模块，异步事件保存在 zcg.t_event_outbox 表中，进程崩溃后由定时任务重新投递
+
+事件在触发事件的事务中写入发件箱（与业务数据一起提交或回滚），事务提交后投递给处理器，
+处理成功后删除，处理失败时按退避时间重试，超过最大次数后标记为失败，保留在表中供排查
+"""
+import json
+from typing import Any, Dict, List
+from sqlalchemy import text
+from framework.database.db_factory import engine, get_db_session
+from framework.util.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 事件状态
+STATUS_PENDING = "pending"
+STATUS_FAILED = "failed"
+
+ADD_SQL = text("""
+INSERT INTO zcg.t_event_outbox (event_name, handler, payload, next_attempt_at)
+VALUES (:event_name, :handler, CAST(:payload AS jsonb), now() + CAST(:lease AS interval))
+RETURNING id
+""")
+
+COMPLETE_SQL = text("DELETE FROM zcg.t_event_outbox WHERE id = :id")
+
+FAIL_SQL = text("""
+UPDATE zcg.t_event_outbox
+SET attempts = attempts + 1,
+    last_error = :error,
+    status = CASE WHEN attempts + 1 >= :max_attempts THEN 'failed' ELSE status END,
+    next_attempt_at = now() + CAST(:backoff AS interval) * power(2, attempts),
+    updated_at = now()
+WHERE id = :id
+""")
+
+# 认领到期的事件，并将下次投递时间推后一个租期，避免其他进程重复认领
+CLAIM_SQL = text("""
+UPDATE zcg.t_event_outbox o
+SET next_attempt_at = now() + CAST(:lease AS interval), updated_at = now()
+FROM (
+    SELECT id FROM zcg.t_event_outbox
+    WHERE status = 'pending' AND next_attempt_at <= now()
+    ORDER BY id
+    LIMIT :limit
+    FOR UPDATE SKIP LOCKED
+) due
+WHERE o.id = due.id
+RETURNING o.id, o.event_name, o.handler, o.payload, o.attempts
+""")
+
+
+def _seconds(seconds: float) -> str:
+    return f"{int(seconds)} seconds"
+
+
+def add(event_name: str, handler: str, payload: Dict[str, Any], lease_seconds: float) -> int:
+    """
+    写入事件，当前上下文中有数据库会话时在该会话的事务中写入，否则单独开启一个事务
+    事件在租期内由本进程投递，租期过后仍未处理完成时由定时任务重新投递
+    return: 事件ID
+    """
+    params = {
+        "event_name": event_name,
+        "handler": handler,
+        "payload": json.dumps(payload, ensure_ascii=False, default=str),
+        "lease": _seconds(lease_seconds)
+    }
+    session = get_db_session()
+    if session is not None and not session.info.get('read_only'):
+        return session.execute(ADD_SQL, params).scalar()
+    with engine.begin() as connection:
+        return connection.execute(ADD_SQL, params).scalar()
+
+
+def complete(event_id: int) -> None:
+    """
+    事件处理成功，删除事件
+    """
+    with engine.begin() as connection:
+        connection.execute(COMPLETE_SQL, {"id": event_id})
+
+
+def fail(event_id: int, error: str, max_attempts: int, backoff_seconds: float) -> None:
+    """
+    事件处理失败，记录错误并按指数退避设置下次投递时间，超过最大次数后标记为失败
+    """
+    with engine.begin() as connection:
+        connection.execute(FAIL_SQL, {
+            "id": event_id,
+            "error": error[:2000],
+            "max_attempts": max_attempts,
+            "backoff": _seconds(backoff_seconds)
+        })
+
+
+def claim_due(limit: int, lease_seconds: float) -> List[Dict[str, Any]]:
+    """
+    认领到期未处理的事件（进程崩溃或处理失败后等待重试的事件）
+    """
+    with engine.begin() as connection:
+        rows = connection.execute(CLAIM_SQL, {"limit": limit, "lease": _seconds(lease_seconds)}).mappings().all()
+    return [dict(row) for row in rows]
@@ -0,0 +1,38 @@
+"""
+进程内缓存指标注册，业务模块的缓存在创建时注册统计函数，健康检查接口统一返回各缓存的指标
+"""
+import threading
+from typing import Any, Callable, Dict
+from framework.util.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+_stats_providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+_lock = threading.Lock()
+
+
+def register_cache_stats(name: str, provider: Callable[[], Dict[str, Any]]) -> None:
+    """
+    注册缓存的统计函数
+
+    使用方式:
+    register_cache_stats("phrase_judge", self.stats)
+    """
+    with _lock:
+        _stats_providers[name] = provider
+
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    获取所有已注册缓存的指标，单个缓存统计失败时返回错误信息
+    """
+    with _lock:
+        providers = dict(_stats_providers)
+    result = {}
+    for name, provider in providers.items():
+        try:
+            result[name] = provider()
+        except Exception as e:
+            logger.warning(f"获取缓存指标失败: {name}, 错误: {e}")
+            result[name] = {"error": str(e)}
+    return result
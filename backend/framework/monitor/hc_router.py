@@ -8,6 +8,10 @@ from framework.router.router_decorator import router_controller
 from pydantic import BaseModel, Field
 from framework.model.common import BaseResponse
 from framework.database.db_factory import check_db_connection, get_pool_status
+from framework.concurrency.executor import get_service_executor, run_sync
+from framework.events.event_bus import get_event_bus
+from framework.monitor.cache_stats import get_cache_stats
+from framework.scheduler.job_scheduler import get_job_scheduler
 from framework.util.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -98,7 +102,7 @@ def hc_controller(router: APIRouter):
             BaseResponse[HealthResponse]: 包含状态、版本和数据库信息的响应
         """
         # 检查数据库连接
-        db_connected = check_db_connection()
+        db_connected = await run_sync(check_db_connection)
         pool_status = get_pool_status()
         
         # 记录连接池状态
@@ -154,7 +158,7 @@ def hc_controller(router: APIRouter):
             BaseResponse[DatabaseStatusResponse]: 包含数据库状态信息的响应
         """
         # 检查数据库连接
-        db_connected = check_db_connection()
+        db_connected = await run_sync(check_db_connection)
         pool_status = get_pool_status()
         
         # 记录详细信息
@@ -170,5 +174,86 @@ def hc_controller(router: APIRouter):
                 connection_test=db_connected
             )
         )
+
+
+    @router.get(
+        "/executor",
+        response_model=BaseResponse[Dict[str, Any]],
+        summary="业务线程池状态检查",
+        description="返回业务线程池的线程数、排队数、执行数和排队耗时等指标",
+        status_code=status.HTTP_200_OK
+    )
+    async def executor_status():
+        """
+        业务线程池状态检查端点
+
+        返回:
+            BaseResponse[Dict[str, Any]]: 业务线程池指标
+        """
+        return BaseResponse(
+            code=0,
+            message="success",
+            data=get_service_executor().stats()
+        )
+
+    @router.get(
+        "/jobs",
+        response_model=BaseResponse[Dict[str, Any]],
+        summary="定时任务状态检查",
+        description="返回各定时任务的下次执行时间、执行次数、耗时和处理行数等指标",
+        status_code=status.HTTP_200_OK
+    )
+    async def job_status():
+        """
+        定时任务状态检查端点
+
+        返回:
+            BaseResponse[Dict[str, Any]]: 各定时任务的执行指标
+        """
+        return BaseResponse(
+            code=0,
+            message="success",
+            data=get_job_scheduler().stats()
+        )
+
+    @router.get(
+        "/events",
+        response_model=BaseResponse[Dict[str, Any]],
+        summary="事件处理器状态检查",
+        description="返回各事件处理器的派发方式、执行次数、失败次数、超时次数和耗时等指标",
+        status_code=status.HTTP_200_OK
+    )
+    async def event_status():
+        """
+        事件处理器状态检查端点
+
+        返回:
+            BaseResponse[Dict[str, Any]]: 各事件处理器的执行指标
+        """
+        return BaseResponse(
+            code=0,
+            message="success",
+            data=get_event_bus().stats()
+        )
+
+    @router.get(
+        "/caches",
+        response_model=BaseResponse[Dict[str, Any]],
+        summary="进程内缓存状态检查",
+        description="返回各进程内缓存（短语判题结果、单词卡片等）的大小、命中数和命中率等指标",
+        status_code=status.HTTP_200_OK
+    )
+    async def cache_status():
+        """
+        进程内缓存状态检查端点
+
+        返回:
+            BaseResponse[Dict[str, Any]]: 各缓存的指标
+        """
+        return BaseResponse(
+            code=0,
+            message="success",
+            data=get_cache_stats()
+        )
     
     return router
\ No newline at end of file
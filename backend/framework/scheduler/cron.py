@@ -0,0 +1,114 @@
+"""
+cron表达式解析，支持标准的5段格式：分 时 日 月 周
+每段支持 *、数字、范围(a-b)、列表(a,b,c)、步长(*/n、a-b/n)，周的取值为0-6（0为周日，7也表示周日）
+日和周同时指定（都不是*）时，与cron一致，满足其中之一即可
+"""
+from datetime import datetime, timedelta
+from typing import Set, Tuple
+
+# 各段的取值范围
+FIELD_RANGES: Tuple[Tuple[int, int], ...] = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+FIELD_NAMES = ("分", "时", "日", "月", "周")
+
+
+class CronExpression:
+    """
+    cron表达式
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"无效的cron表达式，需要5段（分 时 日 月 周）: {expression}")
+        parsed = [self._parse_field(field, FIELD_RANGES[i], FIELD_NAMES[i]) for i, field in enumerate(fields)]
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        # 7和0都表示周日
+        self.weekdays = {0 if day == 7 else day for day in weekdays}
+        self._day_restricted = fields[2] != '*'
+        self._weekday_restricted = fields[4] != '*'
+
+    def __repr__(self) -> str:
+        return f"CronExpression('{self.expression}')"
+
+    @staticmethod
+    def _parse_field(field: str, value_range: Tuple[int, int], name: str) -> Set[int]:
+        low, high = value_range
+        values = set()
+        for part in field.split(','):
+            step = 1
+            if '/' in part:
+                part, step_text = part.split('/', 1)
+                step = int(step_text)
+                if step <= 0:
+                    raise ValueError(f"cron表达式的{name}步长必须大于0: {field}")
+            if part == '*':
+                start, end = low, high
+            elif '-' in part:
+                start, end = (int(v) for v in part.split('-', 1))
+            else:
+                start = int(part)
+                end = high if step > 1 else start
+            if start < low or end > high or start > end:
+                raise ValueError(f"cron表达式的{name}超出范围[{low}, {high}]: {field}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, dt: datetime) -> bool:
+        day_match = dt.day in self.days
+        # datetime.weekday() 周一为0，cron 周日为0
+        weekday_match = (dt.weekday() + 1) % 7 in self.weekdays
+        if self._day_restricted and self._weekday_restricted:
+            return day_match or weekday_match
+        return day_match and weekday_match
+
+    def matches(self, dt: datetime) -> bool:
+        """
+        判断某个时间（精确到分钟）是否满足表达式
+        """
+        return (dt.minute in self.minutes and dt.hour in self.hours
+                and dt.month in self.months and self._day_matches(dt))
+
+    def next_after(self, dt: datetime) -> datetime:
+        """
+        计算 dt 之后（不含 dt 所在的分钟）的下一次执行时间
+        """
+        candidate = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # 最多向后查找5年，避免 2月30日 这类永远不会满足的表达式死循环
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                # 跳到下个月1日0点
+                year, month = (candidate.year + 1, 1) if candidate.month == 12 else (candidate.year, candidate.month + 1)
+                candidate = candidate.replace(year=year, month=month, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+                continue
+            if candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+                continue
+            return candidate
+        raise ValueError(f"cron表达式在5年内没有可执行的时间: {self.expression}")
+
+
+def every_minutes_cron(minutes: int) -> str:
+    """
+    每N分钟执行一次对应的cron表达式，N为60的整数倍时按小时计算
+    cron无法表示超过1小时且不是整小时、或超过1天的间隔（如90分钟），这类间隔直接报错
+    """
+    if minutes <= 0:
+        raise ValueError(f"执行间隔必须大于0: {minutes}")
+    if minutes < 60:
+        return f"*/{minutes} * * * *"
+    if minutes % 60 != 0:
+        raise ValueError(f"执行间隔超过60分钟时必须是60的整数倍: {minutes}")
+    hours = minutes // 60
+    if hours == 24:
+        return "0 0 * * *"
+    if hours > 24:
+        raise ValueError(f"执行间隔不能超过1天: {minutes}")
+    return "0 * * * *" if hours == 1 else f"0 */{hours} * * *"
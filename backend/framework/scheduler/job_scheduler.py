@@ -0,0 +1,295 @@
+"""
+定时任务调度器，替代各个服务中各自启动的 schedule 轮询线程
+
+1. 按cron表达式注册任务，单个定时线程维护按下次执行时间排序的堆，到点才唤醒，不再每秒轮询
+2. 任务在线程池中执行；同一任务上一次还未结束时跳过本次（防重叠），多进程时通过集群任务锁保证每个计划时间只执行一次
+3. 统计每个任务的执行次数、耗时和处理行数（任务函数返回int时视为处理行数）
+4. 执行状态保存在 zcg.t_job_run_state 表中，进程重启后补跑错过的最近一次执行
+"""
+import heapq
+import itertools
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy import text
+from framework.cluster import shared_state
+from framework.cluster.job_lock import cluster_job_lock
+from framework.config.config import settings
+from framework.database.db_factory import engine
+from framework.scheduler.cron import CronExpression
+from framework.util.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+JOB_STATUS_SUCCESS = "success"
+JOB_STATUS_FAILED = "failed"
+
+SAVE_RUN_STATE_SQL = text("""
+INSERT INTO zcg.t_job_run_state (job_name, last_scheduled_at, last_started_at, last_finished_at, last_success_at,
+                                 last_status, last_duration_ms, last_row_count, last_error, run_count, failure_count)
+VALUES (:job_name, :scheduled_at, :started_at, :finished_at, CASE WHEN :status = 'success' THEN :finished_at END,
+        :status, :duration_ms, :row_count, :error, 1, CASE WHEN :status = 'success' THEN 0 ELSE 1 END)
+ON CONFLICT (job_name) DO UPDATE
+SET last_scheduled_at = EXCLUDED.last_scheduled_at,
+    last_started_at = EXCLUDED.last_started_at,
+    last_finished_at = EXCLUDED.last_finished_at,
+    last_success_at = COALESCE(EXCLUDED.last_success_at, zcg.t_job_run_state.last_success_at),
+    last_status = EXCLUDED.last_status,
+    last_duration_ms = EXCLUDED.last_duration_ms,
+    last_row_count = EXCLUDED.last_row_count,
+    last_error = EXCLUDED.last_error,
+    run_count = zcg.t_job_run_state.run_count + 1,
+    failure_count = zcg.t_job_run_state.failure_count + EXCLUDED.failure_count,
+    updated_at = now()
+""")
+
+LOAD_RUN_STATE_SQL = text("SELECT job_name, last_scheduled_at FROM zcg.t_job_run_state")
+
+
+@dataclass
+class JobMetrics:
+    """任务执行指标（本进程）"""
+    runs: int = 0
+    failures: int = 0
+    skipped_overlap: int = 0  # 上一次还未结束而跳过的次数
+    skipped_cluster: int = 0  # 已在其他进程中执行而跳过的次数
+    last_scheduled_at: Optional[str] = None
+    last_finished_at: Optional[str] = None
+    last_status: Optional[str] = None
+    last_duration_ms: Optional[int] = None
+    total_duration_ms: int = 0
+    last_row_count: Optional[int] = None
+    total_row_count: int = 0
+    last_error: Optional[str] = None
+
+
+@dataclass
+class Job:
+    """定时任务"""
+    name: str
+    cron: CronExpression
+    func: Callable[[], Any]
+    catch_up: bool = True  # 重启后是否补跑错过的执行
+    cluster: bool = True  # 多进程时是否只在一个进程中执行
+    running: bool = False
+    next_run_at: Optional[datetime] = None
+    metrics: JobMetrics = field(default_factory=JobMetrics)
+
+
+class JobScheduler:
+    """
+    定时任务调度器
+    """
+
+    def __init__(self, max_workers: int):
+        self._jobs: Dict[str, Job] = {}
+        # 堆: (计划执行时间戳, 序号, 任务名, 计划执行时间)
+        self._heap: List[tuple] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._timer_thread = None
+        self._running = False
+
+    def register(self, name: str, cron: str, func: Callable[[], Any], catch_up: bool = True, cluster: bool = True) -> None:
+        """
+        注册定时任务
+
+        使用方式:
+        get_job_scheduler().register("morale_computer", "0 * * * *", self._process_hourly_business_logic)
+        """
+        with self._condition:
+            if name in self._jobs:
+                raise ValueError(f"定时任务已注册: {name}")
+            job = Job(name=name, cron=CronExpression(cron), func=func, catch_up=catch_up, cluster=cluster)
+            self._jobs[name] = job
+            if self._running:
+                self._schedule(job, job.cron.next_after(datetime.now()))
+        logger.info(f"注册定时任务: {name}, cron: {cron}")
+
+    def start(self) -> None:
+        """
+        启动定时线程，补跑重启期间错过的任务
+        """
+        if not settings.JOB_SCHEDULER_ENABLED:
+            logger.info("定时任务调度器已关闭")
+            return
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+            now = datetime.now()
+            last_scheduled = self._load_last_scheduled()
+            for job in self._jobs.values():
+                missed = self._missed_run(job, last_scheduled.get(job.name), now)
+                self._schedule(job, missed or job.cron.next_after(now))
+            self._timer_thread = threading.Thread(target=self._timer_loop, name="job-scheduler", daemon=True)
+            self._timer_thread.start()
+        logger.info(f"定时任务调度器已启动，任务数: {len(self._jobs)}")
+
+    def stop(self) -> None:
+        """停止定时线程"""
+        with self._condition:
+            self._running = False
+            self._heap.clear()
+            self._condition.notify_all()
+        if self._timer_thread:
+            self._timer_thread.join(timeout=5)
+        self._executor.shutdown(wait=False)
+        logger.info("定时任务调度器已停止")
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        获取各任务的执行指标
+        """
+        with self._condition:
+            return {name: dict(asdict(job.metrics),
+                               cron=job.cron.expression,
+                               running=job.running,
+                               next_run_at=job.next_run_at.isoformat() if job.next_run_at else None)
+                    for name, job in self._jobs.items()}
+
+    def _missed_run(self, job: Job, last_scheduled_at: Optional[datetime], now: datetime) -> Optional[datetime]:
+        """
+        重启期间错过的最近一次计划时间，没有错过或从未执行过时返回None
+        """
+        if not job.catch_up or last_scheduled_at is None:
+            return None
+        next_run = job.cron.next_after(last_scheduled_at)
+        if next_run > now:
+            return None
+        # 错过了多次时只补跑最近的一次
+        missed = next_run
+        while True:
+            following = job.cron.next_after(missed)
+            if following > now:
+                break
+            missed = following
+        logger.info(f"定时任务错过了执行，启动后补跑: {job.name}, 计划时间: {missed}")
+        return missed
+
+    def _load_last_scheduled(self) -> Dict[str, datetime]:
+        try:
+            with engine.connect() as connection:
+                return {row.job_name: row.last_scheduled_at for row in connection.execute(LOAD_RUN_STATE_SQL)
+                        if row.last_scheduled_at is not None}
+        except Exception as e:
+            logger.warning(f"读取定时任务执行状态失败，不补跑错过的任务: {e}")
+            return {}
+
+    def _schedule(self, job: Job, run_at: datetime) -> None:
+        job.next_run_at = run_at
+        heapq.heappush(self._heap, (run_at.timestamp(), next(self._sequence), job.name, run_at))
+        self._condition.notify_all()
+
+    def _timer_loop(self) -> None:
+        """定时线程：等待到堆顶任务的执行时间后派发"""
+        with self._condition:
+            while self._running:
+                if not self._heap:
+                    self._condition.wait()
+                    continue
+                delay = self._heap[0][0] - time.time()
+                if delay > 0:
+                    self._condition.wait(timeout=delay)
+                    continue
+                _, _, name, scheduled_at = heapq.heappop(self._heap)
+                job = self._jobs[name]
+                self._dispatch(job, scheduled_at)
+                self._schedule(job, job.cron.next_after(max(scheduled_at, datetime.now())))
+
+    def _dispatch(self, job: Job, scheduled_at: datetime) -> None:
+        """派发到线程池执行，上一次还未结束时跳过"""
+        if job.running:
+            job.metrics.skipped_overlap += 1
+            logger.warning(f"定时任务上一次执行还未结束，跳过本次: {job.name}, 计划时间: {scheduled_at}")
+            return
+        job.running = True
+        self._executor.submit(self._run, job, scheduled_at)
+
+    def _run(self, job: Job, scheduled_at: datetime) -> None:
+        try:
+            if not job.cluster:
+                self._execute(job, scheduled_at)
+                return
+            # 以计划时间作为周期，所有进程计算出的计划时间一致，同一计划时间只执行一次
+            with cluster_job_lock(job.name, scheduled_at.strftime('%Y-%m-%d %H:%M')) as acquired:
+                if not acquired:
+                    with self._condition:
+                        job.metrics.skipped_cluster += 1
+                    return
+                self._execute(job, scheduled_at)
+            shared_state.purge_expired()
+        except Exception as e:
+            logger.error(f"定时任务调度失败: {job.name}, 错误: {e}")
+        finally:
+            with self._condition:
+                job.running = False
+
+    def _execute(self, job: Job, scheduled_at: datetime) -> None:
+        """执行任务并记录指标和执行状态"""
+        started_at = datetime.now()
+        start = time.time()
+        status, row_count, error = JOB_STATUS_SUCCESS, None, None
+        logger.info(f"开始执行定时任务: {job.name}, 计划时间: {scheduled_at}")
+        try:
+            result = job.func()
+            if isinstance(result, int) and not isinstance(result, bool):
+                row_count = result
+        except Exception as e:
+            status, error = JOB_STATUS_FAILED, f"{e}\n{traceback.format_exc()}"
+            logger.error(f"定时任务执行失败: {job.name}, 错误: {e}")
+        duration_ms = int((time.time() - start) * 1000)
+        finished_at = datetime.now()
+
+        with self._condition:
+            metrics = job.metrics
+            metrics.runs += 1
+            metrics.failures += 1 if status == JOB_STATUS_FAILED else 0
+            metrics.last_scheduled_at = scheduled_at.isoformat()
+            metrics.last_finished_at = finished_at.isoformat()
+            metrics.last_status = status
+            metrics.last_duration_ms = duration_ms
+            metrics.total_duration_ms += duration_ms
+            metrics.last_row_count = row_count
+            metrics.total_row_count += row_count or 0
+            metrics.last_error = error
+        logger.info(f"定时任务执行结束: {job.name}, 结果: {status}, 耗时: {duration_ms}毫秒, 处理行数: {row_count}")
+        self._save_run_state(job, scheduled_at, started_at, finished_at, status, duration_ms, row_count, error)
+
+    def _save_run_state(self, job: Job, scheduled_at: datetime, started_at: datetime, finished_at: datetime,
+                        status: str, duration_ms: int, row_count: Optional[int], error: Optional[str]) -> None:
+        try:
+            with engine.begin() as connection:
+                connection.execute(SAVE_RUN_STATE_SQL, {
+                    "job_name": job.name,
+                    "scheduled_at": scheduled_at,
+                    "started_at": started_at,
+                    "finished_at": finished_at,
+                    "status": status,
+                    "duration_ms": duration_ms,
+                    "row_count": row_count,
+                    "error": error
+                })
+        except Exception as e:
+            logger.error(f"保存定时任务执行状态失败: {job.name}, 错误: {e}")
+
+
+_job_scheduler: Optional[JobScheduler] = None
+_job_scheduler_lock = threading.Lock()
+
+
+def get_job_scheduler() -> JobScheduler:
+    """
+    获取定时任务调度器
+    """
+    global _job_scheduler
+    if _job_scheduler is None:
+        with _job_scheduler_lock:
+            if _job_scheduler is None:
+                _job_scheduler = JobScheduler(settings.JOB_SCHEDULER_WORKERS)
+    return _job_scheduler
@@ -0,0 +1,207 @@
+"""
+Dify客户端
+
+1. 基于httpx的长连接池，同步和异步接口各自复用一个连接池，不再每次调用都新建连接
+2. 连接超时、读取超时可配置
+3. 网络错误、超时和429/5xx响应按指数退避重试
+4. 并发数限制，超过限制的调用排队等待，避免Dify变慢时占满业务线程
+"""
+import asyncio
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import quote
+import httpx
+from framework.config.config import settings
+from framework.exception.custom_exception import BusinessException
+from framework.util.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 需要重试的响应状态码
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class DifyException(BusinessException):
+    """调用Dify失败"""
+    def __init__(self, detail: str, code: int = 502):
+        super().__init__(detail, code)
+
+
+class DifyClient:
+    """
+    Dify客户端
+
+    使用方式:
+    result = get_dify_client().run_workflow(api_key, inputs, "result")
+    result = await get_dify_client().run_workflow_async(api_key, inputs, "result")
+    """
+
+    def __init__(self, base_url: str, user: str, timeout: float, connect_timeout: float,
+                 max_retries: int, retry_backoff: float, max_concurrency: int):
+        self.base_url = base_url.rstrip("/")
+        self.user = user
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.max_concurrency = max_concurrency
+        self._timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self._limits = httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+        self._client = httpx.Client(base_url=self.base_url, timeout=self._timeout, limits=self._limits)
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        # 异步客户端与事件循环绑定，在第一次异步调用时创建
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._async_semaphore: Optional[asyncio.Semaphore] = None
+
+    def run_workflow(self, api_key: str, inputs: Dict[str, Any], output_val: str, response_mode: str = "blocking") -> Any:
+        """
+        运行工作流，返回输出字段output_val的值
+        """
+        request = self._workflow_request(api_key, inputs, response_mode)
+        with self._semaphore:
+            response = self._send_with_retry("运行工作流", lambda: self._client.post(**request))
+        return self._workflow_output(response, output_val)
+
+    async def run_workflow_async(self, api_key: str, inputs: Dict[str, Any], output_val: str, response_mode: str = "blocking") -> Any:
+        """
+        运行工作流（异步），返回输出字段output_val的值
+        """
+        request = self._workflow_request(api_key, inputs, response_mode)
+        client, semaphore = self._get_async_client()
+        async with semaphore:
+            response = await self._send_with_retry_async("运行工作流", lambda: client.post(**request))
+        return self._workflow_output(response, output_val)
+
+    def upload_file(self, api_key: str, file_path: str, mime_type: str = "image/jpg", file_type: str = "JPG") -> str:
+        """
+        上传文件，返回文件ID
+        """
+        file_name, content = Path(file_path).name, Path(file_path).read_bytes()
+        with self._semaphore:
+            response = self._send_with_retry("上传文件", lambda: self._client.post(
+                "/files/upload",
+                headers=self._headers(api_key),
+                files={"file": (quote(file_name), content, mime_type)},
+                data={"user": self.user, "type": file_type}
+            ))
+        return response.json().get("id")
+
+    async def upload_file_async(self, api_key: str, file_path: str, mime_type: str = "image/jpg", file_type: str = "JPG") -> str:
+        """
+        上传文件（异步），返回文件ID
+        """
+        file_name, content = Path(file_path).name, Path(file_path).read_bytes()
+        client, semaphore = self._get_async_client()
+        async with semaphore:
+            response = await self._send_with_retry_async("上传文件", lambda: client.post(
+                "/files/upload",
+                headers=self._headers(api_key),
+                files={"file": (quote(file_name), content, mime_type)},
+                data={"user": self.user, "type": file_type}
+            ))
+        return response.json().get("id")
+
+    def close(self) -> None:
+        """关闭同步连接池"""
+        self._client.close()
+
+    async def aclose(self) -> None:
+        """关闭异步连接池"""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+    def _get_async_client(self):
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(base_url=self.base_url, timeout=self._timeout, limits=self._limits)
+            self._async_semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._async_client, self._async_semaphore
+
+    def _headers(self, api_key: str) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {api_key}"}
+
+    def _workflow_request(self, api_key: str, inputs: Dict[str, Any], response_mode: str) -> Dict[str, Any]:
+        return {
+            "url": "/workflows/run",
+            "headers": self._headers(api_key),
+            "json": {"inputs": inputs, "response_mode": response_mode, "user": self.user}
+        }
+
+    def _workflow_output(self, response: httpx.Response, output_val: str) -> Any:
+        try:
+            result = response.json().get("data").get("outputs").get(output_val)
+        except (AttributeError, ValueError) as e:
+            raise DifyException(f"工作流返回结果格式错误: {e}")
+        logger.info(f"工作流执行成功，结果: {result}")
+        return result
+
+    def _backoff(self, attempt: int) -> float:
+        """第attempt次重试前的等待时间：指数退避，加随机抖动"""
+        return self.retry_backoff * (2 ** attempt) * (0.5 + random.random())
+
+    def _check_response(self, action: str, response: httpx.Response) -> bool:
+        """
+        检查响应，成功返回True，可以重试返回False，不可重试时抛出异常
+        """
+        if response.is_success:
+            return True
+        if response.status_code in RETRY_STATUS_CODES:
+            return False
+        raise DifyException(f"{action}失败，状态码: {response.status_code}, 响应: {response.text[:200]}")
+
+    def _send_with_retry(self, action: str, send) -> httpx.Response:
+        start = time.time()
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = send()
+                if self._check_response(action, response):
+                    logger.info(f"[性能] Dify{action}耗时: {time.time() - start:.3f}秒, 重试次数: {attempt}")
+                    return response
+                error = f"状态码: {response.status_code}"
+            except httpx.TransportError as e:
+                error = f"{type(e).__name__}: {e}"
+            if attempt < self.max_retries:
+                delay = self._backoff(attempt)
+                logger.warning(f"Dify{action}失败，{delay:.2f}秒后重试({attempt + 1}/{self.max_retries}): {error}")
+                time.sleep(delay)
+        raise DifyException(f"{action}失败，已重试{self.max_retries}次: {error}")
+
+    async def _send_with_retry_async(self, action: str, send) -> httpx.Response:
+        start = time.time()
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await send()
+                if self._check_response(action, response):
+                    logger.info(f"[性能] Dify{action}耗时: {time.time() - start:.3f}秒, 重试次数: {attempt}")
+                    return response
+                error = f"状态码: {response.status_code}"
+            except httpx.TransportError as e:
+                error = f"{type(e).__name__}: {e}"
+            if attempt < self.max_retries:
+                delay = self._backoff(attempt)
+                logger.warning(f"Dify{action}失败，{delay:.2f}秒后重试({attempt + 1}/{self.max_retries}): {error}")
+                await asyncio.sleep(delay)
+        raise DifyException(f"{action}失败，已重试{self.max_retries}次: {error}")
+
+
+_dify_client: Optional[DifyClient] = None
+_dify_client_lock = threading.Lock()
+
+
+def get_dify_client() -> DifyClient:
+    """
+    获取Dify客户端
+    """
+    global _dify_client
+    if _dify_client is None:
+        with _dify_client_lock:
+            if _dify_client is None:
+                _dify_client = DifyClient(base_url=settings.DIFY_API_URL,
+                                          user=settings.DIFY_USER,
+                                          timeout=settings.DIFY_TIMEOUT_SECONDS,
+                                          connect_timeout=settings.DIFY_CONNECT_TIMEOUT_SECONDS,
+                                          max_retries=settings.DIFY_MAX_RETRIES,
+                                          retry_backoff=settings.DIFY_RETRY_BACKOFF_SECONDS,
+                                          max_concurrency=settings.DIFY_MAX_CONCURRENCY)
+    return _dify_client
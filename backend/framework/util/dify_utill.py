@@ -1,7 +1,4 @@
-from urllib.parse import quote
-from pathlib import Path
-import requests
-from framework.config.config import settings
+from framework.util.dify_client import DifyException, get_dify_client
 from framework.util.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -9,29 +6,13 @@ logger = setup_logger(__name__)
 def upload_file(api_key:str,file_path):
     """
     上传文件到dify
+    返回文件ID，上传失败时返回None
     """
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-    }
-    
     try:
         logger.info("上传文件中...")
-        with open(file_path, 'rb') as file:
-            files = {
-                'file': (quote(Path(file_path).name), file, 'image/jpg')  # 确保文件以适当的MIME类型上传
-            }
-            data = {
-                "user": settings,
-                "type": "JPG"  # 设置文件类型
-            }
-            
-            response = requests.post(settings.DIFY_API_URL+"/files/upload", headers=headers, files=files, data=data)
-            if response.status_code == 201:  # 201 表示创建成功
-                logger.info("文件上传成功")
-                return response.json().get("id")  # 获取上传的文件 ID
-            else:
-                logger.error(f"文件上传失败，状态码: {response.status_code}")
-                return None
+        file_id = get_dify_client().upload_file(api_key,file_path)
+        logger.info("文件上传成功")
+        return file_id
     except Exception as e:
         logger.error(f"发生错误: {str(e)}")
         return None
@@ -48,29 +29,12 @@ def run_workflow(api_key:str,inputs, output_val, response_mode="blocking") -> st
     Returns:
         str: 工作流执行结果
     """
-    workflow_url = settings.DIFY_API_URL+"/workflows/run"
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
-
-    data = {
-        "inputs": inputs,
-        "response_mode": response_mode,
-        "user": settings.DIFY_USER
-    }
-
     try:
         logger.info("运行工作流...")
-        response = requests.post(workflow_url, headers=headers, json=data)
-        if response.status_code == 200:
-            logger.info("工作流执行成功")
-            result = response.json().get("data").get("outputs").get(output_val)
-            logger.info(f"工作流执行成功，结果: {result}")
-            return result
-        else:
-            logger.error(f"工作流执行失败，状态码: {response.status_code}")
-            return {"status": "error", "message": f"Failed to execute workflow, status code: {response.status_code}"}
+        return get_dify_client().run_workflow(api_key,inputs,output_val,response_mode)
+    except DifyException as e:
+        logger.error(f"工作流执行失败: {e.detail}")
+        return {"status": "error", "message": e.detail}
     except Exception as e:
         logger.error(f"发生错误: {str(e)}")
-        return {"status": "error", "message": str(e)}    
+        return {"status": "error", "message": str(e)}
@@ -0,0 +1,119 @@
+"""
+单词形式索引模块，加载离线预计算好的单词形式，避免运行时反复查询WordNet
+索引文件由 scripts/build_word_forms_index.py 生成
+"""
+import os
+import pickle
+import threading
+from typing import Callable, Dict, FrozenSet, Iterable, Optional
+from framework.config.config import settings
+from framework.util.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# 索引文件格式版本，格式变化时递增，旧版本的索引文件会被忽略
+INDEX_FORMAT_VERSION = 1
+
+
+class WordFormsIndex:
+    """
+    单词形式索引，key为小写单词，value为该单词所有可能形式的不可变集合
+    """
+
+    def __init__(self, forms_map: Optional[Dict[str, FrozenSet[str]]] = None):
+        self._forms_map: Dict[str, FrozenSet[str]] = forms_map or {}
+
+    def get(self, word: str) -> Optional[FrozenSet[str]]:
+        """
+        获取单词的所有形式，索引中不存在时返回None
+        """
+        if not word:
+            return None
+        return self._forms_map.get(word.lower())
+
+    def __contains__(self, word: str) -> bool:
+        return bool(word) and word.lower() in self._forms_map
+
+    def __len__(self) -> int:
+        return len(self._forms_map)
+
+    def merge(self, other: "WordFormsIndex") -> "WordFormsIndex":
+        """
+        合并另一个索引，other中的单词覆盖当前索引中的同名单词
+        """
+        forms_map = dict(self._forms_map)
+        forms_map.update(other._forms_map)
+        return WordFormsIndex(forms_map)
+
+    def save(self, path: str) -> None:
+        """
+        保存索引到文件，先写临时文件再原子替换，避免服务读到写了一半的文件
+        """
+        dir_name = os.path.dirname(os.path.abspath(path))
+        os.makedirs(dir_name, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({"version": INDEX_FORMAT_VERSION, "forms": self._forms_map}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        logger.info(f"单词形式索引已保存: {path}, 单词数={len(self)}")
+
+    @classmethod
+    def load(cls, path: str) -> "WordFormsIndex":
+        """
+        从文件加载索引，文件不存在或版本不匹配时返回空索引
+        """
+        if not path or not os.path.exists(path):
+            logger.warning(f"单词形式索引文件不存在: {path}，将全部回退到NLTK实时计算")
+            return cls()
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+        if not isinstance(data, dict) or data.get("version") != INDEX_FORMAT_VERSION:
+            logger.warning(f"单词形式索引文件版本不匹配: {path}，将全部回退到NLTK实时计算")
+            return cls()
+        return cls(data.get("forms") or {})
+
+    @classmethod
+    def build(cls, words: Iterable[str], compute_forms: Callable[[str], Iterable[str]]) -> "WordFormsIndex":
+        """
+        根据单词列表构建索引
+        Args:
+            words: 单词列表
+            compute_forms: 计算单个单词所有形式的函数
+        """
+        forms_map = {}
+        for word in words:
+            if not word:
+                continue
+            forms_map[word.lower()] = frozenset(compute_forms(word))
+        return cls(forms_map)
+
+
+# 全局索引实例，首次使用时加载
+_index: Optional[WordFormsIndex] = None
+_index_lock = threading.Lock()
+
+
+def load_word_forms_index(path: Optional[str] = None) -> WordFormsIndex:
+    """
+    加载(或重新加载)单词形式索引，应用启动时调用一次
+    """
+    global _index
+    path = path or settings.WORD_FORMS_INDEX_PATH
+    try:
+        index = WordFormsIndex.load(path)
+    except Exception as e:
+        logger.error(f"加载单词形式索引失败: {path}, 错误: {e}")
+        index = WordFormsIndex()
+    with _index_lock:
+        _index = index
+    logger.info(f"单词形式索引加载完成: {path}, 单词数={len(index)}")
+    return index
+
+
+def get_word_forms_index() -> WordFormsIndex:
+    """
+    获取全局单词形式索引
+    """
+    if _index is None:
+        return load_word_forms_index()
+    return _index
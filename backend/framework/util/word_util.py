@@ -2,20 +2,31 @@ import nltk
 from nltk.stem import WordNetLemmatizer
 from nltk.corpus import wordnet
 import re
-from functools import lru_cache
+from functools import cached_property, lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from framework.util.word_forms_index import get_word_forms_index
 from framework.config.word_forms_config import (
     IRREGULAR_VERBS,
     IRREGULAR_NOUNS,
     IRREGULAR_ADJECTIVES,
     SPECIAL_NOUNS,
     SPECIAL_ADJECTIVES,
-    COMMON_PREFIXES,
-    COMMON_COMPOUND_WORDS
+    COMMON_PREFIXES
 )
 
-# 缓存 WordNet 查询结果
-@lru_cache(maxsize=1000)
-def get_word_forms(target_word: str) -> set:
+def get_word_forms(target_word: str) -> frozenset:
+    """
+    获取单词的所有可能形式
+    优先从离线预计算的单词形式索引中获取，索引中不存在的单词才回退到NLTK实时计算
+    """
+    forms = get_word_forms_index().get(target_word)
+    if forms is not None:
+        return forms
+    return compute_word_forms(target_word)
+
+# 缓存 WordNet 查询结果（仅用于索引未覆盖的单词）
+@lru_cache(maxsize=4096)
+def compute_word_forms(target_word: str) -> frozenset:
     """
     获取单词的所有可能形式，使用NLTK智能检测词性转换
     """
@@ -184,160 +195,175 @@ def get_word_forms(target_word: str) -> set:
             base_form = target_lower[len(prefix):]
             forms.add(base_form)
     
-    return forms
+    return frozenset(forms)
 
-def mask_word(word:str, content:str) -> str:
+# 英文单词（包括带连字符的复合词），只有这类片段才可能需要*化，
+# 数字、标点和中文等其他片段原样保留
+ENGLISH_WORD_PATTERN = re.compile(r'[a-zA-Z]+(?:-[a-zA-Z]+)*')
+
+# 批量*化多个文本字段时使用的分隔符，不会被英文单词正则匹配到
+FIELD_SEPARATOR = '\x1f'
+
+
+def _mask_tail(text: str) -> str:
     """
-    使用NLTK进行更专业的单词变体检测和掩码处理
-    param word: 单词
-    param content: 单词相关的内容，如单词、单词变体、例句、用法、扩展等。
-    return: 处理后的content。
+    保留首字母，其余用*替换
+    """
+    return text[0] + '*' * (len(text) - 1)
+
+
+class WordMasker:
+    """
+    单词*化器，针对一个目标单词构建一次，之后可以对任意多段文本做*化处理
+    构建时预先计算好单词的所有形式，第一次对长文本*化时编译一个包含所有形式和基础单词的候选正则，
+    文本中不包含任何候选时直接返回，包含时只对英文单词片段做一次替换
     """
-    if not word or not content:
-        return content
 
-    def is_word_variant(base_word: str, test_word: str) -> bool:
+    def __init__(self, word: str):
+        self.word = word
+        self.base_lower = word.lower()
+        self.word_forms = get_word_forms(word)
+        # 英文单词片段的*化结果缓存，同一单词在多段文本中重复出现时不用重复判断
+        self._token_cache: Dict[str, str] = {}
+
+    @cached_property
+    def candidate_pattern(self) -> re.Pattern:
         """
-        使用NLTK检查test_word是否是base_word的变体
+        候选正则，只在对长文本*化时使用
+        所有形式都包含基础单词时，候选正则只需要匹配基础单词
         """
-        # 获取目标单词的所有可能形式
-        word_forms = get_word_forms(base_word)
-        
-        # 清理测试单词
-        test_word = test_word.lower()
-        test_word = re.sub(r'[^\w\'-]', '', test_word)
-        
-        # 检查是否匹配任何形式
-        return test_word in word_forms
+        candidates = {self.base_lower}
+        candidates.update(form for form in self.word_forms if self.base_lower not in form)
+        return re.compile(
+            '|'.join(re.escape(c) for c in sorted(candidates, key=len, reverse=True)),
+            re.IGNORECASE
+        )
 
-    def split_text(text: str) -> list:
+    def mask_token(self, token: str) -> str:
         """
-        智能分割文本，处理中英文混合的情况
-        :param text: 输入文本
-        :return: 分割后的单词列表，保留原始格式
+        对单个英文单词片段做*化处理
+        1. 片段是目标单词或其变体：保留首字母，其余替换为*
+        2. 片段是包含目标单词的连字符复合词：对包含目标单词的部分做*化
+        3. 兜底：片段中包含目标单词（大小写不敏感）时，对该部分做*化
         """
-        # 匹配英文单词（包括带连字符的单词）、数字和标点符号
-        pattern = (
-            r'[a-zA-Z]+(?:-[a-zA-Z]+)*|'  # 英文单词（包括连字符）
-            r'\d+|'  # 数字
-            r'[.,!?;:()\[\]{}"\']+|'  # 英文标点
-            r'[\u3000-\u303f\uff00-\uffef]'  # 中文标点
-        )
-        
-        # 使用正则表达式分割文本
-        parts = []
-        last_end = 0
-        
-        for match in re.finditer(pattern, text):
-            # 添加英文单词前的非英文文本
-            if match.start() > last_end:
-                parts.append(text[last_end:match.start()])
-            
-            # 添加英文单词、数字或标点符号
-            parts.append(match.group())
-            last_end = match.end()
-        
-        # 添加最后一个匹配后的文本
-        if last_end < len(text):
-            parts.append(text[last_end:])
-        
-        return parts
+        masked = self._token_cache.get(token)
+        if masked is not None:
+            return masked
+
+        token_lower = token.lower()
+        masked = token
+        if token_lower in self.word_forms:
+            masked = _mask_tail(token)
+        elif self.base_lower in token_lower:
+            masked = self._mask_compound(token)
+            # 复合词检测没有进行*化时，使用兜底策略
+            if masked == token:
+                masked = self._fallback_mask(token, token_lower)
 
-    def is_english_word(text: str) -> bool:
+        self._token_cache[token] = masked
+        return masked
+
+    def _mask_compound(self, token: str) -> str:
         """
-        判断是否为英文单词（包括带连字符的复合词）
+        检查token是否是包含目标单词的连字符复合词，是则对匹配的部分整体*化
+        无连字符的复合词(COMMON_COMPOUND_WORDS)与兜底策略的*化结果一致，统一交给兜底处理
         """
-        return bool(re.match(r'^[a-zA-Z]+(?:-[a-zA-Z]+)*$', text))
+        if '-' not in token:
+            return token
+        parts = token.split('-')
+        for i, part in enumerate(parts):
+            if len(part) > 1 and self.base_lower in part.lower():
+                parts[i] = _mask_tail(part)
+                return '-'.join(parts)
+        return token
 
-    def check_compound_word(base_word: str, test_word: str) -> str:
+    def _fallback_mask(self, token: str, token_lower: str) -> str:
         """
-        检查test_word是否是包含base_word的复合词
-        param base_word: 基础单词
-        param test_word: 测试单词
-        return: 掩码后的test_word，如果不是复合词则返回原test_word
+        兜底策略：对token中第一次出现的目标单词做*化
         """
-        base_lower = base_word.lower()
-        test_lower = test_word.lower()
-        
-        # 检查是否是复合词（包含连字符）
-        if '-' in test_word:
-            parts = test_word.split('-')
-            
-            # 检查每个部分是否包含目标单词
-            for i, part in enumerate(parts):
-                if base_lower in part.lower():
-                    # 找到匹配的部分，进行掩码
-                    if len(part) > 1:
-                        # 保留首字母，其余用*替换
-                        masked_part = part[0] + '*' * (len(part) - 1)
-                        parts[i] = masked_part
-                        return '-'.join(parts)
-        
-        # 检查是否是其他形式的复合词（没有连字符）
-        # 采用更保守的策略，只在明确是复合词的情况下才进行掩码
-        if test_lower in COMMON_COMPOUND_WORDS and base_lower in test_lower:
-            # 进行部分掩码
-            start_pos = test_lower.find(base_lower)
-            end_pos = start_pos + len(base_lower)
-            original_part = test_word[start_pos:end_pos]
-            if len(original_part) > 1:
-                masked_part = original_part[0] + '*' * (len(original_part) - 1)
-                return test_word[:start_pos] + masked_part + test_word[end_pos:]
-        
-        return test_word
+        start_pos = token_lower.find(self.base_lower)
+        end_pos = start_pos + len(self.base_lower)
+        if start_pos < 0 or end_pos - start_pos <= 1:
+            return token
+        return token[:start_pos] + _mask_tail(token[start_pos:end_pos]) + token[end_pos:]
+
+    def _replace(self, match: re.Match) -> str:
+        return self.mask_token(match.group())
 
-    def fallback_mask(base_word: str, test_word: str) -> str:
+    def mask(self, content: str) -> str:
         """
-        兜底策略：如果test_word中包含base_word（大小写不敏感），进行掩码处理
-        param base_word: 基础单词
-        param test_word: 测试单词
-        return: 掩码后的test_word，如果不包含则返回原test_word
+        对一段文本做*化处理
         """
-        base_lower = base_word.lower()
-        test_lower = test_word.lower()
-        
-        # 检查test_word是否包含base_word
-        if base_lower in test_lower:
-            start_pos = test_lower.find(base_lower)
-            end_pos = start_pos + len(base_lower)
-            
-            # 获取原始文本中对应位置的部分
-            original_part = test_word[start_pos:end_pos]
-            
-            # 如果匹配的部分长度大于1，进行掩码
-            if len(original_part) > 1:
-                # 保留首字母，其余用*替换
-                masked_part = original_part[0] + '*' * (len(original_part) - 1)
-                return test_word[:start_pos] + masked_part + test_word[end_pos:]
-        
-        return test_word
+        if not content or not self.candidate_pattern.search(content):
+            return content
+        return ENGLISH_WORD_PATTERN.sub(self._replace, content)
 
-    # 使用智能分割方法分割文本
-    words = split_text(content)
-    masked_words = []
-    
-    for w in words:
-        # 如果当前部分不是英文单词，直接添加
-        if not is_english_word(w):
-            masked_words.append(w)
+    def mask_short(self, content: str) -> str:
+        """
+        对短文本（如单词本身）做*化处理，不用候选正则预过滤，结果与mask相同
+        只需要*化短文本时不用编译候选正则
+        """
+        if not content:
+            return content
+        return ENGLISH_WORD_PATTERN.sub(self._replace, content)
+
+    def mask_fields(self, contents: Sequence[Optional[str]]) -> List[Optional[str]]:
+        """
+        对多个文本字段做*化处理，所有字段拼接后只扫描一遍
+        空字段原样返回
+        """
+        indexes = [i for i, content in enumerate(contents) if content]
+        result = list(contents)
+        if not indexes:
+            return result
+        joined_list = [contents[i] for i in indexes]
+        # 字段本身包含分隔符时无法安全拆分，逐个处理
+        if any(FIELD_SEPARATOR in content for content in joined_list):
+            for i in indexes:
+                result[i] = self.mask(contents[i])
+            return result
+        masked_list = self.mask(FIELD_SEPARATOR.join(joined_list)).split(FIELD_SEPARATOR)
+        for i, masked in zip(indexes, masked_list):
+            result[i] = masked
+        return result
+
+
+@lru_cache(maxsize=4096)
+def get_word_masker(word: str) -> WordMasker:
+    """
+    获取单词对应的*化器，同一单词只构建一次
+    """
+    return WordMasker(word)
+
+
+def mask_word(word:str, content:str) -> str:
+    """
+    使用NLTK进行更专业的单词变体检测和掩码处理
+    param word: 单词
+    param content: 单词相关的内容，如单词、单词变体、例句、用法、扩展等。
+    return: 处理后的content。
+    """
+    if not word or not content:
+        return content
+    return get_word_masker(word).mask(content)
+
+
+def mask_word_batch(items: Iterable[Tuple[str, str]]) -> List[str]:
+    """
+    批量*化单词列表等短文本，同一批次中相同的单词共用一个*化器
+    本批次的*化器不写入get_word_masker的缓存，词库很大时一次批量*化不会把常用单词的*化器挤出缓存，
+    也不为每个单词编译候选正则
+    param items: (单词, 内容) 列表
+    return: 与items一一对应的*化后的内容
+    """
+    maskers: Dict[str, WordMasker] = {}
+    result = []
+    for word, content in items:
+        if not word or not content:
+            result.append(content)
             continue
-            
-        # 检查是否是目标单词或其变体
-        if is_word_variant(word, w):
-            # 保留原始大小写
-            first_char = w[0]
-            # 保持原始大小写，其余替换为*
-            masked_w = first_char + '*' * (len(w) - 1)
-            masked_words.append(masked_w)
-        else:
-            # 检查是否是复合词（包含目标单词）
-            masked_w = check_compound_word(word, w)
-            
-            # 如果复合词检测没有进行掩码，使用兜底策略
-            if masked_w == w:
-                masked_w = fallback_mask(word, w)
-            
-            masked_words.append(masked_w)
-            
-    # 重新组合所有部分
-    return ''.join(masked_words)
+        masker = maskers.get(word)
+        if masker is None:
+            masker = maskers[word] = WordMasker(word)
+        result.append(masker.mask_short(content))
+    return result
@@ -0,0 +1,22 @@
+"""
+Gunicorn 配置文件，生产环境启动: gunicorn main:app -c gunicorn.conf.py
+
+多worker部署说明：
+1. 每个worker独立创建应用（不使用preload），各自初始化数据库连接池和后台线程，避免fork后共享连接
+2. 定时任务通过集群任务锁（framework/cluster/job_lock.py）保证每个周期只在一个worker中执行
+3. 进程内缓存（单词卡片、背单词调度器）通过 LISTEN/NOTIFY 在worker之间同步失效，需开启 CLUSTER_NOTIFY_ENABLED
+4. 每个worker最多占用 pool_size + max_overflow 个数据库连接，worker数 * 30 不能超过数据库的 max_connections
+"""
+from framework.config.config import settings
+
+bind = "0.0.0.0:8000"
+workers = settings.GUNICORN_WORKERS
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = 120
+keepalive = 2
+max_requests = 10000
+max_requests_jitter = 100
+preload_app = False
+loglevel = "info"
+errorlog = "logs/gunicorn.log"
+accesslog = "logs/access.log"
@@ -0,0 +1,193 @@
+"""
+延迟激励计算，开启INCENTIVE_DEFERRED_ENABLED后答题接口不再等待激励计算：
+答题时只登记激励票据并立即返回，激励由后台线程计算，客户端凭票据查询（长轮询）激励结果
+
+同一用户词库在INCENTIVE_COALESCE_MS毫秒内的多次答对合并为一次计算（使用最后一次答题时的背词率和斩词率），
+奖品在最后一张票据的结果中返回，其他票据的结果为空并指向最后一张票据
+激励结果保存在进程内缓存和共享状态表中，多个进程时任意进程都能查询到
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event
+from framework.cache.lru_cache import LRUCache
+from framework.cluster import shared_state
+from framework.concurrency.executor import run_sync
+from framework.config.config import settings
+from framework.container.container_decorator import injectable
+from framework.database.db_factory import get_db_session
+from framework.util.logger import setup_logger
+from incentive.application.incentive_app_service import IncentiveAppService
+from incentive.dto.incentive_dto import IncentiveTicketResultDto
+
+logger = setup_logger(__name__)
+
+# 激励票据状态
+TICKET_PENDING = "pending"
+TICKET_DONE = "done"
+TICKET_FAILED = "failed"
+
+# 长轮询时查询共享状态表的间隔（秒），进程内缓存每0.1秒检查一次
+SHARED_STATE_POLL_SECONDS = 1.0
+
+
+@dataclass
+class PendingEvaluation:
+    """等待计算的激励"""
+    memorized_ratio: float
+    slained_ratio: float
+    due_at: float
+    tickets: List[str] = field(default_factory=list)
+
+
+@injectable
+class DeferredIncentiveEvaluator:
+    """
+    延迟激励计算器
+
+    使用方式:
+    deferred_incentive_evaluator.submit(ticket, user_id, word_bank_id, memorized_ratio, slained_ratio)
+    result = await deferred_incentive_evaluator.wait_result(ticket, user_id, wait_seconds=3)
+    """
+
+    def __init__(self, incentive_app_service: IncentiveAppService):
+        self.incentive_app_service = incentive_app_service
+        # 等待计算的激励: {(user_id, word_bank_id): PendingEvaluation}
+        self._pending: Dict[Tuple[int, int], PendingEvaluation] = {}
+        # 正在计算的用户词库，同一用户词库的激励不并发计算
+        self._running = set()
+        self._condition = threading.Condition()
+        # 激励结果: {票据: (user_id, 结果, 完成时间)}
+        self._results = LRUCache(settings.INCENTIVE_TICKET_CACHE_SIZE)
+        self._executor = ThreadPoolExecutor(max_workers=settings.INCENTIVE_DEFERRED_WORKERS, thread_name_prefix="incentive")
+        self._consumer_thread = None
+
+    def submit(self, ticket: str, user_id: int, word_bank_id: int, memorized_ratio: float, slained_ratio: float) -> None:
+        """
+        登记一次答对，与同一用户词库还未开始计算的激励合并
+        在答题事务中调用时，事务提交后才登记（激励计算需要读取已提交的答题记录），事务回滚时不计算
+        """
+        session = get_db_session()
+        if session is not None and not session.info.get('read_only'):
+            event.listen(session, "after_commit",
+                         lambda *args: self._enqueue(ticket, user_id, word_bank_id, memorized_ratio, slained_ratio), once=True)
+        else:
+            self._enqueue(ticket, user_id, word_bank_id, memorized_ratio, slained_ratio)
+
+    def _enqueue(self, ticket: str, user_id: int, word_bank_id: int, memorized_ratio: float, slained_ratio: float) -> None:
+        self._start()
+        with self._condition:
+            key = (user_id, word_bank_id)
+            pending = self._pending.get(key)
+            if pending is None:
+                pending = PendingEvaluation(memorized_ratio=memorized_ratio, slained_ratio=slained_ratio,
+                                            due_at=time.time() + settings.INCENTIVE_COALESCE_MS / 1000)
+                self._pending[key] = pending
+            else:
+                pending.memorized_ratio = memorized_ratio
+                pending.slained_ratio = slained_ratio
+            pending.tickets.append(ticket)
+            self._condition.notify()
+
+    def get_result(self, ticket: str, user_id: int) -> IncentiveTicketResultDto:
+        """
+        查询激励结果，先查进程内缓存，再查共享状态表，都没有时为计算中
+        """
+        result = self._get_local_result(ticket, user_id)
+        if result is None:
+            state = shared_state.get_state(self._state_key(ticket))
+            if state and state.get("user_id") == user_id:
+                result = IncentiveTicketResultDto.model_validate(state["result"])
+        return result or IncentiveTicketResultDto(ticket=ticket, status=TICKET_PENDING)
+
+    async def wait_result(self, ticket: str, user_id: int, wait_seconds: float = 0) -> IncentiveTicketResultDto:
+        """
+        长轮询激励结果，最多等待wait_seconds秒，等待期间不占用业务线程
+        """
+        deadline = time.time() + max(0.0, min(wait_seconds, settings.INCENTIVE_MAX_WAIT_SECONDS))
+        next_shared_check = time.time()
+        while True:
+            result = self._get_local_result(ticket, user_id)
+            if result is not None:
+                return result
+            now = time.time()
+            if now >= next_shared_check or now >= deadline:
+                result = await run_sync(self.get_result, ticket, user_id)
+                if result.status != TICKET_PENDING or now >= deadline:
+                    return result
+                next_shared_check = now + SHARED_STATE_POLL_SECONDS
+            await asyncio.sleep(0.1)
+
+    def _get_local_result(self, ticket: str, user_id: int) -> Optional[IncentiveTicketResultDto]:
+        cached = self._results.get(ticket)
+        if cached is None:
+            return None
+        owner_id, result, finished_at = cached
+        if owner_id != user_id or time.time() - finished_at >= settings.INCENTIVE_TICKET_TTL_SECONDS:
+            return None
+        return result
+
+    def _start(self) -> None:
+        """第一次登记时启动计算线程"""
+        if self._consumer_thread is not None:
+            return
+        with self._condition:
+            if self._consumer_thread is None:
+                self._consumer_thread = threading.Thread(target=self._consume, name="incentive-consumer", daemon=True)
+                self._consumer_thread.start()
+
+    def _consume(self) -> None:
+        """
+        计算线程：等待最早到期的激励，到期后提交到线程池计算
+        """
+        while True:
+            with self._condition:
+                now = time.time()
+                due = [key for key, pending in self._pending.items() if pending.due_at <= now and key not in self._running]
+                if not due:
+                    waiting = [pending.due_at for key, pending in self._pending.items() if key not in self._running]
+                    self._condition.wait(timeout=max(0.0, min(waiting) - now) if waiting else None)
+                    continue
+                batch = [(key, self._pending.pop(key)) for key in due]
+                self._running.update(due)
+            for key, pending in batch:
+                self._executor.submit(self._evaluate, key, pending)
+
+    def _evaluate(self, key: Tuple[int, int], pending: PendingEvaluation) -> None:
+        user_id, word_bank_id = key
+        start = time.time()
+        try:
+            award_list = self.incentive_app_service.do_incentive(user_id, word_bank_id, pending.memorized_ratio, pending.slained_ratio)
+            status = TICKET_DONE
+        except Exception as e:
+            logger.error(f"延迟激励计算失败: user_id={user_id}, word_bank_id={word_bank_id}, 错误: {e}")
+            award_list, status = [], TICKET_FAILED
+        finally:
+            with self._condition:
+                self._running.discard(key)
+                self._condition.notify()
+        logger.info(f"[性能] 延迟激励计算: user_id={user_id}, word_bank_id={word_bank_id}, 合并答题数={len(pending.tickets)}, "
+                    f"获得奖品数量={len(award_list)}, 耗时: {time.time() - start:.3f}秒")
+        last_ticket = pending.tickets[-1]
+        for ticket in pending.tickets:
+            is_last = ticket == last_ticket
+            self._save_result(user_id, IncentiveTicketResultDto(ticket=ticket,
+                                                                status=status,
+                                                                award_list=award_list if is_last else [],
+                                                                merged_into=None if is_last else last_ticket))
+
+    def _save_result(self, user_id: int, result: IncentiveTicketResultDto) -> None:
+        self._results.put(result.ticket, (user_id, result, time.time()))
+        try:
+            shared_state.set_state(self._state_key(result.ticket),
+                                   {"user_id": user_id, "result": result.model_dump()},
+                                   ttl=timedelta(seconds=settings.INCENTIVE_TICKET_TTL_SECONDS))
+        except Exception as e:
+            logger.warning(f"保存激励结果到共享状态失败: ticket={result.ticket}, 错误: {e}")
+
+    def _state_key(self, ticket: str) -> str:
+        return f"incentive:ticket:{ticket}"
@@ -2,9 +2,10 @@
 激励事件处理器，处理来自study模块的事件
 """
 from framework.container.container_decorator import injectable
-from framework.events.event_bus import get_event_bus
+from framework.events.event_bus import DispatchMode, event_handler, get_event_bus
 from framework.util.logger import setup_logger
 from framework.startup.startup_manager import register_startup_service
+from incentive.application.deferred_incentive_evaluator import DeferredIncentiveEvaluator
 from incentive.application.incentive_app_service import IncentiveAppService
 from incentive.dto.incentive_dto import IncentiveResultDto
 
@@ -15,8 +16,9 @@ logger = setup_logger(__name__)
 class IncentiveEventHandler:
     """激励事件处理器"""
     
-    def __init__(self, incentive_app_service: IncentiveAppService):
+    def __init__(self, incentive_app_service: IncentiveAppService, deferred_incentive_evaluator: DeferredIncentiveEvaluator):
         self.incentive_app_service = incentive_app_service
+        self.deferred_incentive_evaluator = deferred_incentive_evaluator
         self.event_bus = get_event_bus()
         
         # 注册事件处理器
@@ -27,22 +29,34 @@ class IncentiveEventHandler:
     def _register_handlers(self):
         """注册事件处理器"""
         # 注册学习完成事件处理器
-        self.event_bus.study_completed_signal.connect(self.handle_study_completed)
+        self.event_bus.connect(self.event_bus.study_completed_signal, self.handle_study_completed)
         # 注册词库切换事件处理器
-        self.event_bus.word_bank_switched_signal.connect(self.handle_word_bank_switched)
+        self.event_bus.connect(self.event_bus.word_bank_switched_signal, self.handle_word_bank_switched)
     
+    @event_handler(mode=DispatchMode.REQUEST_REPLY)
     def handle_study_completed(self, sender, **kwargs):
-        """处理学习完成事件"""
+        """
+        处理学习完成事件，答题事务提交后触发时在事件线程池中执行，答题请求最多等待EVENT_REPLY_TIMEOUT_SECONDS秒；
+        在答题事务中触发时在答题线程中执行，与答题在同一个事务中
+        事件带有激励票据时只登记延迟计算，不返回奖品，客户端凭票据查询激励结果
+        """
         try:
             user_id = kwargs.get('user_id')
             word_bank_id = kwargs.get('word_bank_id')
             memorized_ratio = kwargs.get('memorized_ratio')
             slained_ratio = kwargs.get('slained_ratio')
             study_result = kwargs.get('study_result')
+            incentive_ticket = kwargs.get('incentive_ticket')
             
             logger.info(f"收到学习完成事件: user_id={user_id}, word_bank_id={word_bank_id}, study_result={study_result}")
             
             # 只有答题正确时才触发激励
+            if study_result == 1 and incentive_ticket:
+                self.deferred_incentive_evaluator.submit(
+                    incentive_ticket, user_id, word_bank_id, memorized_ratio, slained_ratio
+                )
+                logger.info(f"激励延迟计算: ticket={incentive_ticket}")
+                return []
             if study_result == 1:  # 假设1表示正确
                 award_list = self.incentive_app_service.do_incentive(
                     user_id, word_bank_id, memorized_ratio, slained_ratio
@@ -58,7 +72,10 @@ class IncentiveEventHandler:
             raise e 
     
     def handle_word_bank_switched(self, sender, **kwargs):
-        """处理词库切换事件"""
+        """
+        处理词库切换事件，在切换词库的事务中同步执行：
+        切换后前端立即查询Profile、提交答题，这些接口需要用户词库激励信息已经存在
+        """
         try:
             user_id = kwargs.get('user_id')
             word_bank_id = kwargs.get('word_bank_id')
@@ -70,4 +87,5 @@ class IncentiveEventHandler:
             logger.info(f"用户词库激励信息初始化完成: user_id={user_id}, word_bank_id={word_bank_id}")
                 
         except Exception as e:
-            logger.error(f"处理词库切换事件失败: {e}") 
\ No newline at end of file
+            logger.error(f"处理词库切换事件失败: {e}")
+            raise e 
\ No newline at end of file
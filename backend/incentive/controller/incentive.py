@@ -1,14 +1,16 @@
 # 创建logger实例
 from functools import partial
 from typing import List
-from fastapi import APIRouter, Depends, Header
+from fastapi import APIRouter, Depends, Header, Query
 from framework.container.container import get_service
+from framework.concurrency.executor import run_sync
 from framework.model.common import BaseResponse
 from framework.router.router_decorator import router_controller
 from framework.util.auth import get_current_user
 from framework.util.logger import setup_logger
+from incentive.application.deferred_incentive_evaluator import DeferredIncentiveEvaluator
 from incentive.application.incentive_app_service import IncentiveAppService
-from incentive.dto.incentive_dto import UserWordBankAwardDto, UserWordBankProfileDto
+from incentive.dto.incentive_dto import IncentiveTicketResultDto, UserWordBankAwardDto, UserWordBankProfileDto
 
 
 logger = setup_logger(__name__)
@@ -29,7 +31,7 @@ def incentive_controller(router: APIRouter):
         return BaseResponse(
                 code=0,
                 message="获取用户词库奖品列表成功",
-                data=incentive_app_service.query_user_word_bank_award_list(current_user["user_id"],current_word_bank_id)
+                data=await run_sync(incentive_app_service.query_user_word_bank_award_list, current_user["user_id"],current_word_bank_id)
         )
     
     @router.get(
@@ -46,5 +48,23 @@ def incentive_controller(router: APIRouter):
         return BaseResponse(
                 code=0,
                 message="获取用户词库个人Profile信息成功",
-                data=incentive_app_service.query_user_word_bank_profile(current_user["user_id"],current_word_bank_id)
-        )
\ No newline at end of file
+                data=await run_sync(incentive_app_service.query_user_word_bank_profile, current_user["user_id"],current_word_bank_id)
+        )
+
+    @router.get(
+        "/get_incentive_result",
+        response_model=BaseResponse[IncentiveTicketResultDto],
+        summary="查询延迟计算的激励结果",
+        description="凭答题时返回的激励票据查询激励结果，wait大于0时最多等待wait秒，计算完成后立即返回"
+    )
+    async def get_incentive_result(
+        ticket: str = Query(..., description="激励票据"),
+        wait: float = Query(default=0, ge=0, le=10, description="最长等待时间（秒）"),
+        current_user: str = Depends(get_current_user),
+        deferred_incentive_evaluator: DeferredIncentiveEvaluator = Depends(partial(get_service, DeferredIncentiveEvaluator))
+    ):
+        return BaseResponse(
+                code=0,
+                message="获取激励结果成功",
+                data=await deferred_incentive_evaluator.wait_result(ticket, current_user["user_id"], wait)
+        )
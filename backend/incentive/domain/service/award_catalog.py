@@ -0,0 +1,100 @@
+"""
+奖品目录和用户词库奖品状态
+
+奖品表 zcg.t_award 是静态数据，启动后只加载一次，按 (type, id) 排序后每个奖品对应一个位序号，
+并按algo_type、type、名称建立索引；目录创建后不再修改，多个线程可以直接读取
+用户词库奖品的解锁状态用一个整数位图表示（第i位对应目录中第i个奖品），数量只记录不为0的奖品
+"""
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+from incentive.domain.entity.award import Award
+
+
+@dataclass(frozen=True)
+class AwardInfo:
+    """奖品信息（目录中的一项）"""
+    index: int  # 位序号
+    id: int
+    type: int
+    name: str
+    description: str
+    image_path: str
+    video_path: Optional[str]
+    algo_type: int
+    algo_value: float
+    init_is_unlocked: bool
+
+
+class AwardCatalog:
+    """
+    不可变的奖品目录
+    """
+
+    def __init__(self, awards: Iterable[Award]):
+        rows = sorted(awards, key=lambda award: (award.type, award.id))
+        self.awards: Tuple[AwardInfo, ...] = tuple(
+            AwardInfo(index=index,
+                      id=award.id,
+                      type=award.type,
+                      name=award.name,
+                      description=award.description,
+                      image_path=award.image_path,
+                      video_path=award.video_path,
+                      algo_type=award.algo_type,
+                      algo_value=float(award.algo_value),
+                      init_is_unlocked=bool(award.init_is_unlocked))
+            for index, award in enumerate(rows))
+        self.index_by_id: Mapping[int, int] = MappingProxyType({award.id: award.index for award in self.awards})
+        self.by_algo_type: Mapping[int, Tuple[AwardInfo, ...]] = self._group(lambda award: award.algo_type)
+        self.by_type: Mapping[int, Tuple[AwardInfo, ...]] = self._group(lambda award: award.type)
+        self.by_name: Mapping[str, AwardInfo] = MappingProxyType({award.name: award for award in self.awards})
+
+    def _group(self, key) -> Mapping[int, Tuple[AwardInfo, ...]]:
+        groups: Dict[int, List[AwardInfo]] = {}
+        for award in self.awards:
+            groups.setdefault(key(award), []).append(award)
+        return MappingProxyType({k: tuple(v) for k, v in groups.items()})
+
+    def __len__(self) -> int:
+        return len(self.awards)
+
+    def __contains__(self, award_id: int) -> bool:
+        return award_id in self.index_by_id
+
+
+@dataclass(frozen=True)
+class UserAwardState:
+    """
+    用户词库奖品状态（不可变，修改时生成新的状态）
+    owned: 用户已初始化的奖品位图（切换词库时初始化，之后新增的奖品不在其中）
+    unlocked: 已解锁的奖品位图
+    nums: 数量不为0的奖品 {位序号: 数量}
+    """
+    owned: int = 0
+    unlocked: int = 0
+    nums: Mapping[int, int] = field(default_factory=lambda: MappingProxyType({}))
+
+    def is_owned(self, index: int) -> bool:
+        return bool(self.owned >> index & 1)
+
+    def is_unlocked(self, index: int) -> bool:
+        return bool(self.unlocked >> index & 1)
+
+    def num(self, index: int) -> int:
+        return self.nums.get(index, 0)
+
+    def updated(self, changes: Iterable[Tuple[int, bool, int]]) -> "UserAwardState":
+        """
+        返回修改后的状态
+        param changes: (位序号, 是否解锁, 数量)列表
+        """
+        unlocked = self.unlocked
+        nums = dict(self.nums)
+        for index, is_unlocked, num in changes:
+            unlocked = unlocked | (1 << index) if is_unlocked else unlocked & ~(1 << index)
+            if num:
+                nums[index] = num
+            else:
+                nums.pop(index, None)
+        return UserAwardState(owned=self.owned, unlocked=unlocked, nums=MappingProxyType(nums))
@@ -1,14 +1,42 @@
+import threading
 from typing import List
 from framework.container.container_decorator import injectable
 from framework.database.db_decorator import readonly, transactional
 from framework.database.db_factory import get_db_session
 from framework.util.logger import setup_logger
 from incentive.domain.entity.award import Award
+from incentive.domain.service.award_catalog import AwardCatalog
 
 logger = setup_logger(__name__)
 
 @injectable
 class AwardService:
+    def __init__(self):
+        self._catalog = None
+        self._load_lock = threading.Lock()
+
     @readonly
     def query_award_list(self) -> List[Award]:
-        return get_db_session().query(Award).all()
\ No newline at end of file
+        return get_db_session().query(Award).all()
+
+    def get_catalog(self) -> AwardCatalog:
+        """
+        获取奖品目录，第一次使用时从数据库加载
+        """
+        catalog = self._catalog
+        if catalog is None:
+            with self._load_lock:
+                if self._catalog is None:
+                    self._catalog = AwardCatalog(self.query_award_list())
+                    logger.info(f"奖品目录已加载: 奖品数={len(self._catalog)}")
+                catalog = self._catalog
+        return catalog
+
+    def reload_catalog(self) -> AwardCatalog:
+        """
+        重新加载奖品目录（奖品表被修改后调用），正在使用旧目录的线程不受影响
+        """
+        with self._load_lock:
+            self._catalog = AwardCatalog(self.query_award_list())
+            logger.info(f"奖品目录已重新加载: 奖品数={len(self._catalog)}")
+            return self._catalog
@@ -1,5 +1,6 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from itertools import groupby
+from framework.cluster import shared_state
 from framework.database.db_decorator import transactional
 from incentive.domain.entity.user_word_bank_award import UserWordBankAward
 import numpy as np
@@ -24,8 +25,6 @@ class IncentiveService:
       self.user_word_bank_award_service = user_word_bank_award_service
       self.user_word_bank_profile_service = user_word_bank_profile_service
       self.study_app_service = study_app_service
-      # 记录当天是否已经发放过概率类奖品
-      self.probability_award_map: dict[str, bool] = {}
    @transactional
    def do_incentive(self,user_id:int,word_bank_id:int,memorized_ratio:float,slained_ratio:float) -> List[IncentiveResultDto]:
       """
@@ -113,6 +112,12 @@ class IncentiveService:
       else:
           return 5  # 武林至尊
 
+   def probability_award_state_key(self) -> str:
+      """
+      当天是否已发放过概率类奖品的共享状态键
+      """
+      return f"incentive:probability_award:{datetime.now().strftime('%Y-%m-%d')}"
+
    def compute_probability_award(self,user_id:int, word_bank_id:int, probability_award_list:List[UserWordBankAward],slained_ratio:float) -> Tuple[List[UserWordBankAward],List[IncentiveResultDto]]:
        probability_award_map = {award.name: award for award in probability_award_list} if probability_award_list else {}
        need_update_award_list = []
@@ -120,8 +125,9 @@ class IncentiveService:
        """
        根据概率计算概率类奖品
        """
-       # 如果当天已经发放过概率类奖品，则不触发概率类奖品
-       if self.probability_award_map.get(datetime.now().strftime('%Y-%m-%d'),False):
+       # 如果当天已经发放过概率类奖品，则不触发概率类奖品（记录在共享状态中，多个进程共享）
+       probability_award_key = self.probability_award_state_key()
+       if shared_state.get_state(probability_award_key,False):
           return None,None
        
        # 如果当天背词正确的记录没有超过设定数量，则不触发概率类奖品
@@ -146,11 +152,12 @@ class IncentiveService:
               normalized_probabilities = [p / total_prob for p in probabilities]
               # 根据概率随机选择一个奖品
               selected_award = np.random.choice(probability_award_list, p=normalized_probabilities)
+       # 原子地占用当天的概率类奖品名额，其他进程已经发放过时不再发放
+       if selected_award and not shared_state.try_claim(probability_award_key,ttl=timedelta(days=2)):
+          selected_award = None
        if selected_award:
           selected_award.is_unlocked = True
           selected_award.num += 1
-          # 使用当前日期作为key来记录概率奖品的发放情况
-          self.probability_award_map[datetime.now().strftime('%Y-%m-%d')] = True
           need_update_award_list.append(selected_award)
           result_list.append(IncentiveResultDto(
              award_type=selected_award.type,
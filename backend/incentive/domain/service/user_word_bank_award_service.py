@@ -1,105 +1,223 @@
-from typing import List
+import threading
+import time
+from itertools import groupby
+from types import MappingProxyType
+from typing import List, Optional, Tuple
+from sqlalchemy import event, text
+from framework.cache.lru_cache import LRUCache
+from framework.cluster.notifier import get_cluster_notifier
+from framework.config.config import settings
 from framework.container.container_decorator import injectable
 from framework.database.db_decorator import readonly, transactional
 from framework.database.db_factory import get_db_session
 from framework.util.logger import setup_logger
-from incentive.domain.entity.award import Award
 from incentive.domain.entity.user_word_bank_award import UserWordBankAward
+from incentive.domain.service.award_catalog import AwardCatalog, AwardInfo, UserAwardState
 from incentive.domain.service.award_service import AwardService
 
 logger = setup_logger(__name__)
 
+# 集群事件：用户词库奖品状态失效
+INVALIDATE_EVENT = "user_award_state.invalidate"
+
+# 用奖品表初始化用户词库奖品，已存在的用户奖品跳过
+INIT_USER_WORD_BANK_AWARD_SQL = """
+INSERT INTO zcg.t_user_word_bank_award (user_id, word_bank_id, award_id, num, is_unlocked)
+SELECT :user_id, :word_bank_id, a.id, 0, a.init_is_unlocked
+FROM zcg.t_award a
+ON CONFLICT (award_id, user_id, word_bank_id) DO NOTHING
+"""
+
+# 查询用户词库奖品状态，奖品信息从奖品目录中获取，不再关联奖品表
+QUERY_USER_AWARD_STATE_SQL = text("""
+SELECT award_id, num, is_unlocked FROM zcg.t_user_word_bank_award
+WHERE user_id = :user_id AND word_bank_id = :word_bank_id
+""")
+
+UPDATE_USER_WORD_BANK_AWARD_SQL = text("""
+UPDATE zcg.t_user_word_bank_award SET num = :num, is_unlocked = :is_unlocked
+WHERE award_id = :award_id AND user_id = :user_id AND word_bank_id = :word_bank_id
+""")
+
 @injectable
 class UserWordBankAwardService:
     def __init__(self,award_service:AwardService):
         self.award_service = award_service
-        
+        # 用户词库奖品状态缓存: {(user_id, word_bank_id): (奖品目录, 奖品状态, 加载时间)}
+        self._states = LRUCache(settings.INCENTIVE_AWARD_STATE_CACHE_SIZE)
+        # 缓存版本：每次失效时递增，并记录用户词库最后一次失效时的版本 {(user_id, word_bank_id): 版本}
+        # 从数据库加载不加锁，加载期间用户词库被失效过时不写入缓存，避免旧状态覆盖新状态
+        self._version = 0
+        self._invalidated_versions = {}
+        # 失效记录超过缓存容量时清空，清空前开始的加载都不写入缓存
+        self._invalidated_floor = 0
+        self._version_lock = threading.Lock()
+        # 多个进程时，其他进程中修改的奖品状态同步失效本进程的缓存
+        self._notifier = get_cluster_notifier()
+        self._notifier.subscribe(INVALIDATE_EVENT, self._handle_invalidate)
+
     @transactional
     def init_user_word_bank_award(self,user_id:int,word_bank_id:int) -> None:
         """
-        初始化用户奖品
+        初始化用户奖品：在数据库中直接用奖品表生成用户词库奖品
+        已有的用户奖品由唯一索引(award_id, user_id, word_bank_id)跳过，重复调用时只补充新增的奖品
         """
-        # 先判断之前有没有数据
-        user_word_bank_award = get_db_session().query(UserWordBankAward).filter(UserWordBankAward.user_id == user_id,UserWordBankAward.word_bank_id == word_bank_id).first()
-        if user_word_bank_award:
-            return
-        
-        # 没有数据，则初始化
-        award_list = self.award_service.query_award_list()
-        user_word_bank_award_list = []
-        for award in award_list:
-            user_award = UserWordBankAward(user_id=user_id,
-                                 word_bank_id=word_bank_id,
-                                 award_id=award.id,
-                                 num=0,
-                                 is_unlocked = award.init_is_unlocked
-                                 )
-            user_word_bank_award_list.append(user_award)
-        get_db_session().bulk_save_objects(user_word_bank_award_list)
+        insert_count = get_db_session().execute(text(INIT_USER_WORD_BANK_AWARD_SQL),
+                                                {"user_id": user_id, "word_bank_id": word_bank_id}).rowcount
+        if insert_count > 0:
+            self.invalidate(user_id,word_bank_id)
+        logger.info(f"初始化用户奖品: user_id={user_id}, word_bank_id={word_bank_id}, 新增奖品数={insert_count}")
+
+    def get_award_state(self,user_id:int,word_bank_id:int) -> Tuple[AwardCatalog,UserAwardState]:
+        """
+        获取用户词库奖品状态，缓存中没有或已过期时从数据库加载
+        return: (奖品目录, 奖品状态)，奖品状态中的位序号对应该目录
+        """
+        catalog = self.award_service.get_catalog()
+        key = (user_id,word_bank_id)
+        cached = self._states.get(key)
+        if cached is not None and cached[0] is catalog and time.time() - cached[2] < settings.INCENTIVE_AWARD_STATE_TTL_SECONDS:
+            return catalog,cached[1]
+        version = self._version
+        state = self._load_state(catalog,user_id,word_bank_id)
+        if state is None:
+            # 用户奖品中有目录里没有的奖品，奖品表已修改，重新加载目录
+            catalog = self.award_service.reload_catalog()
+            state = self._load_state(catalog,user_id,word_bank_id) or UserAwardState()
+        # 写事务中加载的状态可能包含未提交的修改，不写入缓存
+        if not self._in_transaction():
+            self._put_state(key,version,catalog,state)
+        return catalog,state
 
     @readonly
+    def _load_state(self,catalog:AwardCatalog,user_id:int,word_bank_id:int) -> Optional[UserAwardState]:
+        """
+        从数据库加载用户词库奖品状态，有目录中不存在的奖品时返回None
+        """
+        owned = unlocked = 0
+        nums = {}
+        for row in get_db_session().execute(QUERY_USER_AWARD_STATE_SQL, {"user_id": user_id, "word_bank_id": word_bank_id}):
+            index = catalog.index_by_id.get(row.award_id)
+            if index is None:
+                return None
+            owned |= 1 << index
+            if row.is_unlocked:
+                unlocked |= 1 << index
+            if row.num:
+                nums[index] = row.num
+        return UserAwardState(owned=owned,unlocked=unlocked,nums=MappingProxyType(nums))
+
     def query_user_word_bank_award_list(self,user_id:int,word_bank_id:int) -> List[UserWordBankAward]:
         """
-        查询用户词库奖品列表，包含奖品详细信息
-        """
-        result = (
-            get_db_session()
-            .query(
-                UserWordBankAward,
-                Award.name,
-                Award.description,
-                Award.image_path,
-                Award.video_path,
-                Award.algo_type,
-                Award.algo_value,
-                Award.type
-            )
-            .join(Award, UserWordBankAward.award_id == Award.id)
-            .filter(
-                UserWordBankAward.user_id == user_id,
-                UserWordBankAward.word_bank_id == word_bank_id
-            )
-            .order_by(Award.type,Award.id)
-            .all()
-        )
-    
-        user_word_bank_award_list = []
-        tiejian_unlocked = True
-        for user_word_bank_award,name,description,image_path,video_path,algo_type,algo_value,type in result:
-            user_word_bank_award.name = name
-            user_word_bank_award.description = description
-            user_word_bank_award.image_path = image_path
-            user_word_bank_award.video_path = video_path
-            user_word_bank_award.algo_type = algo_type
-            user_word_bank_award.algo_value = algo_value
-            user_word_bank_award.type = type
-            user_word_bank_award_list.append(user_word_bank_award)
-            # 特殊处理 如果铁剑未解锁，则玄衣用xuanyiwujian.jpg
-            if name == "铁剑":
-                tiejian_unlocked = user_word_bank_award.is_unlocked 
-            if name == "玄衣":
-                if not tiejian_unlocked:
-                    user_word_bank_award.image_path = "/images/armors/xuanyiwujian.jpg"
-
-        return user_word_bank_award_list
-    
-    
+        查询用户词库奖品列表，包含奖品详细信息（按奖品类型、奖品ID排序）
+        奖品信息来自奖品目录，用户奖品状态来自缓存，返回的对象不属于数据库会话，修改后通过update_user_word_bank_award_list保存
+        """
+        catalog,state = self.get_award_state(user_id,word_bank_id)
+        return [self._to_user_award(catalog,state,award,user_id,word_bank_id)
+                for award in catalog.awards if state.is_owned(award.index)]
+
+    def _to_user_award(self,catalog:AwardCatalog,state:UserAwardState,award:AwardInfo,user_id:int,word_bank_id:int) -> UserWordBankAward:
+        user_word_bank_award = UserWordBankAward(award_id=award.id,
+                                                 num=state.num(award.index),
+                                                 is_unlocked=state.is_unlocked(award.index),
+                                                 user_id=user_id,
+                                                 word_bank_id=word_bank_id)
+        user_word_bank_award.name = award.name
+        user_word_bank_award.description = award.description
+        user_word_bank_award.image_path = award.image_path
+        user_word_bank_award.video_path = award.video_path
+        user_word_bank_award.algo_type = award.algo_type
+        user_word_bank_award.algo_value = award.algo_value
+        user_word_bank_award.type = award.type
+        # 特殊处理 如果铁剑未解锁，则玄衣用xuanyiwujian.jpg
+        tiejian = catalog.by_name.get("铁剑")
+        if award.name == "玄衣" and tiejian is not None and not state.is_unlocked(tiejian.index):
+            user_word_bank_award.image_path = "/images/armors/xuanyiwujian.jpg"
+        return user_word_bank_award
+
     @transactional
     def update_user_word_bank_award_list(self,user_word_bank_award_list:List[UserWordBankAward]) -> None:
         """
-        更新用户词库奖品列表
+        更新用户词库奖品列表，按(award_id, user_id, word_bank_id)更新数量和解锁状态
+        同时写入奖品状态缓存：事务提交后缓存新的状态，提交前其他线程从数据库加载
         """
-        get_db_session().bulk_save_objects(user_word_bank_award_list)
-        get_db_session().commit()
-    
-    @readonly
+        if not user_word_bank_award_list:
+            return
+        session = get_db_session()
+        key_func = lambda award: (award.user_id, award.word_bank_id)
+        # 在更新前取修改前的状态，计算提交后的新状态
+        new_states = []
+        for (user_id,word_bank_id), awards in groupby(sorted(user_word_bank_award_list, key=key_func), key=key_func):
+            catalog,state = self.get_award_state(user_id,word_bank_id)
+            new_states.append(((user_id,word_bank_id), catalog,
+                               state.updated((catalog.index_by_id[award.award_id], award.is_unlocked, award.num)
+                                             for award in awards if award.award_id in catalog)))
+        session.execute(UPDATE_USER_WORD_BANK_AWARD_SQL, [
+            {"award_id": award.award_id, "user_id": award.user_id, "word_bank_id": award.word_bank_id,
+             "num": award.num, "is_unlocked": award.is_unlocked}
+            for award in user_word_bank_award_list])
+        for key, catalog, new_state in new_states:
+            version = self._invalidate_local(key)
+            self._notifier.publish(INVALIDATE_EVENT, {"user_id": key[0], "word_bank_id": key[1]})
+            event.listen(session, "after_commit",
+                         lambda *args, key=key, version=version, catalog=catalog, new_state=new_state:
+                         self._put_committed_state(key, version, catalog, new_state),
+                         once=True)
+
+    def _in_transaction(self) -> bool:
+        session = get_db_session()
+        return session is not None and not session.info.get('read_only')
+
+    def _put_state(self,key:Tuple[int,int],version:int,catalog:AwardCatalog,state:UserAwardState) -> None:
+        """加载开始（版本为version）之后用户词库没有被失效过时写入缓存"""
+        with self._version_lock:
+            if self._invalidated_versions.get(key, self._invalidated_floor) <= version:
+                self._states.put(key,(catalog,state,time.time()))
+
+    def _put_committed_state(self,key:Tuple[int,int],version:int,catalog:AwardCatalog,state:UserAwardState) -> None:
+        """
+        事务提交后写入新状态：更新后没有被其他事务失效过时写入缓存，
+        并递增版本，使提交前开始的加载（读到的是旧状态）不再写入缓存
+        """
+        with self._version_lock:
+            if self._invalidated_versions.get(key, self._invalidated_floor) != version:
+                return
+            self._invalidate_version(key)
+            self._states.put(key,(catalog,state,time.time()))
+
+    def _invalidate_version(self,key:Tuple[int,int]) -> int:
+        """递增版本并记录用户词库的失效版本，调用方持有_version_lock"""
+        self._version += 1
+        if len(self._invalidated_versions) >= max(settings.INCENTIVE_AWARD_STATE_CACHE_SIZE, 1):
+            self._invalidated_versions.clear()
+            self._invalidated_floor = self._version
+        self._invalidated_versions[key] = self._version
+        self._states.pop(key)
+        return self._version
+
+    def _invalidate_local(self,key:Tuple[int,int]) -> int:
+        with self._version_lock:
+            return self._invalidate_version(key)
+
+    def invalidate(self,user_id:int,word_bank_id:int) -> None:
+        """
+        使用户词库奖品状态缓存失效，并通知其他进程（在当前事务中发送，事务提交后其他进程才收到）
+        在写事务中调用时，事务提交后再失效一次，提交前加载的旧状态不会留在缓存中
+        """
+        key = (user_id,word_bank_id)
+        self._invalidate_local(key)
+        if self._in_transaction():
+            event.listen(get_db_session(), "after_commit", lambda *args: self._invalidate_local(key), once=True)
+        self._notifier.publish(INVALIDATE_EVENT, {"user_id": user_id, "word_bank_id": word_bank_id})
+
+    def _handle_invalidate(self, data: dict) -> None:
+        """处理其他进程中的奖品状态失效"""
+        self._invalidate_local((data["user_id"], data["word_bank_id"]))
+
     def query_user_word_bank_award_list_by_type(self,user_id:int,word_bank_id:int,award_type:int) -> List[UserWordBankAward]:
         """
-        根据类型查询用户词库奖品列表
+        根据类型查询用户词库奖品列表（按奖品ID排序）
         """
-        # 获取所有奖品列表，然后按类型过滤
-        all_awards = self.query_user_word_bank_award_list(user_id, word_bank_id)
-        filtered_awards = [award for award in all_awards if award.type == award_type]
-        # 按ID排序
-        filtered_awards.sort(key=lambda x: x.id)
-        return filtered_awards 
+        catalog,state = self.get_award_state(user_id,word_bank_id)
+        return [self._to_user_award(catalog,state,award,user_id,word_bank_id)
+                for award in catalog.by_type.get(award_type,()) if state.is_owned(award.index)]
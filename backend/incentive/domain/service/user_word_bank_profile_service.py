@@ -1,3 +1,6 @@
+from datetime import datetime
+from typing import Tuple
+from sqlalchemy import text
 from framework.container.container_decorator import injectable
 from framework.database.db_decorator import readonly, transactional
 from framework.database.db_factory import get_db_session
@@ -9,6 +12,37 @@ from incentive.enum.incentive_enums import AwardTypeEnum
 
 logger = setup_logger(__name__)
 
+# 按近一段时间的背词成功率批量调整士气值：一条语句完成统计和更新
+# 成功率 >= :increase_ratio 士气值加1，<= :decrease_ratio 士气值减1，返回加1和减1的用户词库数
+BULK_MORALE_UPDATE_SQL = """
+WITH updated AS (
+    UPDATE zcg.t_user_word_bank_profile p
+    SET morale_value = p.morale_value + d.increase_value
+    FROM (
+        SELECT user_id, word_bank_id,
+               CASE WHEN success_count >= total_count * CAST(:increase_ratio AS numeric) THEN 1
+                    WHEN success_count <= total_count * CAST(:decrease_ratio AS numeric) THEN -1
+                    ELSE 0
+               END AS increase_value
+        FROM (
+            SELECT user_id, word_bank_id,
+                   count(*) AS total_count,
+                   count(*) FILTER (WHERE study_result = 1) AS success_count
+            FROM zcg.t_user_study_record
+            WHERE record_time >= :since
+            GROUP BY user_id, word_bank_id
+        ) stats
+    ) d
+    WHERE p.user_id = d.user_id
+      AND p.word_bank_id = d.word_bank_id
+      AND d.increase_value <> 0
+    RETURNING d.increase_value
+)
+SELECT count(*) FILTER (WHERE increase_value > 0) AS increased_count,
+       count(*) FILTER (WHERE increase_value < 0) AS decreased_count
+FROM updated
+"""
+
 @injectable
 class UserWordBankProfileService:
     def __init__(self,user_word_bank_award_service:UserWordBankAwardService):
@@ -48,6 +82,19 @@ class UserWordBankProfileService:
         user_word_bank_profile.user_level = user_level
         get_db_session().commit()
     
+    @transactional
+    def bulk_update_morale_value(self,since:datetime,increase_ratio:float=0.8,decrease_ratio:float=0.7) -> Tuple[int,int]:
+        """
+        按since之后的背词成功率批量调整所有用户词库的士气值
+        return: (士气值加1的用户词库数, 士气值减1的用户词库数)
+        """
+        row = get_db_session().execute(text(BULK_MORALE_UPDATE_SQL), {
+            "since": since,
+            "increase_ratio": increase_ratio,
+            "decrease_ratio": decrease_ratio
+        }).first()
+        return row.increased_count, row.decreased_count
+
     @transactional
     def increase_morale_value(self,user_id:int,word_bank_id:int,increase_value:int) -> None:
         user_word_bank_profile = self.query_user_word_bank_profile(user_id,word_bank_id)
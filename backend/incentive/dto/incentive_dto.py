@@ -41,3 +41,12 @@ class IncentiveResultDto(BaseModel):
     award_name: str = Field(..., description="奖品名称")
     image_path: str = Field(..., description="奖品图片路径")
     video_path: Optional[str] = Field(default="", description="奖品视频路径")
+
+class IncentiveTicketResultDto(BaseModel):
+    """
+    延迟激励结果的数据传输对象
+    """
+    ticket: str = Field(..., description="激励票据")
+    status: str = Field(..., description="状态：pending 计算中；done 已完成；failed 计算失败")
+    award_list: List[IncentiveResultDto] = Field(default_factory=list, description="奖品列表")
+    merged_into: Optional[str] = Field(default=None, description="与同一用户的后续答题合并计算时，奖品在该票据的结果中返回")
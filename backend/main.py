@@ -11,6 +11,9 @@ from framework.exception.exception_handler import register_exception_handlers
 from framework.auth.auth import JWTBearer
 from framework.router.router_register import register_routers
 from framework.config.nltk_config import NLTKConfig
+from framework.util.word_forms_index import load_word_forms_index
+from framework.database.migration import run_migrations
+from framework.scheduler.job_scheduler import get_job_scheduler
 
 def create_app() -> FastAPI:
     """
@@ -18,6 +21,10 @@ def create_app() -> FastAPI:
     """
     # 初始化 NLTK
     NLTKConfig.init_nltk()
+    # 加载离线单词形式索引，避免首次*化时查询WordNet
+    load_word_forms_index()
+    # 执行(或检查)数据库迁移
+    run_migrations()
 
     app = FastAPI(
         title=settings.APP_NAME,
@@ -74,6 +81,9 @@ def create_app() -> FastAPI:
     # 执行启动时初始化
     startup_manager.initialize_all()
 
+    # 启动定时任务调度器（定时任务在启动时初始化的服务中注册）
+    get_job_scheduler().start()
+
     logger.info("应用启动成功！！！")
     return app
 
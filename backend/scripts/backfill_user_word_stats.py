@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+用户单词答题统计回填脚本
+根据学习记录重新计算 t_user_word 的答对次数、答错次数、第一次/最后一次答对时间
+
+用法:
+    cd backend
+    python scripts/backfill_user_word_stats.py                                 # 回填所有用户
+    python scripts/backfill_user_word_stats.py --user-id 1 --word-bank-id 2    # 只回填指定用户、词库
+"""
+import sys
+import os
+import time
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from framework.container.container import get_service
+from study.domain.service.study_service import StudyService
+
+def main():
+    """主函数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="用户单词答题统计回填工具")
+    parser.add_argument("--user-id", type=int, default=None, help="用户ID，默认所有用户")
+    parser.add_argument("--word-bank-id", type=int, default=None, help="词库ID，默认所有词库")
+
+    args = parser.parse_args()
+    start = time.time()
+    count = get_service(StudyService).backfill_word_study_stats(args.user_id, args.word_bank_id)
+    print(f"回填完成，更新用户单词数: {count}，耗时: {time.time() - start:.1f}秒")
+
+if __name__ == "__main__":
+    main()
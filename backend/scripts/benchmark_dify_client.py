@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Dify客户端压测脚本，配合 scripts/fake_dify_server.py 使用
+以相同的并发数发起短语判断请求，比较三种调用方式的吞吐量和延迟：
+    requests: 原实现，每次调用 requests.post 新建连接，没有超时和重试
+    同步客户端: DifyClient.run_workflow，在线程池中调用
+    异步客户端: DifyClient.run_workflow_async，在事件循环中并发调用
+
+用法:
+    cd backend
+    python scripts/fake_dify_server.py --latency 0.2 --failure-rate 0.05 &
+    python scripts/benchmark_dify_client.py --url http://127.0.0.1:8081/v1 --requests 500 --concurrency 20
+"""
+import sys
+import os
+import asyncio
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from framework.util.dify_client import DifyClient
+
+API_KEY = "app-benchmark"
+INPUTS = {"phrase_question": json.dumps({"question": "q", "correct_answer": "take off", "user_answer": "take off"})}
+
+
+def percentile(values: list, p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def legacy_call(url: str) -> None:
+    """原实现：每次新建连接"""
+    response = requests.post(url + "/workflows/run",
+                             headers={"Authorization": f"Bearer {API_KEY}", "Content-Type": "application/json"},
+                             json={"inputs": INPUTS, "response_mode": "blocking", "user": "benchmark"})
+    if response.status_code != 200:
+        raise RuntimeError(f"状态码: {response.status_code}")
+
+
+def run_threaded(func, total: int, concurrency: int) -> tuple:
+    """
+    在线程池中调用func，return: (总耗时, 每次调用耗时列表, 失败次数)
+    """
+    def timed(_):
+        start = time.perf_counter()
+        try:
+            func()
+            return time.perf_counter() - start, False
+        except Exception:
+            return time.perf_counter() - start, True
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(timed, range(total)))
+    return time.perf_counter() - start, [cost for cost, _ in results], sum(1 for _, failed in results if failed)
+
+
+async def run_async(client: DifyClient, total: int, concurrency: int) -> tuple:
+    """
+    在事件循环中并发调用异步客户端，return: (总耗时, 每次调用耗时列表, 失败次数)
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed():
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await client.run_workflow_async(API_KEY, INPUTS, "result")
+                return time.perf_counter() - start, False
+            except Exception:
+                return time.perf_counter() - start, True
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(timed() for _ in range(total)))
+    await client.aclose()
+    return time.perf_counter() - start, [cost for cost, _ in results], sum(1 for _, failed in results if failed)
+
+
+def print_row(name: str, total: int, result: tuple) -> None:
+    elapsed, costs, failed = result
+    print(f"{name:<14}{total / elapsed:>12.1f}{statistics.mean(costs) * 1000:>12.1f}"
+          f"{percentile(costs, 0.5) * 1000:>12.1f}{percentile(costs, 0.99) * 1000:>12.1f}{failed:>10}")
+
+
+def main():
+    """主函数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Dify客户端压测工具")
+    parser.add_argument("--url", default="http://127.0.0.1:8081/v1", help="Dify API地址")
+    parser.add_argument("--requests", type=int, default=500, help="每种方式的请求数")
+    parser.add_argument("--concurrency", type=int, default=20, help="并发数")
+    parser.add_argument("--max-retries", type=int, default=2, help="客户端重试次数")
+    parser.add_argument("--skip-legacy", action="store_true", help="不测试原实现")
+
+    args = parser.parse_args()
+
+    def new_client() -> DifyClient:
+        return DifyClient(base_url=args.url, user="benchmark", timeout=30, connect_timeout=5,
+                          max_retries=args.max_retries, retry_backoff=0.1, max_concurrency=args.concurrency)
+
+    print("=" * 72)
+    print(f"{'方式':<14}{'吞吐(次/秒)':>12}{'平均(ms)':>12}{'p50(ms)':>12}{'p99(ms)':>12}{'失败':>10}")
+    print("-" * 72)
+    if not args.skip_legacy:
+        print_row("requests", args.requests, run_threaded(lambda: legacy_call(args.url), args.requests, args.concurrency))
+    client = new_client()
+    print_row("同步客户端", args.requests,
+              run_threaded(lambda: client.run_workflow(API_KEY, INPUTS, "result"), args.requests, args.concurrency))
+    client.close()
+    print_row("异步客户端", args.requests, asyncio.run(run_async(new_client(), args.requests, args.concurrency)))
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+单词形式索引构建脚本
+离线计算词库(t_word)中每个单词的所有形式，生成紧凑的索引文件，
+服务启动时加载该索引，*化单词时无需再实时查询WordNet
+
+用法:
+    cd backend
+    python scripts/build_word_forms_index.py                      # 构建所有词库
+    python scripts/build_word_forms_index.py --word-bank-id 1     # 只构建指定词库，并合并到已有索引
+    python scripts/build_word_forms_index.py --rebuild            # 忽略已有索引，重新构建
+"""
+import sys
+import os
+import time
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from framework.config.config import settings
+from framework.config.nltk_config import NLTKConfig
+from framework.database.db_factory import engine
+from framework.util.word_forms_index import WordFormsIndex
+from framework.util.word_util import compute_word_forms
+from framework.util.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+def query_words(word_bank_ids=None) -> list:
+    """
+    查询词库中的所有单词
+    """
+    sql = "SELECT DISTINCT word FROM zcg.t_word"
+    params = {}
+    if word_bank_ids:
+        sql += " WHERE word_bank_id = ANY(:word_bank_ids)"
+        params["word_bank_ids"] = list(word_bank_ids)
+    with engine.connect() as connection:
+        return [row[0] for row in connection.execute(text(sql), params)]
+
+def build_index(word_bank_ids=None, output=None, rebuild=False) -> WordFormsIndex:
+    """
+    构建单词形式索引并保存
+    """
+    output = output or settings.WORD_FORMS_INDEX_PATH
+    NLTKConfig.init_nltk()
+
+    words = query_words(word_bank_ids)
+    print(f"待计算单词数: {len(words)}")
+
+    start = time.time()
+    index = WordFormsIndex.build(words, compute_word_forms)
+    print(f"单词形式计算完成，耗时: {time.time() - start:.1f}秒")
+
+    # 默认与已有索引合并，方便按词库增量构建
+    if not rebuild:
+        index = WordFormsIndex.load(output).merge(index)
+
+    index.save(output)
+    print(f"索引已保存: {output}，单词数: {len(index)}，文件大小: {os.path.getsize(output) / 1024:.1f}KB")
+    return index
+
+def main():
+    """主函数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="单词形式索引构建工具")
+    parser.add_argument("--word-bank-id", type=int, action="append", dest="word_bank_ids",
+                       help="词库ID，可重复指定，默认构建所有词库")
+    parser.add_argument("--output", default=None,
+                       help="索引文件路径，默认使用配置 WORD_FORMS_INDEX_PATH")
+    parser.add_argument("--rebuild", action="store_true",
+                       help="忽略已有索引，重新构建")
+
+    args = parser.parse_args()
+    build_index(args.word_bank_ids, args.output, args.rebuild)
+
+if __name__ == "__main__":
+    main()
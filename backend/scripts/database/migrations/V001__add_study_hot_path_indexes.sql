@@ -0,0 +1,32 @@
+-- migration: no-transaction
+-- 背单词热点查询的联合索引和表达式索引
+-- 使用 CONCURRENTLY 创建，建索引期间不阻塞学习记录的写入
+
+-- 答题时按单词查询正确的学习记录：(user_id, word_bank_id, word, study_result)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS t_user_study_record_user_bank_word_idx
+    ON zcg.t_user_study_record USING btree (user_id, word_bank_id, word, study_result);
+
+-- 学习记录列表、最近一小时统计：(user_id, word_bank_id, record_time)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS t_user_study_record_user_bank_time_idx
+    ON zcg.t_user_study_record USING btree (user_id, word_bank_id, record_time);
+
+-- 按日期查询当天/某天的学习记录：date(record_time)，record_time为不带时区的timestamp，可以建表达式索引
+CREATE INDEX CONCURRENTLY IF NOT EXISTS t_user_study_record_user_bank_date_idx
+    ON zcg.t_user_study_record USING btree (user_id, word_bank_id, date(record_time));
+
+-- 查询未答题的学习记录：record_time IS NULL，部分索引只包含少量未完成的记录
+CREATE INDEX CONCURRENTLY IF NOT EXISTS t_user_study_record_user_bank_open_idx
+    ON zcg.t_user_study_record USING btree (user_id, word_bank_id)
+    WHERE record_time IS NULL;
+
+-- 按单词查询、更新用户单词：(user_id, word_bank_id, word)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS t_user_word_user_bank_word_idx
+    ON zcg.t_user_word USING btree (user_id, word_bank_id, word);
+
+-- 按状态选词、统计各状态单词数：(user_id, word_bank_id, word_status)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS t_user_word_user_bank_status_idx
+    ON zcg.t_user_word USING btree (user_id, word_bank_id, word_status);
+
+-- 按单词查询单词详情：(word_bank_id, word)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS t_word_bank_word_idx
+    ON zcg.t_word USING btree (word_bank_id, word);
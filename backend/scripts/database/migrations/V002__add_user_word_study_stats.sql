@@ -0,0 +1,32 @@
+-- 用户单词答题统计：答对次数、答错次数、第一次/最后一次答对时间
+-- 答题时直接根据统计字段计算单词状态，无需扫描该单词的全部学习记录
+ALTER TABLE zcg.t_user_word ADD COLUMN IF NOT EXISTS correct_count int4 DEFAULT 0 NOT NULL;
+ALTER TABLE zcg.t_user_word ADD COLUMN IF NOT EXISTS incorrect_count int4 DEFAULT 0 NOT NULL;
+ALTER TABLE zcg.t_user_word ADD COLUMN IF NOT EXISTS first_correct_time timestamp NULL;
+ALTER TABLE zcg.t_user_word ADD COLUMN IF NOT EXISTS last_correct_time timestamp NULL;
+
+COMMENT ON COLUMN zcg.t_user_word.correct_count IS '答对次数';
+COMMENT ON COLUMN zcg.t_user_word.incorrect_count IS '答错次数';
+COMMENT ON COLUMN zcg.t_user_word.first_correct_time IS '第一次答对时间';
+COMMENT ON COLUMN zcg.t_user_word.last_correct_time IS '最后一次答对时间';
+
+-- 根据已有的学习记录回填统计字段
+-- 回填之后如需重新计算（如发布期间旧版本服务仍在写入），执行 scripts/backfill_user_word_stats.py
+UPDATE zcg.t_user_word uw
+SET correct_count = s.correct_count,
+    incorrect_count = s.incorrect_count,
+    first_correct_time = s.first_correct_time,
+    last_correct_time = s.last_correct_time
+FROM (
+    SELECT user_id, word_bank_id, word,
+           count(*) FILTER (WHERE study_result = 1) AS correct_count,
+           count(*) FILTER (WHERE study_result = 0) AS incorrect_count,
+           min(record_time) FILTER (WHERE study_result = 1) AS first_correct_time,
+           max(record_time) FILTER (WHERE study_result = 1) AS last_correct_time
+    FROM zcg.t_user_study_record
+    WHERE record_time IS NOT NULL
+    GROUP BY user_id, word_bank_id, word
+) s
+WHERE uw.user_id = s.user_id
+  AND uw.word_bank_id = s.word_bank_id
+  AND uw.word = s.word;
@@ -0,0 +1,39 @@
+-- 用户词库单词状态统计：各状态单词数和总词数
+-- 单词状态变化时增量维护，查询背词率、斩词率时无需再统计整个词库的用户单词
+CREATE TABLE IF NOT EXISTS zcg.t_user_word_bank_stat (
+    id bigserial NOT NULL, -- 主键
+    user_id int4 NOT NULL, -- 用户ID
+    word_bank_id int4 NOT NULL, -- 词库ID
+    wait_count int4 DEFAULT 0 NOT NULL, -- 待斩词数
+    slaining_count int4 DEFAULT 0 NOT NULL, -- 斩中词数
+    slain_count int4 DEFAULT 0 NOT NULL, -- 已斩词数
+    total_count int4 DEFAULT 0 NOT NULL, -- 总词数
+    updated_at timestamptz DEFAULT CURRENT_TIMESTAMP NULL,
+    CONSTRAINT t_user_word_bank_stat_pk PRIMARY KEY (id)
+);
+CREATE UNIQUE INDEX IF NOT EXISTS t_user_word_bank_stat_user_bank_idx ON zcg.t_user_word_bank_stat USING btree (user_id, word_bank_id);
+
+COMMENT ON TABLE zcg.t_user_word_bank_stat IS '用户词库单词状态统计';
+COMMENT ON COLUMN zcg.t_user_word_bank_stat.id IS '主键';
+COMMENT ON COLUMN zcg.t_user_word_bank_stat.user_id IS '用户ID';
+COMMENT ON COLUMN zcg.t_user_word_bank_stat.word_bank_id IS '词库ID';
+COMMENT ON COLUMN zcg.t_user_word_bank_stat.wait_count IS '待斩词数';
+COMMENT ON COLUMN zcg.t_user_word_bank_stat.slaining_count IS '斩中词数';
+COMMENT ON COLUMN zcg.t_user_word_bank_stat.slain_count IS '已斩词数';
+COMMENT ON COLUMN zcg.t_user_word_bank_stat.total_count IS '总词数';
+
+-- 根据已有的用户单词回填
+INSERT INTO zcg.t_user_word_bank_stat (user_id, word_bank_id, wait_count, slaining_count, slain_count, total_count)
+SELECT user_id, word_bank_id,
+       count(*) FILTER (WHERE word_status = 0),
+       count(*) FILTER (WHERE word_status = 1),
+       count(*) FILTER (WHERE word_status = 2),
+       count(*)
+FROM zcg.t_user_word
+GROUP BY user_id, word_bank_id
+ON CONFLICT (user_id, word_bank_id) DO UPDATE
+SET wait_count = EXCLUDED.wait_count,
+    slaining_count = EXCLUDED.slaining_count,
+    slain_count = EXCLUDED.slain_count,
+    total_count = EXCLUDED.total_count,
+    updated_at = CURRENT_TIMESTAMP;
@@ -0,0 +1,15 @@
+-- 用户单词间隔重复状态：复习间隔、难度系数、连续答对次数、下次复习时间
+ALTER TABLE zcg.t_user_word ADD COLUMN IF NOT EXISTS interval_days numeric(10, 4) DEFAULT 0 NOT NULL;
+ALTER TABLE zcg.t_user_word ADD COLUMN IF NOT EXISTS ease numeric(6, 4) DEFAULT 2.5 NOT NULL;
+ALTER TABLE zcg.t_user_word ADD COLUMN IF NOT EXISTS repetitions int4 DEFAULT 0 NOT NULL;
+ALTER TABLE zcg.t_user_word ADD COLUMN IF NOT EXISTS due_at timestamp NULL;
+
+COMMENT ON COLUMN zcg.t_user_word.interval_days IS '复习间隔（天），FSRS策略下为记忆稳定性';
+COMMENT ON COLUMN zcg.t_user_word.ease IS '难度系数，SM-2策略下为简易度，FSRS策略下为难度';
+COMMENT ON COLUMN zcg.t_user_word.repetitions IS '连续答对次数';
+COMMENT ON COLUMN zcg.t_user_word.due_at IS '下次复习时间，为空表示新词';
+
+-- 按到期时间选择待复习的单词
+CREATE INDEX IF NOT EXISTS t_user_word_user_bank_due_idx
+    ON zcg.t_user_word USING btree (user_id, word_bank_id, due_at)
+    WHERE word_status IN (0, 1);
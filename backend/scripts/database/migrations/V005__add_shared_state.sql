@@ -0,0 +1,16 @@
+-- 多进程共享状态：原先保存在各个进程内存中的状态（如当天是否已发放概率类奖品、定时任务在某个周期是否已执行），
+-- 改为保存在数据库中，多个gunicorn worker之间共享
+CREATE TABLE IF NOT EXISTS zcg.t_shared_state (
+    state_key varchar(255) NOT NULL, -- 状态键
+    state_value jsonb NULL, -- 状态值
+    expires_at timestamptz NULL, -- 过期时间，为空表示不过期
+    created_at timestamptz DEFAULT CURRENT_TIMESTAMP NULL,
+    updated_at timestamptz DEFAULT CURRENT_TIMESTAMP NULL,
+    CONSTRAINT t_shared_state_pk PRIMARY KEY (state_key)
+);
+CREATE INDEX IF NOT EXISTS t_shared_state_expires_at_idx ON zcg.t_shared_state USING btree (expires_at);
+
+COMMENT ON TABLE zcg.t_shared_state IS '多进程共享状态';
+COMMENT ON COLUMN zcg.t_shared_state.state_key IS '状态键';
+COMMENT ON COLUMN zcg.t_shared_state.state_value IS '状态值';
+COMMENT ON COLUMN zcg.t_shared_state.expires_at IS '过期时间，为空表示不过期';
@@ -0,0 +1,30 @@
+-- 定时任务执行状态：记录每个任务最近一次执行的计划时间、耗时、处理行数和结果，
+-- 进程重启后据此补跑错过的任务，多个进程之间共享
+CREATE TABLE IF NOT EXISTS zcg.t_job_run_state (
+    job_name varchar(128) NOT NULL, -- 任务名
+    last_scheduled_at timestamp NULL, -- 最近一次执行的计划时间
+    last_started_at timestamptz NULL, -- 最近一次开始执行时间
+    last_finished_at timestamptz NULL, -- 最近一次结束时间
+    last_success_at timestamptz NULL, -- 最近一次执行成功时间
+    last_status varchar(16) NULL, -- 最近一次执行结果：success、failed
+    last_duration_ms int4 NULL, -- 最近一次执行耗时（毫秒）
+    last_row_count int4 NULL, -- 最近一次处理的行数
+    last_error text NULL, -- 最近一次失败的错误信息
+    run_count int4 DEFAULT 0 NOT NULL, -- 累计执行次数
+    failure_count int4 DEFAULT 0 NOT NULL, -- 累计失败次数
+    updated_at timestamptz DEFAULT CURRENT_TIMESTAMP NULL,
+    CONSTRAINT t_job_run_state_pk PRIMARY KEY (job_name)
+);
+
+COMMENT ON TABLE zcg.t_job_run_state IS '定时任务执行状态';
+COMMENT ON COLUMN zcg.t_job_run_state.job_name IS '任务名';
+COMMENT ON COLUMN zcg.t_job_run_state.last_scheduled_at IS '最近一次执行的计划时间';
+COMMENT ON COLUMN zcg.t_job_run_state.last_started_at IS '最近一次开始执行时间';
+COMMENT ON COLUMN zcg.t_job_run_state.last_finished_at IS '最近一次结束时间';
+COMMENT ON COLUMN zcg.t_job_run_state.last_success_at IS '最近一次执行成功时间';
+COMMENT ON COLUMN zcg.t_job_run_state.last_status IS '最近一次执行结果：success、failed';
+COMMENT ON COLUMN zcg.t_job_run_state.last_duration_ms IS '最近一次执行耗时（毫秒）';
+COMMENT ON COLUMN zcg.t_job_run_state.last_row_count IS '最近一次处理的行数';
+COMMENT ON COLUMN zcg.t_job_run_state.last_error IS '最近一次失败的错误信息';
+COMMENT ON COLUMN zcg.t_job_run_state.run_count IS '累计执行次数';
+COMMENT ON COLUMN zcg.t_job_run_state.failure_count IS '累计失败次数';
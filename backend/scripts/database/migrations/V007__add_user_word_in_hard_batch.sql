@@ -0,0 +1,19 @@
+-- 用户单词是否已加入hard词批次，hard词批次定时任务据此增量处理，无需每次扫描所有hard词批次
+ALTER TABLE zcg.t_user_word ADD COLUMN IF NOT EXISTS in_hard_batch bool DEFAULT false NOT NULL;
+
+COMMENT ON COLUMN zcg.t_user_word.in_hard_batch IS '是否已加入hard词批次';
+
+-- 根据已有的hard词批次回填
+UPDATE zcg.t_user_word uw
+SET in_hard_batch = true
+FROM (
+    SELECT DISTINCT b.user_id, b.word_bank_id, w.item ->> 'word' AS word
+    FROM zcg.t_user_study_batch_record b
+    CROSS JOIN LATERAL json_array_elements(
+        CASE WHEN json_typeof(b.words::json) = 'array' THEN b.words::json ELSE '[]'::json END
+    ) AS w(item)
+    WHERE b.batch_no LIKE 'HW%'
+) hw
+WHERE uw.user_id = hw.user_id
+  AND uw.word_bank_id = hw.word_bank_id
+  AND uw.word = hw.word;
@@ -0,0 +1,4 @@
+-- migration: no-transaction
+-- 按用户词库和批次号查询学习批次（错词批次批量追加、hard词批次查询）：(user_id, word_bank_id, batch_no)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS t_user_study_batch_record_user_bank_batch_idx
+    ON zcg.t_user_study_batch_record USING btree (user_id, word_bank_id, batch_no);
@@ -0,0 +1,5 @@
+-- migration: no-transaction
+-- 按时间统计所有用户词库最近一段时间的学习记录（每小时士气值计算）：record_time
+-- 已有的 (user_id, word_bank_id, record_time) 索引只能用于单个用户词库
+CREATE INDEX CONCURRENTLY IF NOT EXISTS t_user_study_record_record_time_idx
+    ON zcg.t_user_study_record USING btree (record_time);
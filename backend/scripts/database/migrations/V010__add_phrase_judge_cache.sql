@@ -0,0 +1,21 @@
+-- 短语判题结果缓存：相同题目、正确答案和用户答案（忽略大小写和多余空白）的判题结果直接复用，不再调用Dify
+CREATE TABLE IF NOT EXISTS zcg.t_phrase_judge_cache (
+    cache_key varchar(64) NOT NULL, -- 缓存键：规范化后的题目、正确答案、用户答案的sha256
+    question text NULL, -- 题目（规范化后）
+    correct_answer text NULL, -- 正确答案（规范化后）
+    user_answer text NULL, -- 用户答案（规范化后）
+    is_correct bool NOT NULL, -- 判题结果
+    expires_at timestamptz NOT NULL, -- 过期时间
+    created_at timestamptz DEFAULT CURRENT_TIMESTAMP NULL,
+    updated_at timestamptz DEFAULT CURRENT_TIMESTAMP NULL,
+    CONSTRAINT t_phrase_judge_cache_pk PRIMARY KEY (cache_key)
+);
+CREATE INDEX IF NOT EXISTS t_phrase_judge_cache_expires_at_idx ON zcg.t_phrase_judge_cache USING btree (expires_at);
+
+COMMENT ON TABLE zcg.t_phrase_judge_cache IS '短语判题结果缓存';
+COMMENT ON COLUMN zcg.t_phrase_judge_cache.cache_key IS '缓存键：规范化后的题目、正确答案、用户答案的sha256';
+COMMENT ON COLUMN zcg.t_phrase_judge_cache.question IS '题目（规范化后）';
+COMMENT ON COLUMN zcg.t_phrase_judge_cache.correct_answer IS '正确答案（规范化后）';
+COMMENT ON COLUMN zcg.t_phrase_judge_cache.user_answer IS '用户答案（规范化后）';
+COMMENT ON COLUMN zcg.t_phrase_judge_cache.is_correct IS '判题结果';
+COMMENT ON COLUMN zcg.t_phrase_judge_cache.expires_at IS '过期时间';
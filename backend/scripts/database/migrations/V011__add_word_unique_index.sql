@@ -0,0 +1,9 @@
+-- 批量保存单词使用 INSERT ... ON CONFLICT (word_bank_id, word) DO UPDATE，需要 (word_bank_id, word) 唯一
+-- 先删除历史数据中重复的单词（保存单词时重复的记录会被同时更新，内容相同），保留ID最小的一条
+DELETE FROM zcg.t_word w
+USING zcg.t_word keep
+WHERE w.word_bank_id = keep.word_bank_id
+  AND w.word = keep.word
+  AND w.id > keep.id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS t_word_word_bank_id_word_uidx ON zcg.t_word USING btree (word_bank_id, word);
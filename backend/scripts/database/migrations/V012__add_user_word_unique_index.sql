@@ -0,0 +1,20 @@
+-- migration: no-transaction
+-- 切换词库时用一条 INSERT ... SELECT ... ON CONFLICT DO NOTHING 初始化用户单词，需要 (user_id, word_bank_id, word) 唯一
+-- 表较大，语句逐条在事务外执行，使用 CONCURRENTLY 建索引，不阻塞答题时对用户单词的更新
+
+-- 删除历史数据中重复的用户单词，保留答题次数最多的一条（相同时保留ID最小的一条）
+-- 删除后用户词库单词状态统计由定时校准任务修正
+DELETE FROM zcg.t_user_word uw
+USING (
+    SELECT id,
+           row_number() OVER (PARTITION BY user_id, word_bank_id, word
+                              ORDER BY correct_count + incorrect_count DESC, id) AS rn
+    FROM zcg.t_user_word
+) d
+WHERE uw.id = d.id AND d.rn > 1;
+
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS t_user_word_user_bank_word_uidx
+    ON zcg.t_user_word USING btree (user_id, word_bank_id, word);
+
+-- 唯一索引可以替代原来的 (user_id, word_bank_id, word) 普通索引
+DROP INDEX CONCURRENTLY IF EXISTS zcg.t_user_word_user_bank_word_idx;
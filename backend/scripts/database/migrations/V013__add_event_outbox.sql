@@ -0,0 +1,26 @@
+-- 事件发件箱：异步处理的事件在触发事件的事务中写入，事务提交后投递，处理成功后删除
+-- 进程崩溃时未处理完成的事件由定时任务重新投递
+CREATE TABLE IF NOT EXISTS zcg.t_event_outbox (
+    id bigserial NOT NULL, -- 主键
+    event_name varchar(64) NOT NULL, -- 事件名称
+    handler varchar(255) NOT NULL, -- 事件处理器
+    payload jsonb NOT NULL, -- 事件参数
+    status varchar(16) DEFAULT 'pending' NOT NULL, -- 状态：pending 待处理；failed 超过最大重试次数
+    attempts int4 DEFAULT 0 NOT NULL, -- 处理失败次数
+    last_error text NULL, -- 最后一次处理失败的错误信息
+    next_attempt_at timestamptz DEFAULT CURRENT_TIMESTAMP NOT NULL, -- 下次投递时间
+    created_at timestamptz DEFAULT CURRENT_TIMESTAMP NULL,
+    updated_at timestamptz DEFAULT CURRENT_TIMESTAMP NULL,
+    CONSTRAINT t_event_outbox_pk PRIMARY KEY (id)
+);
+CREATE INDEX IF NOT EXISTS t_event_outbox_status_next_attempt_idx ON zcg.t_event_outbox USING btree (status, next_attempt_at);
+
+COMMENT ON TABLE zcg.t_event_outbox IS '事件发件箱';
+COMMENT ON COLUMN zcg.t_event_outbox.id IS '主键';
+COMMENT ON COLUMN zcg.t_event_outbox.event_name IS '事件名称';
+COMMENT ON COLUMN zcg.t_event_outbox.handler IS '事件处理器';
+COMMENT ON COLUMN zcg.t_event_outbox.payload IS '事件参数';
+COMMENT ON COLUMN zcg.t_event_outbox.status IS '状态：pending 待处理；failed 超过最大重试次数';
+COMMENT ON COLUMN zcg.t_event_outbox.attempts IS '处理失败次数';
+COMMENT ON COLUMN zcg.t_event_outbox.last_error IS '最后一次处理失败的错误信息';
+COMMENT ON COLUMN zcg.t_event_outbox.next_attempt_at IS '下次投递时间';
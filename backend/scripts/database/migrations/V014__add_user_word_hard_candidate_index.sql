@@ -0,0 +1,6 @@
+-- migration: no-transaction
+-- hard词批次定时任务查询未加入批次的hard词（答错次数>=2且未加入批次），这类用户单词很少，使用部分索引
+-- 使用 CONCURRENTLY 创建，建索引期间不阻塞答题时对用户单词的更新
+CREATE INDEX CONCURRENTLY IF NOT EXISTS t_user_word_hard_candidate_idx
+    ON zcg.t_user_word USING btree (updated_at)
+    WHERE incorrect_count >= 2 AND NOT in_hard_batch;
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+本地模拟Dify服务，用于测试和压测Dify客户端，不需要真实的Dify和大模型
+实现 /v1/workflows/run 和 /v1/files/upload 两个接口，可以模拟响应延迟和失败
+
+    短语判断工作流（输入 phrase_question）: 用户答案与正确答案相同（忽略大小写和首尾空格）时判为正确
+    谚语工作流（无输入）: 返回固定的谚语列表
+    图片解析工作流（输入 dictionay_picture）: 返回空的单词列表
+
+用法:
+    cd backend
+    python scripts/fake_dify_server.py
+    python scripts/fake_dify_server.py --port 8081 --latency 0.3 --failure-rate 0.1
+    # 然后将 DIFY_API_URL 设置为 http://127.0.0.1:8081/v1
+"""
+import sys
+import os
+import asyncio
+import json
+import random
+import uuid
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+PROVERBS = [
+    {"proverb": "Practice makes perfect.", "chinese_exp": "熟能生巧。"},
+    {"proverb": "Where there is a will, there is a way.", "chinese_exp": "有志者事竟成。"},
+]
+
+
+def create_app(latency: float, jitter: float, failure_rate: float, failure_status: int) -> FastAPI:
+    """
+    创建模拟Dify服务
+    """
+    app = FastAPI(title="Fake Dify")
+    stats = {"workflow": 0, "upload": 0, "failed": 0}
+
+    async def simulate() -> JSONResponse:
+        """模拟延迟，按失败率返回错误响应"""
+        await asyncio.sleep(max(0.0, latency + random.uniform(-jitter, jitter)))
+        if random.random() < failure_rate:
+            stats["failed"] += 1
+            return JSONResponse(status_code=failure_status, content={"message": "模拟失败"})
+        return None
+
+    @app.post("/v1/workflows/run")
+    async def run_workflow(request: Request):
+        stats["workflow"] += 1
+        failure = await simulate()
+        if failure is not None:
+            return failure
+        body = await request.json()
+        inputs = body.get("inputs") or {}
+        if "phrase_question" in inputs:
+            question = json.loads(inputs["phrase_question"])
+            is_correct = (question.get("user_answer") or "").strip().lower() == (question.get("correct_answer") or "").strip().lower()
+            outputs = {"result": json.dumps({"is_correct": is_correct})}
+        elif "dictionay_picture" in inputs:
+            outputs = {"word_desc": "[]"}
+        else:
+            outputs = {"result": json.dumps(PROVERBS, ensure_ascii=False)}
+        return {"workflow_run_id": str(uuid.uuid4()), "data": {"status": "succeeded", "outputs": outputs}}
+
+    @app.post("/v1/files/upload")
+    async def upload_file():
+        stats["upload"] += 1
+        failure = await simulate()
+        if failure is not None:
+            return failure
+        return JSONResponse(status_code=201, content={"id": str(uuid.uuid4())})
+
+    @app.get("/v1/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+
+def main():
+    """主函数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="本地模拟Dify服务")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=8081, help="监听端口")
+    parser.add_argument("--latency", type=float, default=0.2, help="响应延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.05, help="响应延迟的随机波动（秒）")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="失败率（0~1）")
+    parser.add_argument("--failure-status", type=int, default=503, help="失败时返回的状态码")
+
+    args = parser.parse_args()
+    app = create_app(args.latency, args.jitter, args.failure_rate, args.failure_status)
+    print(f"模拟Dify服务: http://{args.host}:{args.port}/v1, 延迟: {args.latency}秒, 失败率: {args.failure_rate}")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
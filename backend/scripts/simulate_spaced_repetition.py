@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+间隔重复策略离线模拟脚本
+按(用户, 词库, 单词)回放 t_user_study_record 中的历史答题记录，用各个间隔重复策略计算到期时间，
+统计历史复习中有多少次发生在到期之前（按该策略本可以省掉）、到期后的复习回忆成功率等指标，用于比较策略
+
+用法:
+    cd backend
+    python scripts/simulate_spaced_repetition.py
+    python scripts/simulate_spaced_repetition.py --user-id 1 --word-bank-id 2
+    python scripts/simulate_spaced_repetition.py --policies sm2 fsrs --limit 1000000
+"""
+import sys
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Dict, List
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from framework.config.config import settings
+from study.domain.service.spaced_repetition_service import POLICIES, ReviewState, get_policy
+
+# 斩词要求第一次与最后一次答对的间隔超过30天，与 StudyService.decide_word_status 一致
+SLAIN_SPAN = timedelta(days=30)
+
+HISTORY_SQL = """
+SELECT user_id, word_bank_id, word, record_time, study_result
+FROM zcg.t_user_study_record
+WHERE record_time IS NOT NULL AND study_result IS NOT NULL {conditions}
+ORDER BY user_id, word_bank_id, word, record_time
+{limit}
+"""
+
+
+@dataclass
+class PolicyStats:
+    """单个策略的模拟结果"""
+    total: int = 0  # 复习总数
+    premature: int = 0  # 未到期就复习的次数
+    wasted: int = 0  # 未到期复习且答对的次数（按该策略本可以省掉）
+    due: int = 0  # 到期后复习的次数
+    due_correct: int = 0  # 到期后复习且答对的次数
+    overdue_days: List[float] = field(default_factory=list)  # 到期后复习时超出到期时间的天数
+    reviews_to_slain: List[int] = field(default_factory=list)  # 达到斩词条件（第一次与最后一次答对间隔超过30天）所需的有效复习次数
+
+
+def simulate_word(policy, records: List[tuple], stats: PolicyStats) -> None:
+    """
+    回放单个单词的答题记录
+    斩词条件与 StudyService.decide_word_status 一致：本次答对、答对次数大于1，且第一次与最后一次答对间隔超过30天，
+    第一次答对时间在答错后保留
+    """
+    state = ReviewState()
+    correct_count = 0
+    first_correct_time = None
+    effective_reviews = 0
+    slained = False
+    for record_time, study_result in records:
+        is_correct = study_result == 1
+        stats.total += 1
+        if state.due_at is not None and record_time < state.due_at:
+            stats.premature += 1
+            if is_correct:
+                # 按该策略不会安排这次复习，状态保持不变
+                stats.wasted += 1
+                continue
+        elif state.due_at is not None:
+            stats.due += 1
+            stats.due_correct += 1 if is_correct else 0
+            stats.overdue_days.append((record_time - state.due_at).total_seconds() / 86400)
+        effective_reviews += 1
+        state = policy.review(state, is_correct, record_time)
+        if is_correct:
+            correct_count += 1
+            first_correct_time = first_correct_time or record_time
+            if not slained and correct_count > 1 and record_time - first_correct_time > SLAIN_SPAN:
+                slained = True
+                stats.reviews_to_slain.append(effective_reviews)
+
+
+def load_history(engine, user_id: int, word_bank_id: int, limit: int) -> Dict[tuple, List[tuple]]:
+    """
+    加载历史答题记录，按(用户, 词库, 单词)分组
+    """
+    conditions = []
+    params = {}
+    if user_id is not None:
+        conditions.append("AND user_id = :user_id")
+        params["user_id"] = user_id
+    if word_bank_id is not None:
+        conditions.append("AND word_bank_id = :word_bank_id")
+        params["word_bank_id"] = word_bank_id
+    sql = HISTORY_SQL.format(conditions=" ".join(conditions), limit=f"LIMIT {int(limit)}" if limit else "")
+    history: Dict[tuple, List[tuple]] = {}
+    with engine.connect() as connection:
+        for row in connection.execute(text(sql), params):
+            history.setdefault((row.user_id, row.word_bank_id, row.word), []).append((row.record_time, row.study_result))
+    return history
+
+
+def print_report(results: Dict[str, PolicyStats], word_count: int) -> None:
+    """
+    打印各策略的对比结果
+    """
+    print("=" * 110)
+    print(f"单词数: {word_count}")
+    print(f"{'策略':<10}{'复习总数':>10}{'提前复习':>10}{'可省复习':>10}{'可省比例':>10}"
+          f"{'到期复习':>10}{'到期回忆率':>12}{'平均超期(天)':>14}{'斩词平均复习次数':>18}")
+    print("-" * 110)
+    for name, stats in results.items():
+        wasted_ratio = stats.wasted / stats.total if stats.total else 0
+        recall = stats.due_correct / stats.due if stats.due else 0
+        overdue = sum(stats.overdue_days) / len(stats.overdue_days) if stats.overdue_days else 0
+        to_slain = sum(stats.reviews_to_slain) / len(stats.reviews_to_slain) if stats.reviews_to_slain else 0
+        print(f"{name:<10}{stats.total:>10}{stats.premature:>10}{stats.wasted:>10}{wasted_ratio:>10.1%}"
+              f"{stats.due:>10}{recall:>12.1%}{overdue:>14.1f}{to_slain:>18.1f}")
+    print("=" * 110)
+    print("说明: 可省复习为按该策略未到期、且历史上答对的复习；到期回忆率越接近目标保持率(约90%)，间隔越合适")
+
+
+def main():
+    """主函数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="间隔重复策略离线模拟工具")
+    parser.add_argument("--dsn", default=settings.SQLALCHEMY_DATABASE_URI,
+                       help="数据库连接串，默认使用配置中的数据库")
+    parser.add_argument("--user-id", type=int, help="只回放指定用户的记录")
+    parser.add_argument("--word-bank-id", type=int, help="只回放指定词库的记录")
+    parser.add_argument("--policies", nargs="+", default=list(POLICIES), choices=list(POLICIES),
+                       help="参与比较的策略")
+    parser.add_argument("--limit", type=int, default=0, help="最多加载的记录数，0表示不限制")
+
+    args = parser.parse_args()
+    engine = create_engine(args.dsn, future=True)
+    try:
+        start = time.time()
+        history = load_history(engine, args.user_id, args.word_bank_id, args.limit)
+        print(f"加载历史记录完成，单词数: {len(history)}，耗时: {time.time() - start:.1f}秒")
+
+        results = {}
+        for name in args.policies:
+            policy = get_policy(name)
+            stats = PolicyStats()
+            for records in history.values():
+                simulate_word(policy, records, stats)
+            results[name] = stats
+        print_report(results, len(history))
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,10 @@
+from datetime import datetime, timedelta
 from typing import List
+from framework.cluster import shared_state
 from framework.container.container_decorator import injectable
+from framework.database.db_decorator import transactional
 from framework.startup.startup_manager import register_startup_service
-import schedule
-import time
-import threading
-from datetime import datetime
+from framework.scheduler.job_scheduler import get_job_scheduler
 from framework.util.logger import setup_logger
 from study.domain.entity.user_study_batch_record import UserStudyBatchRecord
 from study.domain.service.study_batch_record_service import StudyBatchRecordService
@@ -12,6 +12,15 @@ from study.domain.service.study_service import StudyService
 
 logger = setup_logger(__name__)
 
+# 已处理的学习记录ID水位线，保存在共享状态表中
+HARD_WORD_WATERMARK_KEY = "watermark:hard_word_batch_set"
+# 上次执行的开始时间，下次执行时同时处理之后修改过的用户单词（从批次中移除、水位线推进后重新提交答案）
+HARD_WORD_SINCE_KEY = "watermark:hard_word_batch_set:since"
+# 按修改时间查询时向前多查的分钟数，覆盖执行时尚未提交的事务
+HARD_WORD_SINCE_MARGIN_MINUTES = 10
+# 创建后超过该小时数仍未答题的学习记录视为已放弃，不再阻止水位线推进
+OPEN_STUDY_RECORD_HOURS = 24
+
 @injectable
 @register_startup_service
 class HardWordBatchSet:
@@ -20,48 +29,18 @@ class HardWordBatchSet:
     """
     
     def __init__(self, study_service: StudyService,study_batch_record_service: StudyBatchRecordService):
-        self._scheduler_thread = None
-        self._running = False
         self.study_service = study_service
         self.study_batch_record_service = study_batch_record_service
-        self._schedule = schedule.Scheduler()  # 独立调度器
-        self._start_scheduler()
-
-    def _start_scheduler(self):
-        """启动定时调度器"""
-        if self._scheduler_thread and self._scheduler_thread.is_alive():
-            return
-        
-        # 设置每小时的5分执行一次任务
-        self._schedule.every().hour.at(":05").do(self._hourly_task)
-        # self.schedule.every(30).seconds.do(self._hourly_task)
-        
-        # 启动调度器线程
-        self._running = True
-        self._scheduler_thread = threading.Thread(target=self._run_scheduler, daemon=True)
-        self._scheduler_thread.start()
-        
-        logger.info("hard词批次设置定时器已启动，每小时执行一次任务")
-
-    def _run_scheduler(self):
-        """运行调度器的线程函数"""
-        while self._running:
-            self._schedule.run_pending()
-            time.sleep(1)  # 每秒检查一次是否有待执行的任务
-
-    def _hourly_task(self):
-        """每小时执行的任务"""
-        try:
-            logger.info(f"hard词批次设置定时任务，时间: {datetime.now()}")
-            # 在这里添加具体的业务逻辑
-            self._process_hourly_business_logic()
-        except Exception as e:
-            logger.error(f"hard词批次设置定时任务执行失败: {e}")
+        # 每小时的5分执行一次
+        get_job_scheduler().register("hard_word_batch_set", "5 * * * *", self._process_hourly_business_logic)
 
+    @transactional
     def _process_hourly_business_logic(self):
         """
-        对每个user_id-word_bank_id的组合，做以下处理：
-          找到所有需要加入批次的hard词（所有的错词（>=2）- 已经加入批次的hard词）
+        增量处理上次执行之后新增的学习记录（学习记录ID大于水位线），第一次执行时处理所有用户单词：
+          找到新答错的、答错次数>=2且还未加入批次的hard词（答错次数在答题时维护在用户单词上，是否已加入批次也标记在用户单词上）
+          以及上次执行之后被修改过的未加入批次的hard词（从hard词批次中移除的单词、水位线推进后才重新提交答案的单词）
+        对每个有新hard词的user_id-word_bank_id的组合，做以下处理：
           找到未加满的那个批次
           if 不存在未加满的批次:
             生成新的批次，将词加入新的批次，然后保存
@@ -71,25 +50,24 @@ class HardWordBatchSet:
               则保存这个批次，注意状态 
             else:
               则生成新的批次，将词加入新的批次，然后保存
+        return: 保存的批次记录数
         """
         need_update_batch_record_list = []
         hard_word_batch_size = 15
-        u_w_tuple_list = self.study_service.query_user_id_word_bank_id_tuple_list()
-        for user_id, word_bank_id in u_w_tuple_list:
-            # 获取背错次数>=2的所有hard词
-            hard_word_list = self.study_service.get_hard_word_record_list(user_id,word_bank_id,fault_count=2)
-            # 获取所有已经加入批次的hard词
-            hard_word_in_batch = self.study_batch_record_service.get_all_hard_word_in_batch(user_id,word_bank_id)
-            # 计算需要加入批次的hard词
-            need_add_hard_word_list = []
-            if hard_word_in_batch:
-                need_add_hard_word_list = [word for word in hard_word_list if word not in hard_word_in_batch]
-            else:
-                need_add_hard_word_list = hard_word_list
-
-            if not need_add_hard_word_list:
-                logger.info(f"user_id: {user_id}, word_bank_id: {word_bank_id}, 没有需要加入批次的hard词")
-                continue
+        started_at = datetime.now().astimezone()
+        watermark = shared_state.get_state(HARD_WORD_WATERMARK_KEY)
+        since = shared_state.get_state(HARD_WORD_SINCE_KEY)
+        since = datetime.fromisoformat(since) - timedelta(minutes=HARD_WORD_SINCE_MARGIN_MINUTES) if since else None
+        upper_id = self.study_service.get_study_record_watermark(watermark or 0, OPEN_STUDY_RECORD_HOURS)
+        candidates = self.study_service.query_hard_word_candidates(2, watermark, upper_id, since)
+        logger.info(f"hard词批次增量处理，学习记录ID范围: ({watermark}, {upper_id}]，需要加入批次的hard词数: {len(candidates)}")
+        # 按用户词库分组，保持第一次背词时间的顺序
+        u_w_hard_word_map = {}
+        for user_id, word_bank_id, word in candidates:
+            hard_word_list = u_w_hard_word_map.setdefault((user_id, word_bank_id), [])
+            if word not in hard_word_list:
+                hard_word_list.append(word)
+        for (user_id, word_bank_id), need_add_hard_word_list in u_w_hard_word_map.items():
             logger.info(f"user_id: {user_id}, word_bank_id: {word_bank_id}, 需要加入批次的hard词: {need_add_hard_word_list}")
             # 找到最后的批次
             the_last_hard_word_batch = self.study_batch_record_service.get_the_last_hard_word_batch(user_id,word_bank_id)
@@ -106,17 +84,10 @@ class HardWordBatchSet:
                 need_update_batch_record_list.append(the_last_hard_word_batch)
                 new_batch_record_list = self.study_batch_record_service.add_word_to_batch_list(user_id,word_bank_id,remaining_word_list,hard_word_batch_size,init_seq_num)
                 need_update_batch_record_list.extend(new_batch_record_list)
+            self.study_batch_record_service.mark_in_hard_batch(user_id, word_bank_id, need_add_hard_word_list)
         # 批量处理批次记录        
-        self.study_batch_record_service.batch_process_record_list(need_update_batch_record_list)         
-
-    def stop_scheduler(self):
-        """停止定时调度器"""
-        self._running = False
-        if self._scheduler_thread:
-            self._scheduler_thread.join(timeout=5)  # 等待线程结束，最多等待5秒
-        self._schedule.clear()  # 清除所有定时任务
-        logger.info("hard词批次设置定时调度器已停止")
-
-    def __del__(self):
-        """析构函数，确保调度器被正确清理"""
-        self.stop_scheduler() 
\ No newline at end of file
+        self.study_batch_record_service.batch_process_record_list(need_update_batch_record_list)
+        # 与批次记录在同一个事务中推进水位线
+        shared_state.set_state(HARD_WORD_WATERMARK_KEY, upper_id)
+        shared_state.set_state(HARD_WORD_SINCE_KEY, started_at.isoformat())
+        return len(need_update_batch_record_list)
@@ -1,102 +1,107 @@
-from typing import List
-from framework.container.container_decorator import injectable
-from framework.startup.startup_manager import register_startup_service
-import schedule
-import time
+import atexit
 import threading
 from datetime import datetime
+from typing import Dict, List, Tuple
+from sqlalchemy import event
+from framework.cluster import shared_state
+from framework.container.container_decorator import injectable
+from framework.database.db_decorator import transactional
+from framework.database.db_factory import get_db_session
+from framework.startup.startup_manager import register_startup_service
+from framework.scheduler.job_scheduler import get_job_scheduler
+from framework.util.date_util import get_current_week_range_date_only
 from framework.util.logger import setup_logger
-from framework.util.date_util import get_current_week_range
-from study.domain.entity.user_study_batch_record import UserStudyBatchRecord
 from study.domain.service.study_batch_record_service import StudyBatchRecordService
 from study.domain.service.study_service import StudyService
 
 logger = setup_logger(__name__)
 
+# 补偿任务已处理的学习记录ID水位线，保存在共享状态表中
+INCORRECT_WORD_WATERMARK_KEY = "watermark:incorrect_word_batch_set"
+# 创建后超过该小时数仍未答题的学习记录视为已放弃，不再阻止水位线推进
+OPEN_STUDY_RECORD_HOURS = 24
+
 @injectable
 @register_startup_service
 class IncorrectWordBatchSet:
     """
-    错词批次设置定时器，定时将错词加入到错词批次里，方便后续学习
+    错词批次设置器，答错时将单词放入进程内缓冲，定时批量追加到本周的错词批次里，方便后续学习
+    本周没有答错的用户不产生任何开销
+    进程崩溃时缓冲中的错词会丢失，由补偿任务按学习记录ID水位线增量查询答错的记录重新追加（已在批次中的单词跳过）
     """
-    
-    def __init__(self, study_service: StudyService,study_batch_record_service: StudyBatchRecordService):
-        self._scheduler_thread = None
-        self._running = False
-        self.study_service = study_service
-        self.study_batch_record_service = study_batch_record_service
-        self._schedule = schedule.Scheduler()  # 独立调度器
-        self._start_scheduler()
 
-    def _start_scheduler(self):
-        """启动定时调度器"""
-        if self._scheduler_thread and self._scheduler_thread.is_alive():
-            return
-        
-        # 设置每5分钟执行一次任务
-        self._schedule.every(5).minutes.do(self._five_minutes_task)
-        
-        # 启动调度器线程
-        self._running = True
-        self._scheduler_thread = threading.Thread(target=self._run_scheduler, daemon=True)
-        self._scheduler_thread.start()
-        
-        logger.info("错词批次设置定时器已启动，每1分钟执行一次任务")
+    def __init__(self, study_batch_record_service: StudyBatchRecordService, study_service: StudyService):
+        self.study_batch_record_service = study_batch_record_service
+        self.study_service = study_service
+        # 待追加的错词: {批次号: {(user_id, word_bank_id): {word: None}}}，用dict保持答错的顺序并去重
+        self._pending: Dict[str, Dict[Tuple[int, int], Dict[str, None]]] = {}
+        self._lock = threading.Lock()
+        # 每分钟把本进程缓冲的错词追加到批次，每个进程各自执行
+        get_job_scheduler().register("incorrect_word_batch_flush", "* * * * *", self.flush, catch_up=False, cluster=False)
+        # 进程退出时追加剩余的错词
+        atexit.register(self.flush)
+        # 每10分钟补偿追加崩溃的进程中丢失的错词，集群中只有一个进程执行
+        get_job_scheduler().register("incorrect_word_batch_catch_up", "*/10 * * * *", self.catch_up, catch_up=False)
 
-    def _run_scheduler(self):
-        """运行调度器的线程函数"""
-        while self._running:
-            self._schedule.run_pending()
-            time.sleep(1)  # 每秒检查一次是否有待执行的任务
+    def enqueue(self, user_id: int, word_bank_id: int, word: str) -> None:
+        """
+        答错单词时调用，将单词加入本周错词批次的待追加缓冲
+        在答题事务中调用时，事务提交后才加入缓冲，事务回滚时不追加
+        """
+        session = get_db_session()
+        if session is not None and not session.info.get('read_only'):
+            event.listen(session, "after_commit", lambda *args: self._add(user_id, word_bank_id, word), once=True)
+        else:
+            self._add(user_id, word_bank_id, word)
 
-    def _five_minutes_task(self):
-        """每5分钟执行的任务"""
-        try:
-            logger.info(f"错词批次设置定时任务，时间: {datetime.now()}")
-            # 在这里添加具体的业务逻辑
-            self._process_hourly_business_logic()
-        except Exception as e:
-            logger.error(f"错词批次设置定时任务执行失败: {e}")
+    def _add(self, user_id: int, word_bank_id: int, word: str) -> None:
+        batch_no = self.study_batch_record_service.create_incorrect_word_batch_no()
+        with self._lock:
+            self._pending.setdefault(batch_no, {}).setdefault((user_id, word_bank_id), {})[word] = None
 
-    def _process_hourly_business_logic(self):
+    def flush(self) -> int:
         """
-        对每个user_id-word_bank_id的组合，做以下处理：
-          找到本周所有错词
-          找到本周的错词批次
-          if 本周错词批次不存在:
-            生成新的错词批次，将词加入新的批次，然后保存
-          else:
-            将未加入的错词加入错词批次，保存
+        将缓冲的错词批量追加到错词批次，追加失败时放回缓冲，下次重试
+        return: 追加的单词数
         """
-        start_time, end_time = get_current_week_range()
-        logger.info(f"错词批次处理开始，时间范围: {start_time} - {end_time}")
-        
-        u_w_tuple_list = self.study_service.query_user_id_word_bank_id_tuple_list()
-        logger.info(f"找到 {len(u_w_tuple_list)} 个用户-词库组合")
-        
-        for user_id, word_bank_id in u_w_tuple_list:
-            incorrect_word_list = self.study_service.get_incorrect_word_record_list(user_id, word_bank_id, start_time, end_time)
-            logger.info(f"用户 {user_id} 词库 {word_bank_id} 找到 {len(incorrect_word_list)} 个错词")
-            
-            this_week_batch = self.study_batch_record_service.get_this_week_incorrect_word_batch(user_id, word_bank_id)
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        append_count = 0
+        for batch_no, user_words in pending.items():
+            word_lists = {key: list(words) for key, words in user_words.items()}
+            try:
+                append_count += self.study_batch_record_service.append_incorrect_words(batch_no, word_lists)
+            except Exception as e:
+                logger.error(f"追加错词批次失败，下次重试: 批次: {batch_no}, 用户词库数: {len(word_lists)}, 错误: {e}")
+                self._requeue(batch_no, word_lists)
+        return append_count
 
-            if not this_week_batch:
-                if incorrect_word_list:
-                    logger.info(f"创建新的错词批次，包含 {len(incorrect_word_list)} 个错词")
-                    self.study_batch_record_service.create_incorrect_word_batch_record(user_id, word_bank_id, incorrect_word_list)
-            else:
-                if incorrect_word_list:
-                    self.study_batch_record_service.add_words_to_batch(incorrect_word_list, this_week_batch.id)
-      
-
-    def stop_scheduler(self):
-        """停止定时调度器"""
-        self._running = False
-        if self._scheduler_thread:
-            self._scheduler_thread.join(timeout=5)  # 等待线程结束，最多等待5秒
-        self._schedule.clear()  # 清除所有定时任务
-        logger.info("错词批次设置定时调度器已停止")
+    @transactional
+    def catch_up(self) -> int:
+        """
+        增量处理上次执行之后答错的学习记录，追加到答题时间所在周的错词批次，第一次执行时只处理本周的记录
+        return: 追加的单词数
+        """
+        watermark = shared_state.get_state(INCORRECT_WORD_WATERMARK_KEY)
+        since = None if watermark is not None else datetime.fromisoformat(get_current_week_range_date_only()[0])
+        upper_id = self.study_service.get_study_record_watermark(watermark or 0, OPEN_STUDY_RECORD_HOURS)
+        batches: Dict[str, Dict[Tuple[int, int], List[str]]] = {}
+        for user_id, word_bank_id, word, record_time in self.study_service.query_incorrect_words(watermark or 0, upper_id, since):
+            batch_no = self.study_batch_record_service.create_incorrect_word_batch_no(record_time)
+            batches.setdefault(batch_no, {}).setdefault((user_id, word_bank_id), []).append(word)
+        append_count = 0
+        for batch_no, user_words in batches.items():
+            append_count += self.study_batch_record_service.append_incorrect_words(batch_no, user_words)
+        # 与批次记录在同一个事务中推进水位线
+        shared_state.set_state(INCORRECT_WORD_WATERMARK_KEY, upper_id)
+        if append_count:
+            logger.info(f"错词批次补偿追加: 学习记录ID范围: ({watermark}, {upper_id}]，追加单词数: {append_count}")
+        return append_count
 
-    def __del__(self):
-        """析构函数，确保调度器被正确清理"""
-        self.stop_scheduler() 
\ No newline at end of file
+    def _requeue(self, batch_no: str, word_lists: Dict[Tuple[int, int], List[str]]) -> None:
+        with self._lock:
+            user_words = self._pending.setdefault(batch_no, {})
+            for key, words in word_lists.items():
+                merged = dict.fromkeys(words)
+                merged.update(user_words.get(key, {}))
+                user_words[key] = merged
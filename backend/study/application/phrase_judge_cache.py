@@ -0,0 +1,246 @@
+"""
+短语判题结果缓存，很多用户对同一道短语题会给出相同的答案，相同的判题直接复用结果，不再调用Dify（每次调用需要数秒）
+
+查找顺序：
+1. 规范化后用户答案等于正确答案：直接判为正确；用户答案为空：直接判为错误
+2. 进程内缓存，按规范化（忽略大小写和多余空白）后的答案匹配
+3. 数据库表 zcg.t_phrase_judge_cache，多进程共享、重启后仍有效；未开启ASYNC_DB_ENABLED时异步接口也使用同步数据库（在业务线程池中执行）
+"""
+import hashlib
+import json
+import threading
+import time
+import unicodedata
+from typing import Optional, Tuple
+from sqlalchemy import text
+from framework.cache.lru_cache import LRUCache
+from framework.concurrency.executor import run_sync
+from framework.config.config import settings
+from framework.container.container_decorator import injectable
+from framework.database.async_db_decorator import async_readonly, async_transactional
+from framework.database.async_db_factory import get_async_db_session
+from framework.database.db_decorator import readonly, transactional
+from framework.database.db_factory import get_db_session
+from framework.monitor.cache_stats import register_cache_stats
+from framework.scheduler.job_scheduler import get_job_scheduler
+from framework.startup.startup_manager import register_startup_service
+from framework.util.logger import setup_logger
+from study.dto.study_dto import AnswerInfoItem
+
+logger = setup_logger(__name__)
+
+QUERY_SQL = text("""
+SELECT is_correct FROM zcg.t_phrase_judge_cache
+WHERE cache_key = :cache_key AND expires_at > now()
+""")
+
+SAVE_SQL = text("""
+INSERT INTO zcg.t_phrase_judge_cache (cache_key, question, correct_answer, user_answer, is_correct, expires_at)
+VALUES (:cache_key, :question, :correct_answer, :user_answer, :is_correct, now() + CAST(:ttl AS interval))
+ON CONFLICT (cache_key) DO UPDATE
+SET is_correct = EXCLUDED.is_correct, expires_at = EXCLUDED.expires_at, updated_at = now()
+""")
+
+PURGE_SQL = text("DELETE FROM zcg.t_phrase_judge_cache WHERE expires_at <= now()")
+
+
+def normalize_answer(value: Optional[str]) -> str:
+    """
+    规范化答案：全角转半角、忽略大小写、去掉首尾空白并将连续空白合并为一个空格
+    """
+    if not value:
+        return ""
+    return " ".join(unicodedata.normalize("NFKC", value).casefold().split())
+
+
+class PhraseJudgeKey:
+    """
+    短语判题的缓存键
+    """
+
+    def __init__(self, phrase: AnswerInfoItem):
+        self.question = normalize_answer(phrase.question)
+        self.correct_answer = normalize_answer(phrase.correct_answer)
+        self.user_answer = normalize_answer(phrase.user_answer)
+        payload = json.dumps([self.question, self.correct_answer, self.user_answer], ensure_ascii=False)
+        self.cache_key = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def trivial_result(self) -> Optional[bool]:
+        """
+        不需要调用Dify就能判定的结果：用户答案为空时错误，与正确答案相同时正确，其他情况返回None
+        """
+        if not self.user_answer:
+            return False
+        if self.user_answer == self.correct_answer:
+            return True
+        return None
+
+
+@injectable
+@register_startup_service
+class PhraseJudgeCache:
+    """
+    短语判题结果缓存
+
+    使用方式:
+    key = PhraseJudgeKey(phrase)
+    is_correct = phrase_judge_cache.get(key)
+    if is_correct is None:
+        is_correct = ... # 调用Dify判题
+        phrase_judge_cache.put(key, is_correct)
+    """
+
+    def __init__(self):
+        self.ttl_seconds = settings.PHRASE_JUDGE_CACHE_TTL_HOURS * 3600
+        self.persist = settings.PHRASE_JUDGE_CACHE_PERSIST
+        # 缓存值为(判题结果, 缓存时间)
+        self._cache = LRUCache(settings.PHRASE_JUDGE_CACHE_SIZE)
+        self._lock = threading.Lock()
+        self._counts = {"requests": 0, "trivial": 0, "local_hits": 0, "db_hits": 0, "misses": 0}
+        # 命中率等指标通过健康检查接口 /hc/caches 查看
+        register_cache_stats("phrase_judge", self.stats)
+        if self.persist:
+            # 每天凌晨清理数据库中过期的判题结果
+            get_job_scheduler().register("phrase_judge_cache_purge", "40 3 * * *", self.purge_expired)
+        logger.info(f"短语判题结果缓存已初始化: max_size={settings.PHRASE_JUDGE_CACHE_SIZE}, "
+                    f"ttl_hours={settings.PHRASE_JUDGE_CACHE_TTL_HOURS}, persist={self.persist}")
+
+    def get(self, key: PhraseJudgeKey) -> Optional[bool]:
+        """
+        获取判题结果，未命中时返回None，调用方需要调用Dify判题后调用put保存结果
+        """
+        result = self._get_local(key)
+        if result is None and self.persist:
+            try:
+                result = self._get_db(key, self._query_db(key.cache_key))
+            except Exception as e:
+                logger.warning(f"查询短语判题结果失败: {e}")
+        return result
+
+    async def get_async(self, key: PhraseJudgeKey) -> Optional[bool]:
+        """
+        获取判题结果（异步），未命中时返回None
+        """
+        result = self._get_local(key)
+        if result is None and self.persist:
+            try:
+                if settings.ASYNC_DB_ENABLED:
+                    result = self._get_db(key, await self._query_db_async(key.cache_key))
+                else:
+                    result = self._get_db(key, await run_sync(self._query_db, key.cache_key))
+            except Exception as e:
+                logger.warning(f"查询短语判题结果失败: {e}")
+        return result
+
+    def put(self, key: PhraseJudgeKey, is_correct: bool) -> None:
+        """
+        保存Dify的判题结果，保存到数据库失败时只记录日志，不影响判题
+        """
+        self._put_local(key, is_correct)
+        if self.persist:
+            try:
+                self._save_db(key, is_correct)
+            except Exception as e:
+                logger.warning(f"保存短语判题结果失败: {e}")
+
+    async def put_async(self, key: PhraseJudgeKey, is_correct: bool) -> None:
+        """
+        保存Dify的判题结果（异步）
+        """
+        self._put_local(key, is_correct)
+        if self.persist:
+            try:
+                if settings.ASYNC_DB_ENABLED:
+                    await self._save_db_async(key, is_correct)
+                else:
+                    await run_sync(self._save_db, key, is_correct)
+            except Exception as e:
+                logger.warning(f"保存短语判题结果失败: {e}")
+
+    def purge_expired(self) -> int:
+        """
+        删除数据库中过期的判题结果，返回删除的条数
+        """
+        purge_count = self._purge_db()
+        logger.info(f"短语判题结果缓存统计: {self.stats()}, 清理过期结果: {purge_count}条")
+        return purge_count
+
+    def _get_local(self, key: PhraseJudgeKey) -> Optional[bool]:
+        self._count("requests")
+        result = key.trivial_result()
+        if result is not None:
+            self._count("trivial")
+            return result
+        cached = self._get_cached(key.cache_key)
+        if cached is not None:
+            self._count("local_hits")
+            return cached[0]
+        if not self.persist:
+            self._count("misses")
+        return None
+
+    def _get_db(self, key: PhraseJudgeKey, result: Optional[bool]) -> Optional[bool]:
+        if result is None:
+            self._count("misses")
+            return None
+        self._count("db_hits")
+        self._put_local(key, result)
+        return result
+
+    def _get_cached(self, cache_key: str) -> Optional[Tuple[bool, float]]:
+        cached = self._cache.get(cache_key)
+        if cached is None:
+            return None
+        if time.time() - cached[1] >= self.ttl_seconds:
+            self._cache.pop(cache_key)
+            return None
+        return cached
+
+    def _put_local(self, key: PhraseJudgeKey, is_correct: bool) -> None:
+        self._cache.put(key.cache_key, (is_correct, time.time()))
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] += 1
+
+    def _save_params(self, key: PhraseJudgeKey, is_correct: bool) -> dict:
+        return {
+            "cache_key": key.cache_key,
+            "question": key.question,
+            "correct_answer": key.correct_answer,
+            "user_answer": key.user_answer,
+            "is_correct": is_correct,
+            "ttl": f"{self.ttl_seconds} seconds"
+        }
+
+    @readonly
+    def _query_db(self, cache_key: str) -> Optional[bool]:
+        return get_db_session().execute(QUERY_SQL, {"cache_key": cache_key}).scalar()
+
+    @async_readonly
+    async def _query_db_async(self, cache_key: str) -> Optional[bool]:
+        result = await get_async_db_session().execute(QUERY_SQL, {"cache_key": cache_key})
+        return result.scalar()
+
+    @transactional
+    def _save_db(self, key: PhraseJudgeKey, is_correct: bool) -> None:
+        get_db_session().execute(SAVE_SQL, self._save_params(key, is_correct))
+
+    @async_transactional
+    async def _save_db_async(self, key: PhraseJudgeKey, is_correct: bool) -> None:
+        await get_async_db_session().execute(SAVE_SQL, self._save_params(key, is_correct))
+
+    @transactional
+    def _purge_db(self) -> int:
+        return get_db_session().execute(PURGE_SQL).rowcount
+
+    def stats(self) -> dict:
+        """
+        获取缓存统计信息，命中率 = (直接判定 + 进程内命中 + 数据库命中) / 请求数
+        """
+        with self._lock:
+            counts = dict(self._counts)
+        hits = counts["trivial"] + counts["local_hits"] + counts["db_hits"]
+        counts["size"] = len(self._cache)
+        counts["hit_rate"] = round(hits / counts["requests"], 4) if counts["requests"] else 0.0
+        return counts
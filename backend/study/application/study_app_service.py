@@ -1,10 +1,20 @@
+import uuid
+from datetime import datetime
 from itertools import groupby
 from enum import Enum
-from typing import List, Tuple
+from typing import List, Optional, Tuple
+from framework.concurrency.executor import run_sync
+from framework.config.config import settings
 from framework.container.container_decorator import injectable
+from framework.database.async_db_decorator import async_transactional
 from framework.database.db_decorator import readonly, transactional
 from framework.events.event_bus import get_event_bus
 from study.application.charts_dto_builder import ChartsDtoBuilder
+from study.application.incorrect_batch_set import IncorrectWordBatchSet
+from study.application.phrase_judge_cache import PhraseJudgeCache, PhraseJudgeKey
+from study.application.study_task_prefetcher import StudyTaskPrefetcher
+from study.application.word_card_cache import WordCardCache
+from study.domain.service.spaced_repetition_service import SpacedRepetitionService
 from study.domain.service.study_batch_record_service import StudyBatchRecordService
 from study.domain.service.study_service import StudyService
 from study.domain.service.user_word_service import UserWordService
@@ -12,7 +22,7 @@ from study.dto.bar_charts_dto import BarChartDto
 from study.dto.pie_charts_dto import PieChartsDto
 from study.dto.study_dto import AnswerInfoDto, AnswerInfoItem, AnswerResponse, HardWordDto, JudgePhraseResponse, StudyRecordDto, StudyRecordItemDto, UserFlagsSetDto, UserWordDto, UserWordStatusStatsDto, WordTaskInfoDto, WordItemDto
 from study.dto.word_info_dto import InflectionListDto, WordInfoDto
-from study.enums.study_enums import InflectionTypeEnum, StudyResultEnum, UserWordStatusEnum
+from study.enums.study_enums import InflectionTypeEnum, StudyResultEnum, UserWordStatusEnum, WordMaskModeEnum
 from user.application.user_app_service import UserAppService
 from framework.util.oo_converter import orm_to_dto, orm_to_dto_list
 from framework.util.logger import setup_logger
@@ -22,12 +32,17 @@ logger = setup_logger(__name__)
 
 @injectable
 class StudyAppService:
-    def __init__(self,user_word_service:UserWordService,word_app_service:WordAppService,study_service:StudyService,user_app_service:UserAppService,study_batch_record_service:StudyBatchRecordService):
+    def __init__(self,user_word_service:UserWordService,word_app_service:WordAppService,study_service:StudyService,user_app_service:UserAppService,study_batch_record_service:StudyBatchRecordService,word_card_cache:WordCardCache,spaced_repetition_service:SpacedRepetitionService,study_task_prefetcher:StudyTaskPrefetcher,incorrect_word_batch_set:IncorrectWordBatchSet,phrase_judge_cache:PhraseJudgeCache):
         self.user_word_service = user_word_service
         self.word_app_service = word_app_service
         self.study_service = study_service
         self.user_app_service = user_app_service
         self.study_batch_record_service = study_batch_record_service
+        self.word_card_cache = word_card_cache
+        self.spaced_repetition_service = spaced_repetition_service
+        self.study_task_prefetcher = study_task_prefetcher
+        self.incorrect_word_batch_set = incorrect_word_batch_set
+        self.phrase_judge_cache = phrase_judge_cache
         self.event_bus = get_event_bus()
     @transactional
     def switch_word_bank(self,user_id:int,word_bank_id:int) -> None:
@@ -38,7 +53,7 @@ class StudyAppService:
         self.user_app_service.update_user_current_word_bank_id(user_id,word_bank_id)
         # 初始化用户单词
         self.user_word_service.init_user_word(user_id,word_bank_id)
-        # 触发词库切换事件，让激励模块异步初始化
+        # 触发词库切换事件，让激励模块初始化
         self.event_bus.trigger_word_bank_switched(user_id, word_bank_id)
     
     @transactional    
@@ -91,11 +106,12 @@ class StudyAppService:
                 
                 # 如果有选中的单词，返回学习任务
                 if selected_word:
-                    word_entity = self.word_app_service.query_word_info(selected_word,word_bank_id)
+                    word_info = self.word_card_cache.get_word_card(selected_word,word_bank_id,WordMaskModeEnum.BATTLE)
+                    # 后台预取批次中接下来的单词
+                    self.study_task_prefetcher.prefetch_words(word_bank_id,
+                        (word.word for word in words if not word.is_memorized and word.word not in today_study_word_set))
                     # 生成学习记录信息
-                    task_id = self.study_service.create_study_record(user_id,word_bank_id,word_entity.word)
-                    word_info = orm_to_dto(word_entity,WordInfoDto)
-                    word_info.mask_word(is_for_battle=True)
+                    task_id = self.study_service.create_study_record(user_id,word_bank_id,selected_word)
                     return WordTaskInfoDto(is_completed=False,
                         task_id=task_id,
                         word_info=word_info)
@@ -109,13 +125,13 @@ class StudyAppService:
         """
         # 本次学习的序列号
         task_id = None
-        # 本次学习的单词详情
-        word_entity = None
+        # 本次学习的单词
+        word = None
         # 查询 有无 record_time字段为空的学习记录
         query_empty_study_record = self.study_service.query_empty_study_record(user_id,word_bank_id)
         #第一种情况：有空的学习记录
         if query_empty_study_record is not None:
-            word_entity = self.word_app_service.query_word_info(query_empty_study_record.word,word_bank_id)
+            word = query_empty_study_record.word
             task_id = query_empty_study_record.seq_id
         else:
             # 第二种情况：没有空的学习记录,选一个新的单词
@@ -126,21 +142,114 @@ class StudyAppService:
             # 单词不存在，应该是当天已经学习过了，则直接返回空
             if user_word is None:
                 return WordTaskInfoDto(is_completed=False)
-            word_entity = self.word_app_service.query_word_info(user_word.word,word_bank_id)
+            word = user_word.word
             # 生成学习记录信息
-            task_id = self.study_service.create_study_record(user_id,word_bank_id,word_entity.word)
+            task_id = self.study_service.create_study_record(user_id,word_bank_id,word)
 
         # word_entity = self.word_app_service.query_word_info('thing',1)
         # # 生成学习记录信息
         # task_id = self.study_service.create_study_record(user_id,1,'thing')    
-        # 组装dto
-        word_info = orm_to_dto(word_entity,WordInfoDto)
-        word_info.mask_word(is_for_battle=True)
+        # 从单词卡片缓存中获取*化后的单词详情
+        word_info = self.word_card_cache.get_word_card(word,word_bank_id,WordMaskModeEnum.BATTLE)
+        # 用户答当前单词时，后台预取接下来的单词
+        self.study_task_prefetcher.prefetch(user_id,word_bank_id,flag,current_word=word)
 
         return WordTaskInfoDto(is_completed=False,
                         task_id=task_id,
                         word_info=word_info)
     
+    async def get_word_task_info_async(self,user_id:int,word_bank_id:int,batch_id:int,flag:str=None) -> WordTaskInfoDto:
+        """
+        获取单词学习任务信息（异步数据库）
+        普通背单词走异步数据库，选词和取卡片优先命中内存，未命中时才派发到业务线程池；
+        批次背单词仍走同步实现
+        """
+        if batch_id is not None:
+            return await run_sync(self.get_word_task_info,user_id,word_bank_id,batch_id,flag)
+        return await self._origin_get_word_task_info_async(user_id,word_bank_id,flag)
+
+    @async_transactional
+    async def _origin_get_word_task_info_async(self,user_id:int,word_bank_id:int,flag:str=None) -> WordTaskInfoDto:
+        """
+        获取单词学习任务信息（异步数据库），逻辑与 _origin_get_word_task_info 一致
+        """
+        query_empty_study_record = await self.study_service.query_empty_study_record_async(user_id,word_bank_id)
+        if query_empty_study_record is not None:
+            word = query_empty_study_record.word
+            task_id = query_empty_study_record.seq_id
+        else:
+            user_word,is_completed = await self._select_user_word_for_study_async(user_id,word_bank_id,flag)
+            if is_completed:
+                return WordTaskInfoDto(is_completed=True)
+            if user_word is None:
+                return WordTaskInfoDto(is_completed=False)
+            word = user_word.word
+            task_id = await self.study_service.create_study_record_async(user_id,word_bank_id,word)
+
+        word_info = self.word_card_cache.get_cached_word_card(word,word_bank_id,WordMaskModeEnum.BATTLE)
+        if word_info is None:
+            word_info = await run_sync(self.word_card_cache.get_word_card,word,word_bank_id,WordMaskModeEnum.BATTLE)
+        self.study_task_prefetcher.prefetch(user_id,word_bank_id,flag,current_word=word)
+
+        return WordTaskInfoDto(is_completed=False,
+                        task_id=task_id,
+                        word_info=word_info)
+
+    async def _select_user_word_for_study_async(self,user_id:int,word_bank_id:int,flag:str=None):
+        """
+        选词：调度器已加载时直接在内存中选择，否则派发到业务线程池加载
+        """
+        scheduler_service = self.user_word_service.study_scheduler_service
+        if settings.STUDY_SCHEDULER_ENABLED and scheduler_service.get_cached_scheduler(user_id,word_bank_id) is not None:
+            return self.user_word_service.select_user_word_for_study(user_id,word_bank_id,flag)
+        return await run_sync(self.user_word_service.select_user_word_for_study,user_id,word_bank_id,flag)
+
+    async def process_answer_info_async(self,user_id:int,word_bank_id:int,answer_info:AnswerInfoDto) -> AnswerResponse:
+        """
+        处理答题信息（异步数据库）
+        答题提交、间隔重复状态和背词率在一个异步事务中完成；
+        激励模块的事件处理仍是同步实现，在事务提交后派发到业务线程池触发，最多等待EVENT_REPLY_TIMEOUT_SECONDS秒
+        """
+        import time
+        total_start = time.time()
+        word_status,due_at,memorized_ratio,slained_ratio = await self._submit_answer_async(user_id,word_bank_id,answer_info)
+        # 异步事务已提交，更新背单词调度器并通知其他进程
+        self.user_word_service.study_scheduler_service.on_word_answered(user_id,word_bank_id,answer_info.word,word_status,due_at=due_at)
+
+        award_list = []
+        incentive_ticket = None
+        if answer_info.study_result == StudyResultEnum.CORRECT.code:
+            step_start = time.time()
+            incentive_ticket = self._new_incentive_ticket()
+            award_list = await run_sync(self.event_bus.trigger_study_completed,user_id,word_bank_id,memorized_ratio,slained_ratio,answer_info.study_result,
+                                        incentive_ticket=incentive_ticket)
+            logger.info(f"[性能] trigger_study_completed 耗时: {time.time() - step_start:.3f}秒")
+        else:
+            # 异步事务已提交，答错的单词加入本周错词批次
+            self.incorrect_word_batch_set.enqueue(user_id,word_bank_id,answer_info.word)
+
+        response = AnswerResponse(word=answer_info.word,
+                              is_slain= True if word_status == UserWordStatusEnum.SLAINED.code else False,
+                              study_result=answer_info.study_result,
+                              award_list=award_list,
+                              incentive_ticket=incentive_ticket)
+        logger.info(f"[性能] process_answer_info_async 总耗时: {time.time() - total_start:.3f}秒, 答题响应: {response}")
+        return response
+
+    @async_transactional
+    async def _submit_answer_async(self,user_id:int,word_bank_id:int,answer_info:AnswerInfoDto) -> Tuple[int,Optional[datetime],float,float]:
+        """
+        提交答案并更新间隔重复状态，调度器由调用方在事务提交后更新
+        return: (单词状态, 到期时间, 背词率, 斩词率)，答错时不计算背词率、斩词率
+        """
+        is_correct = answer_info.study_result == StudyResultEnum.CORRECT.code
+        word_status, _ = await self.study_service.submit_answer_async(user_id,word_bank_id,answer_info)
+        review_state = await self.spaced_repetition_service.record_review_async(user_id,word_bank_id,answer_info.word,is_correct)
+        memorized_ratio = slained_ratio = None
+        if is_correct:
+            memorized_ratio, slained_ratio = await self.user_word_service.get_word_ratio_async(user_id,word_bank_id)
+        return word_status,review_state.due_at if review_state else None,memorized_ratio,slained_ratio
+
     @transactional
     def process_answer_info(self,user_id:int,word_bank_id:int,answer_info:AnswerInfoDto) -> AnswerResponse:
         import time
@@ -150,41 +259,73 @@ class StudyAppService:
         """
         total_start = time.time()
         
-        # 更新学习记录
+        # 更新学习记录、用户单词答题统计和单词状态（一次数据库往返）
         step_start = time.time()
-        word_status = self.study_service.update_study_record(user_id,word_bank_id,answer_info)
-        logger.info(f"[性能] update_study_record 耗时: {time.time() - step_start:.3f}秒")
+        word_status, _ = self.study_service.submit_answer(user_id,word_bank_id,answer_info)
+        logger.info(f"[性能] submit_answer 耗时: {time.time() - step_start:.3f}秒")
+        # 更新间隔重复状态（legacy策略不处理）
+        review_state = self.spaced_repetition_service.record_review(user_id,word_bank_id,answer_info.word,
+                                                                    answer_info.study_result == StudyResultEnum.CORRECT.code)
+        # 更新背单词调度器（事务提交后生效）
+        self.user_word_service.study_scheduler_service.on_word_answered(user_id,word_bank_id,answer_info.word,word_status,
+                                                                        due_at=review_state.due_at if review_state else None)
 
-        # 更新用户单词状态
-        step_start = time.time()
-        self.user_word_service.update_user_word_status(user_id,word_bank_id,answer_info.word,word_status)
-        logger.info(f"[性能] update_user_word_status 耗时: {time.time() - step_start:.3f}秒")
-
-        # 触发学习完成事件，同步获取激励结果
+        # 触发学习完成事件：在答题事务中，激励处理器在当前线程中同步执行（与答题在同一个事务中），没有超时
+        # 开启延迟激励时只登记激励票据，事务提交后再计算，返回激励票据
         award_list = []
+        incentive_ticket = None
         if answer_info.study_result == StudyResultEnum.CORRECT.code:
             step_start = time.time()
             memorized_ratio, slained_ratio = self.user_word_service.get_word_ratio(user_id, word_bank_id)
             logger.info(f"[性能] get_word_ratio 耗时: {time.time() - step_start:.3f}秒, memorized_ratio={memorized_ratio},slained_ratio={slained_ratio}")
             
             step_start = time.time()
-            award_list = self.event_bus.trigger_study_completed(user_id, word_bank_id, memorized_ratio, slained_ratio, answer_info.study_result)
+            incentive_ticket = self._new_incentive_ticket()
+            award_list = self.event_bus.trigger_study_completed(user_id, word_bank_id, memorized_ratio, slained_ratio, answer_info.study_result,
+                                                                incentive_ticket=incentive_ticket)
             logger.info(f"[性能] trigger_study_completed 耗时: {time.time() - step_start:.3f}秒")
+        else:
+            # 答错的单词在答题事务提交后加入本周错词批次
+            self.incorrect_word_batch_set.enqueue(user_id,word_bank_id,answer_info.word)
 
         response = AnswerResponse(word=answer_info.word,
                               is_slain= True if word_status == UserWordStatusEnum.SLAINED.code else False,
                               study_result=answer_info.study_result,
-                              award_list=award_list)
+                              award_list=award_list,
+                              incentive_ticket=incentive_ticket)
         logger.info(f"[性能] process_answer_info 总耗时: {time.time() - total_start:.3f}秒, 答题响应: {response}")
         return response
 
+    def _new_incentive_ticket(self) -> str:
+        """
+        开启延迟激励时生成激励票据，否则返回None（同步等待激励结果）
+        """
+        return uuid.uuid4().hex if settings.INCENTIVE_DEFERRED_ENABLED else None
+
    
     def judge_phrase(self,phrase:AnswerInfoItem) -> JudgePhraseResponse:
         """
-        判断短语是否正确
+        判断短语是否正确，相同的判题优先使用缓存的结果
         """
-        # return JudgePhraseResponse(is_correct=True)
-        return self.study_service.judge_phrase(phrase)
+        key = PhraseJudgeKey(phrase)
+        is_correct = self.phrase_judge_cache.get(key)
+        if is_correct is not None:
+            return JudgePhraseResponse(is_correct=is_correct)
+        response = self.study_service.judge_phrase(phrase)
+        self.phrase_judge_cache.put(key, response.is_correct)
+        return response
+
+    async def judge_phrase_async(self,phrase:AnswerInfoItem) -> JudgePhraseResponse:
+        """
+        判断短语是否正确（异步），相同的判题优先使用缓存的结果
+        """
+        key = PhraseJudgeKey(phrase)
+        is_correct = await self.phrase_judge_cache.get_async(key)
+        if is_correct is not None:
+            return JudgePhraseResponse(is_correct=is_correct)
+        response = await self.study_service.judge_phrase_async(phrase)
+        await self.phrase_judge_cache.put_async(key, response.is_correct)
+        return response
     
     def get_user_word_list(self,user_id:int,word_bank_id:int,userWordStatusEnum:Enum) -> List[UserWordDto]:
         """
@@ -200,12 +341,12 @@ class StudyAppService:
         """
         user_word = self.user_word_service.select_user_word(user_id,word_bank_id,word)
         word_original = user_word.word
-        word_entity = self.word_app_service.query_word_info(word,word_bank_id)
-        word_entity.flags = user_word.flags
-        word_info = orm_to_dto(word_entity, WordInfoDto)
         # 如果用户单词状态不是斩杀状态，则对单词内容做*化处理
+        mask_mode = WordMaskModeEnum.NONE
         if user_word.word_status != UserWordStatusEnum.SLAINED.code and is_need_mask:
-            word_info.mask_word()
+            mask_mode = WordMaskModeEnum.FULL
+        word_info = self.word_card_cache.get_word_card(word,word_bank_id,mask_mode)
+        word_info.flags = user_word.flags or []
         word_info.unmask_word = word_original
         return word_info
     
@@ -336,9 +477,6 @@ class StudyAppService:
         """
         return self.user_word_service.get_user_word_status_stats(user_id,word_bank_id)
     
-    def get_study_record_stats_last_hour(self) -> Tuple[int,int]:
-        return self.study_service.query_study_record_stats_last_hour()
-    
     def query_study_record_count(self,user_id:int,word_bank_id:int,study_date:str,study_result:int) -> int:
         """
         根据日期和study_result，查询学习记录的数量
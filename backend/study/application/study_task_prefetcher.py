@@ -0,0 +1,84 @@
+"""
+背单词任务预取，用户答当前单词时在后台准备接下来的单词：
+加载（或按有效期重建）背单词调度器，并渲染、*化接下来K个候选单词的卡片放入单词卡片缓存，
+下一次获取学习任务时选词和取卡片都直接命中内存
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional
+from framework.config.config import settings
+from framework.container.container_decorator import injectable
+from framework.util.logger import setup_logger
+from study.application.word_card_cache import WordCardCache
+from study.domain.service.study_scheduler_service import StudySchedulerService
+from study.enums.study_enums import WordMaskModeEnum
+
+logger = setup_logger(__name__)
+
+@injectable
+class StudyTaskPrefetcher:
+    """
+    背单词任务预取器
+    候选单词的顺序和有效性由背单词调度器维护（答题后单词版本号变化，旧条目自动失效），
+    预取器只负责提前把候选单词的卡片渲染好，不提前生成学习记录
+    """
+
+    def __init__(self, study_scheduler_service: StudySchedulerService, word_card_cache: WordCardCache):
+        self.study_scheduler_service = study_scheduler_service
+        self.word_card_cache = word_card_cache
+        self._executor = ThreadPoolExecutor(max_workers=settings.STUDY_PREFETCH_WORKERS,
+                                            thread_name_prefix="study-prefetch")
+        # 正在预取的(用户ID, 词库ID, 标签)，同一用户词库同时只有一个预取任务
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return settings.STUDY_PREFETCH_ENABLED and settings.STUDY_PREFETCH_SIZE > 0
+
+    def prefetch(self, user_id: int, word_bank_id: int, flag: str = None, current_word: str = None) -> None:
+        """
+        在后台预取调度器中接下来要背的单词
+        param current_word: 当前正在背的单词，不需要预取
+        """
+        if not self.enabled or not settings.STUDY_SCHEDULER_ENABLED:
+            return
+        key = (user_id, word_bank_id, flag)
+        with self._lock:
+            if key in self._pending:
+                return
+            self._pending.add(key)
+        self._executor.submit(self._prefetch_scheduled, key, current_word)
+
+    def prefetch_words(self, word_bank_id: int, words: Iterable[str]) -> None:
+        """
+        在后台预取指定单词的卡片（背批次单词时使用）
+        """
+        if not self.enabled:
+            return
+        words = list(words)[:settings.STUDY_PREFETCH_SIZE]
+        if words:
+            self._executor.submit(self._warm_cards, word_bank_id, words)
+
+    def _prefetch_scheduled(self, key: tuple, current_word: Optional[str]) -> None:
+        user_id, word_bank_id, flag = key
+        try:
+            start = time.time()
+            candidates = self.study_scheduler_service.peek(user_id, word_bank_id, flag, settings.STUDY_PREFETCH_SIZE + 1)
+            words = [scheduled.word for scheduled in candidates if scheduled.word != current_word]
+            self._warm_cards(word_bank_id, words[:settings.STUDY_PREFETCH_SIZE])
+            logger.debug(f"预取背单词任务完成: user_id={user_id}, word_bank_id={word_bank_id}, "
+                         f"单词={words}, 耗时: {time.time() - start:.3f}秒")
+        except Exception as e:
+            logger.error(f"预取背单词任务失败: user_id={user_id}, word_bank_id={word_bank_id}, 错误: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def _warm_cards(self, word_bank_id: int, words: Iterable[str]) -> None:
+        for word in words:
+            try:
+                self.word_card_cache.warm(word, word_bank_id, WordMaskModeEnum.BATTLE)
+            except Exception as e:
+                logger.error(f"预取单词卡片失败: word={word}, word_bank_id={word_bank_id}, 错误: {e}")
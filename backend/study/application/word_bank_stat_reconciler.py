@@ -0,0 +1,34 @@
+from framework.config.config import settings
+from framework.container.container_decorator import injectable
+from framework.startup.startup_manager import register_startup_service
+from framework.scheduler.cron import every_minutes_cron
+from framework.scheduler.job_scheduler import get_job_scheduler
+from framework.util.logger import setup_logger
+from study.domain.service.user_word_bank_stat_service import UserWordBankStatService
+
+logger = setup_logger(__name__)
+
+@injectable
+@register_startup_service
+class WordBankStatReconciler:
+    """
+    用户词库单词状态统计校准器，定时按用户单词表校准增量维护的统计
+    """
+
+    def __init__(self, user_word_bank_stat_service: UserWordBankStatService):
+        self.user_word_bank_stat_service = user_word_bank_stat_service
+        get_job_scheduler().register("word_bank_stat_reconciler",
+                                     every_minutes_cron(settings.WORD_BANK_STAT_RECONCILE_MINUTES),
+                                     self._reconcile)
+
+    def _reconcile(self) -> int:
+        """
+        按用户单词表校准统计
+        return: 存在偏差并已修正的记录数
+        """
+        count = self.user_word_bank_stat_service.reconcile_all()
+        if count > 0:
+            logger.warning(f"用户词库单词状态统计校准完成，存在偏差并已修正的记录数: {count}")
+        else:
+            logger.info("用户词库单词状态统计校准完成，没有偏差")
+        return count
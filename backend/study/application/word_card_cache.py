@@ -0,0 +1,124 @@
+"""
+单词卡片缓存，缓存渲染好的WordInfoDto（序列化后的JSON字节），
+背单词时取卡片只需一次字典查询，无需再查询Word表、转换DTO和*化
+"""
+from typing import Iterable, Optional
+from framework.cache.lru_cache import LRUCache
+from framework.config.config import settings
+from framework.container.container_decorator import injectable
+from framework.cluster.notifier import MAX_PAYLOAD_BYTES, get_cluster_notifier
+from framework.events.event_bus import get_event_bus
+from framework.monitor.cache_stats import register_cache_stats
+from framework.startup.startup_manager import register_startup_service
+from framework.util.logger import setup_logger
+from framework.util.oo_converter import orm_to_dto
+from study.dto.word_info_dto import WordInfoDto
+from study.enums.study_enums import WordMaskModeEnum
+from word.application.word_app_service import WordAppService
+
+logger = setup_logger(__name__)
+
+# 集群事件：单词卡片失效
+INVALIDATE_EVENT = "word_card.invalidate"
+
+@injectable
+@register_startup_service
+class WordCardCache:
+    """
+    单词卡片缓存，key为(词库ID, 单词, *化模式)
+    卡片内容只与单词和*化模式有关，与用户无关；用户相关的字段(用户标签、unmask_word)由调用方在取出后设置
+    """
+
+    def __init__(self, word_app_service: WordAppService):
+        self.word_app_service = word_app_service
+        self._cache = LRUCache(settings.WORD_CARD_CACHE_SIZE)
+        # 单词被更新后失效对应的卡片
+        get_event_bus().connect(get_event_bus().words_saved_signal, self.handle_words_saved)
+        # 多个进程时，其他进程中保存的单词同步失效本进程的卡片
+        self._notifier = get_cluster_notifier()
+        self._notifier.subscribe(INVALIDATE_EVENT, self._handle_cluster_invalidate)
+        register_cache_stats("word_card", self.stats)
+        logger.info(f"单词卡片缓存已初始化: max_size={settings.WORD_CARD_CACHE_SIZE}")
+
+    def get_word_card(self, word: str, word_bank_id: int, mask_mode: WordMaskModeEnum) -> Optional[WordInfoDto]:
+        """
+        获取单词卡片，缓存未命中时从数据库加载并渲染
+        每次返回新的DTO实例，调用方可以放心修改
+        """
+        payload = self._cache.get_or_load((word_bank_id, word, mask_mode.code),
+                                          lambda: self._render(word, word_bank_id, mask_mode))
+        if payload is None:
+            return None
+        return WordInfoDto.model_validate_json(payload)
+
+    def get_cached_word_card(self, word: str, word_bank_id: int, mask_mode: WordMaskModeEnum) -> Optional[WordInfoDto]:
+        """
+        只从缓存中获取单词卡片，未命中时返回None（不访问数据库）
+        """
+        payload = self._cache.get((word_bank_id, word, mask_mode.code))
+        if payload is None:
+            return None
+        return WordInfoDto.model_validate_json(payload)
+
+    def warm(self, word: str, word_bank_id: int, mask_mode: WordMaskModeEnum) -> None:
+        """
+        预先渲染单词卡片放入缓存，不反序列化
+        """
+        self._cache.get_or_load((word_bank_id, word, mask_mode.code),
+                                lambda: self._render(word, word_bank_id, mask_mode))
+
+    def _render(self, word: str, word_bank_id: int, mask_mode: WordMaskModeEnum) -> Optional[bytes]:
+        """
+        查询单词并渲染为序列化后的卡片
+        """
+        word_entity = self.word_app_service.query_word_info(word, word_bank_id)
+        if word_entity is None:
+            return None
+        word_info = orm_to_dto(word_entity, WordInfoDto)
+        if mask_mode == WordMaskModeEnum.BATTLE:
+            word_info.mask_word(is_for_battle=True)
+        elif mask_mode == WordMaskModeEnum.FULL:
+            word_info.mask_word()
+        return word_info.model_dump_json().encode('utf-8')
+
+    def invalidate(self, word_bank_id: int, words: Iterable[str]) -> None:
+        """
+        失效指定单词的所有*化模式的卡片
+        """
+        for word in words:
+            for mask_mode in WordMaskModeEnum:
+                self._cache.pop((word_bank_id, word, mask_mode.code))
+
+    def handle_words_saved(self, sender, **kwargs):
+        """处理单词保存事件"""
+        word_bank_id = kwargs.get('word_bank_id')
+        words = kwargs.get('words') or []
+        self.invalidate(word_bank_id, words)
+        self._publish_invalidate(word_bank_id, words)
+        logger.info(f"单词卡片缓存已失效: word_bank_id={word_bank_id}, 单词数量={len(words)}")
+
+    def _publish_invalidate(self, word_bank_id: int, words: list) -> None:
+        """
+        通知其他进程失效卡片，单词较多时分批发送，避免超过消息大小上限
+        单词保存事件在事务提交后触发，不能再使用当前会话发送
+        """
+        batch, batch_bytes = [], 0
+        for word in words:
+            word_bytes = len(word.encode('utf-8')) + 4
+            if batch and batch_bytes + word_bytes > MAX_PAYLOAD_BYTES - 200:
+                self._notifier.publish(INVALIDATE_EVENT, {"word_bank_id": word_bank_id, "words": batch}, transactional=False)
+                batch, batch_bytes = [], 0
+            batch.append(word)
+            batch_bytes += word_bytes
+        if batch:
+            self._notifier.publish(INVALIDATE_EVENT, {"word_bank_id": word_bank_id, "words": batch}, transactional=False)
+
+    def _handle_cluster_invalidate(self, data: dict) -> None:
+        """处理其他进程中的卡片失效"""
+        self.invalidate(data["word_bank_id"], data.get("words") or [])
+
+    def stats(self) -> dict:
+        """
+        获取缓存统计信息
+        """
+        return self._cache.stats()
@@ -3,6 +3,7 @@ from functools import partial
 from typing import List
 from fastapi import APIRouter, Depends, Query
 from framework.container.container import get_service
+from framework.concurrency.executor import run_sync
 from framework.model.common import BaseResponse
 from framework.router.router_decorator import router_controller
 from framework.util.auth import get_current_user
@@ -26,7 +27,7 @@ def study_controller(router: APIRouter):
     async def init_proverb_storage(
         proverb_app_service: ProverbAppService = Depends(partial(get_service, ProverbAppService))
     ):
-        proverb_app_service.init_proverb_storage()
+        await run_sync(proverb_app_service.init_proverb_storage)
         return BaseResponse(
                 code=0,
                 message="初始化谚语库成功"
@@ -45,7 +46,7 @@ def study_controller(router: APIRouter):
         return BaseResponse(
                 code=0,
                 message="获取谚语成功",
-                data=proverb_app_service.get_proverb_for_display(current_user["user_id"])
+                data=await run_sync(proverb_app_service.get_proverb_for_display, current_user["user_id"])
         )
     
     @router.get(
@@ -61,6 +62,6 @@ def study_controller(router: APIRouter):
         return BaseResponse(
                 code=0,
                 message="获取谚语列表成功",
-                data=proverb_app_service.get_proverb_list()
+                data=await run_sync(proverb_app_service.get_proverb_list)
         )
 
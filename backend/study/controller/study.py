@@ -7,6 +7,8 @@ from study.application.study_app_service import StudyAppService
 from framework.model.common import BaseResponse
 from framework.util.logger import setup_logger
 from framework.container.container import get_service
+from framework.concurrency.executor import run_sync
+from framework.config.config import settings
 from functools import partial
 from framework.util.auth import get_current_user
 from framework.router.router_decorator import router_controller
@@ -34,7 +36,7 @@ def study_controller(router: APIRouter):
         word_bank_id: int = Query(..., description="词库ID"),
         study_app_service: StudyAppService = Depends(partial(get_service, StudyAppService))
     ):
-        study_app_service.switch_word_bank(current_user["user_id"], word_bank_id)
+        await run_sync(study_app_service.switch_word_bank, current_user["user_id"], word_bank_id)
         return BaseResponse(
                 code=0,
                 message="切换词库成功"
@@ -53,10 +55,14 @@ def study_controller(router: APIRouter):
         flag: Optional[str] = Query(None, description="标签筛选"),
         study_app_service: StudyAppService = Depends(partial(get_service, StudyAppService))
     ):
+        if settings.ASYNC_DB_ENABLED:
+            data = await study_app_service.get_word_task_info_async(current_user["user_id"],current_word_bank_id,batch_id,flag)
+        else:
+            data = await run_sync(study_app_service.get_word_task_info, current_user["user_id"],current_word_bank_id,batch_id,flag)
         return BaseResponse(
                 code=0,
                 message="获取单词学习任务信息成功",
-                data=study_app_service.get_word_task_info(current_user["user_id"],current_word_bank_id,batch_id,flag)
+                data=data
         )
     
     @router.post(
@@ -75,7 +81,10 @@ def study_controller(router: APIRouter):
         start_time = time.time()
         logger.info(f"[性能] submit_answer_info 开始: user_id={current_user['user_id']}, word={answer_info.word}")
         try:
-            result = study_app_service.process_answer_info(current_user["user_id"],current_word_bank_id,answer_info)
+            if settings.ASYNC_DB_ENABLED:
+                result = await study_app_service.process_answer_info_async(current_user["user_id"],current_word_bank_id,answer_info)
+            else:
+                result = await run_sync(study_app_service.process_answer_info, current_user["user_id"],current_word_bank_id,answer_info)
             elapsed_time = time.time() - start_time
             logger.info(f"[性能] submit_answer_info 完成: 总耗时={elapsed_time:.3f}秒")
             return BaseResponse(
@@ -101,7 +110,7 @@ def study_controller(router: APIRouter):
         return BaseResponse(
                 code=0,
                 message="判断短语是否正确成功",
-                data=study_app_service.judge_phrase(phrase)
+                data=await study_app_service.judge_phrase_async(phrase)
         )
 
     @router.get(
@@ -129,7 +138,7 @@ def study_controller(router: APIRouter):
         return BaseResponse(
                 code=0,
                 message="获取用户单词列表成功",
-                data=study_app_service.get_user_word_list(current_user["user_id"],current_word_bank_id,status_enum)
+                data=await run_sync(study_app_service.get_user_word_list, current_user["user_id"],current_word_bank_id,status_enum)
         )
     
     @router.get(
@@ -148,7 +157,7 @@ def study_controller(router: APIRouter):
         return BaseResponse(
                 code=0,
                 message="获取用户单词成功",
-                data=study_app_service.get_user_word(current_user["user_id"],current_word_bank_id,word,is_need_mask)
+                data=await run_sync(study_app_service.get_user_word, current_user["user_id"],current_word_bank_id,word,is_need_mask)
         )
     
     @router.get(
@@ -165,7 +174,7 @@ def study_controller(router: APIRouter):
         return BaseResponse(
                 code=0,
                 message="获取学习记录列表成功",
-                data=study_app_service.get_study_record_list(current_user["user_id"],current_word_bank_id)
+                data=await run_sync(study_app_service.get_study_record_list, current_user["user_id"],current_word_bank_id)
         )
     
     @router.get(
@@ -183,7 +192,7 @@ def study_controller(router: APIRouter):
         return BaseResponse(
                 code=0,
                 message="获取困难单词记录列表成功",
-                data=study_app_service.get_hard_word_record_list(current_user["user_id"],current_word_bank_id,fault_count)
+                data=await run_sync(study_app_service.get_hard_word_record_list, current_user["user_id"],current_word_bank_id,fault_count)
         )
     
     @router.get(
@@ -203,7 +212,7 @@ def study_controller(router: APIRouter):
         return BaseResponse(
                 code=0,
                 message="获取变形形式成功",
-                data=study_app_service.query_inflections(current_user["user_id"],current_word_bank_id,inflection_type_enum)
+                data=await run_sync(study_app_service.query_inflections, current_user["user_id"],current_word_bank_id,inflection_type_enum)
         )
 
     @router.get(
@@ -220,7 +229,7 @@ def study_controller(router: APIRouter):
         return BaseResponse(
                 code=0,
                 message="查询用户在词库里的标签列表成功",
-                data=study_app_service.query_user_flags(current_user["user_id"],current_word_bank_id)
+                data=await run_sync(study_app_service.query_user_flags, current_user["user_id"],current_word_bank_id)
         )
     
     @router.get(
@@ -237,7 +246,7 @@ def study_controller(router: APIRouter):
         return BaseResponse(
                 code=0,
                 message="查询用户单词状态成功",
-                data=study_app_service.get_pie_chart_data(current_user["user_id"],current_word_bank_id)
+                data=await run_sync(study_app_service.get_pie_chart_data, current_user["user_id"],current_word_bank_id)
         )
     
     @router.get(
@@ -254,7 +263,7 @@ def study_controller(router: APIRouter):
         return BaseResponse(
                 code=0,
                 message="查询学习记录柱状图数据成功",
-                data=study_app_service.get_bar_chart_data(current_user["user_id"],current_word_bank_id)
+                data=await run_sync(study_app_service.get_bar_chart_data, current_user["user_id"],current_word_bank_id)
         )
     
     @router.get(
@@ -271,7 +280,7 @@ def study_controller(router: APIRouter):
         return BaseResponse(
                 code=0,
                 message="查询用户单词状态统计成功",
-                data=study_app_service.get_user_word_status_stats(current_user["user_id"],current_word_bank_id)
+                data=await run_sync(study_app_service.get_user_word_status_stats, current_user["user_id"],current_word_bank_id)
         )
     
     @router.post(
@@ -286,7 +295,7 @@ def study_controller(router: APIRouter):
         user_flags_set_dto: UserFlagsSetDto = Body(..., description="用户标签设置DTO"),
         study_app_service: StudyAppService = Depends(partial(get_service, StudyAppService))
     ):
-        study_app_service.set_user_word_flags(current_user["user_id"],current_word_bank_id,user_flags_set_dto)
+        await run_sync(study_app_service.set_user_word_flags, current_user["user_id"],current_word_bank_id,user_flags_set_dto)
         return BaseResponse(
                 code=0,
                 message="设置用户单词标签成功"
@@ -4,6 +4,7 @@ from typing import List
 from fastapi import APIRouter, Body, Depends, Header, Query
 from fastapi.responses import StreamingResponse
 from framework.container.container import get_service
+from framework.concurrency.executor import run_sync
 from framework.model.common import BaseResponse
 from framework.router.router_decorator import router_controller
 from framework.util.auth import get_current_user
@@ -32,7 +33,7 @@ def study_batch_controller(router: APIRouter):
         return BaseResponse(
             code=0,
             message="获取学习批次记录列表成功",
-            data=study_batch_app_service.get_study_batch_record_list(current_user["user_id"],current_word_bank_id)
+            data=await run_sync(study_batch_app_service.get_study_batch_record_list, current_user["user_id"],current_word_bank_id)
         )
     
     @router.get(
@@ -46,7 +47,7 @@ def study_batch_controller(router: APIRouter):
         current_word_bank_id: int = Header(..., description="词库ID",alias="current-word-bank-id"),
         study_batch_app_service: StudyBatchAppService = Depends(partial(get_service, StudyBatchAppService))
     ):
-        study_batch_app_service.create_study_batch_record(current_user["user_id"],current_word_bank_id)
+        await run_sync(study_batch_app_service.create_study_batch_record, current_user["user_id"],current_word_bank_id)
         return BaseResponse(
             code=0,
             message="创建学习批次记录成功"
@@ -63,7 +64,7 @@ def study_batch_controller(router: APIRouter):
         words: List[WordItemDto] = Body(..., description="单词列表"),
         study_batch_app_service: StudyBatchAppService = Depends(partial(get_service, StudyBatchAppService))
     ):
-        study_batch_app_service.set_words(id,words)
+        await run_sync(study_batch_app_service.set_words, id,words)
         return BaseResponse(
             code=0,
             message="设置学习批次记录的单词列表成功"
@@ -80,7 +81,7 @@ def study_batch_controller(router: APIRouter):
         id: int = Query(..., description="学习批次记录ID"),
         study_batch_app_service: StudyBatchAppService = Depends(partial(get_service, StudyBatchAppService))
     ):
-        study_batch_app_service.reset_status(id)
+        await run_sync(study_batch_app_service.reset_status, id)
         return BaseResponse(
             code=0,
             message="刷新学习批次记录的状态成功"
@@ -95,6 +96,6 @@ def study_batch_controller(router: APIRouter):
         id: int = Query(..., description="学习批次记录ID"),
         study_batch_app_service: StudyBatchAppService = Depends(partial(get_service, StudyBatchAppService))
     ):
-        return study_batch_app_service.download_words_in_batch(id)
+        return await run_sync(study_batch_app_service.download_words_in_batch, id)
     
     return router
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, Integer, String, JSON, ForeignKey
+from sqlalchemy import Boolean, Column, DateTime, Integer, Numeric, String, JSON, ForeignKey
 from sqlalchemy.orm import relationship
 from framework.database.db_factory import Base
 
@@ -14,6 +14,15 @@ class UserWord(Base):
     word = Column(String(64), nullable=False, comment="单词")
     word_status = Column(Integer, nullable=False, comment="单词状态：0 待斩；1斩中；2已斩")
     flags = Column(JSON, nullable=True, comment="标签") 
+    correct_count = Column(Integer, nullable=False, default=0, comment="答对次数")
+    incorrect_count = Column(Integer, nullable=False, default=0, comment="答错次数")
+    first_correct_time = Column(DateTime, nullable=True, comment="第一次答对时间")
+    last_correct_time = Column(DateTime, nullable=True, comment="最后一次答对时间")
+    interval_days = Column(Numeric(10, 4), nullable=False, default=0, comment="复习间隔（天）")
+    ease = Column(Numeric(6, 4), nullable=False, default=2.5, comment="难度系数")
+    repetitions = Column(Integer, nullable=False, default=0, comment="连续答对次数")
+    due_at = Column(DateTime, nullable=True, comment="下次复习时间")
+    in_hard_batch = Column(Boolean, nullable=False, default=False, comment="是否已加入hard词批次")
     updated_at = Column(DateTime, nullable=True, comment="更新时间")
    
     # 单词的中文释义
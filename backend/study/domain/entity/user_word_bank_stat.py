@@ -0,0 +1,17 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer
+from framework.database.db_factory import Base
+
+
+class UserWordBankStat(Base):
+    """用户词库单词状态统计实体类"""
+    __tablename__ = "t_user_word_bank_stat"
+    __table_args__ = {"comment": "用户词库单词状态统计", "schema": "zcg"}
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True, comment="主键")
+    user_id = Column(Integer, nullable=False, comment="用户ID")
+    word_bank_id = Column(Integer, nullable=False, comment="词库ID")
+    wait_count = Column(Integer, nullable=False, default=0, comment="待斩词数")
+    slaining_count = Column(Integer, nullable=False, default=0, comment="斩中词数")
+    slain_count = Column(Integer, nullable=False, default=0, comment="已斩词数")
+    total_count = Column(Integer, nullable=False, default=0, comment="总词数")
+    updated_at = Column(DateTime(timezone=True), nullable=True, server_default="CURRENT_TIMESTAMP")
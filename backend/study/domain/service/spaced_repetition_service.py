@@ -0,0 +1,222 @@
+"""
+间隔重复模块，根据答题结果计算单词的下次复习时间
+支持的策略:
+    legacy: 不做间隔重复，沿用"最久未更新、今天未背过"的选词规则
+    sm2: SM-2算法，答对时按简易度放大复习间隔，答错时重新开始
+    fsrs: 简化的FSRS算法，按记忆稳定性和难度计算复习间隔
+"""
+import math
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Type
+from framework.config.config import settings
+from framework.container.container_decorator import injectable
+from framework.database.async_db_decorator import async_transactional
+from framework.database.async_db_factory import get_async_db_session
+from framework.database.db_decorator import transactional
+from framework.database.db_factory import get_db_session
+from framework.util.logger import setup_logger
+from sqlalchemy import select
+from study.domain.entity.user_word import UserWord
+
+logger = setup_logger(__name__)
+
+
+@dataclass
+class ReviewState:
+    """单词的间隔重复状态"""
+    interval_days: float = 0.0
+    ease: float = 2.5
+    repetitions: int = 0
+    due_at: Optional[datetime] = None
+    last_review_at: Optional[datetime] = None
+
+
+class SpacedRepetitionPolicy:
+    """
+    间隔重复策略基类
+    """
+    name = None
+
+    def review(self, state: ReviewState, is_correct: bool, now: datetime) -> ReviewState:
+        """
+        根据本次答题结果计算新的状态
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def _due(now: datetime, interval_days: float) -> datetime:
+        return now + timedelta(days=interval_days)
+
+
+class LegacyPolicy(SpacedRepetitionPolicy):
+    """
+    不做间隔重复，每个单词每天都可以复习
+    """
+    name = "legacy"
+
+    def review(self, state: ReviewState, is_correct: bool, now: datetime) -> ReviewState:
+        repetitions = state.repetitions + 1 if is_correct else 0
+        return ReviewState(interval_days=0.0, ease=state.ease, repetitions=repetitions, due_at=None, last_review_at=now)
+
+
+class SM2Policy(SpacedRepetitionPolicy):
+    """
+    SM-2算法，答题结果只有对错两种，答对按4分、答错按1分计算
+    """
+    name = "sm2"
+    CORRECT_QUALITY = 4
+    INCORRECT_QUALITY = 1
+    MIN_EASE = 1.3
+
+    def review(self, state: ReviewState, is_correct: bool, now: datetime) -> ReviewState:
+        quality = self.CORRECT_QUALITY if is_correct else self.INCORRECT_QUALITY
+        ease = max(self.MIN_EASE, state.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        if not is_correct:
+            # 答错：重新开始，第二天复习
+            return ReviewState(interval_days=1.0, ease=ease, repetitions=0, due_at=self._due(now, 1.0), last_review_at=now)
+        repetitions = state.repetitions + 1
+        if repetitions == 1:
+            interval = 1.0
+        elif repetitions == 2:
+            interval = 6.0
+        else:
+            interval = max(1.0, state.interval_days) * ease
+        return ReviewState(interval_days=interval, ease=ease, repetitions=repetitions, due_at=self._due(now, interval), last_review_at=now)
+
+
+class FSRSPolicy(SpacedRepetitionPolicy):
+    """
+    简化的FSRS算法
+    interval_days 保存记忆稳定性S（记忆保持率降到90%所需的天数），ease 保存难度D（1~10）
+    目标记忆保持率为90%时，复习间隔等于稳定性
+    """
+    name = "fsrs"
+    INITIAL_STABILITY_CORRECT = 2.0
+    INITIAL_STABILITY_INCORRECT = 0.5
+    INITIAL_DIFFICULTY = 5.0
+    STABILITY_GROWTH = math.exp(1.5)
+    FORGET_FACTOR = 0.3
+
+    def review(self, state: ReviewState, is_correct: bool, now: datetime) -> ReviewState:
+        if state.due_at is None:
+            # 第一次复习
+            stability = self.INITIAL_STABILITY_CORRECT if is_correct else self.INITIAL_STABILITY_INCORRECT
+            difficulty = self.INITIAL_DIFFICULTY if is_correct else self.INITIAL_DIFFICULTY + 1
+        else:
+            stability = max(0.1, state.interval_days)
+            difficulty = min(10.0, max(1.0, state.ease))
+            elapsed_days = 0.0
+            if state.last_review_at is not None:
+                elapsed_days = max(0.0, (now - state.last_review_at).total_seconds() / 86400)
+            retrievability = 1.0 / (1.0 + elapsed_days / (9.0 * stability))
+            if is_correct:
+                growth = self.STABILITY_GROWTH * (11 - difficulty) * stability ** -0.2 * (math.exp((1 - retrievability) * 0.9) - 1)
+                stability = stability * (1 + max(growth, 0.1))
+                difficulty = max(1.0, difficulty - 0.3)
+            else:
+                stability = max(0.5, stability * self.FORGET_FACTOR)
+                difficulty = min(10.0, difficulty + 1.0)
+        repetitions = state.repetitions + 1 if is_correct else 0
+        interval = max(1.0, stability)
+        return ReviewState(interval_days=stability, ease=difficulty, repetitions=repetitions,
+                           due_at=self._due(now, interval), last_review_at=now)
+
+
+# 所有间隔重复策略
+POLICIES: Dict[str, Type[SpacedRepetitionPolicy]] = {
+    LegacyPolicy.name: LegacyPolicy,
+    SM2Policy.name: SM2Policy,
+    FSRSPolicy.name: FSRSPolicy,
+}
+
+
+def last_review_time(due_at: Optional[datetime], interval_days: float) -> Optional[datetime]:
+    """
+    根据到期时间和复习间隔推算上次复习时间
+    """
+    if due_at is None:
+        return None
+    return due_at - timedelta(days=max(1.0, interval_days))
+
+
+def get_policy(name: str) -> SpacedRepetitionPolicy:
+    """
+    根据名称获取间隔重复策略
+    """
+    policy_cls = POLICIES.get(name)
+    if policy_cls is None:
+        raise ValueError(f"无效的间隔重复策略: {name}，可选值: {list(POLICIES)}")
+    return policy_cls()
+
+
+@injectable
+class SpacedRepetitionService:
+    """
+    间隔重复服务，答题后更新用户单词的复习间隔和下次复习时间
+    """
+
+    def __init__(self):
+        self.policy = get_policy(settings.STUDY_SCHEDULE_POLICY)
+        logger.info(f"间隔重复策略: {self.policy.name}")
+
+    @property
+    def enabled(self) -> bool:
+        """是否启用了间隔重复（legacy策略不按到期时间选词）"""
+        return not isinstance(self.policy, LegacyPolicy)
+
+    @transactional
+    def record_review(self, user_id: int, word_bank_id: int, word: str, is_correct: bool, now: datetime = None) -> Optional[ReviewState]:
+        """
+        记录一次复习，更新用户单词的间隔重复状态
+        return: 新的状态，未启用间隔重复或用户单词不存在时返回None
+        """
+        if not self.enabled:
+            return None
+        user_word = get_db_session().query(UserWord).filter(
+            UserWord.user_id == user_id,
+            UserWord.word_bank_id == word_bank_id,
+            UserWord.word == word
+        ).with_for_update().first()
+        new_state = self._apply_review(user_word, is_correct, now or datetime.now())
+        get_db_session().flush()
+        return new_state
+
+    @async_transactional
+    async def record_review_async(self, user_id: int, word_bank_id: int, word: str, is_correct: bool, now: datetime = None) -> Optional[ReviewState]:
+        """
+        记录一次复习（异步），与 record_review 一致
+        """
+        if not self.enabled:
+            return None
+        user_word = (await get_async_db_session().execute(
+            select(UserWord).where(
+                UserWord.user_id == user_id,
+                UserWord.word_bank_id == word_bank_id,
+                UserWord.word == word
+            ).limit(1).with_for_update()
+        )).scalars().first()
+        new_state = self._apply_review(user_word, is_correct, now or datetime.now())
+        await get_async_db_session().flush()
+        return new_state
+
+    def _apply_review(self, user_word: Optional[UserWord], is_correct: bool, now: datetime) -> Optional[ReviewState]:
+        """
+        按策略计算新的状态并写回用户单词
+        """
+        if user_word is None:
+            return None
+        state = ReviewState(interval_days=float(user_word.interval_days),
+                            ease=float(user_word.ease),
+                            repetitions=user_word.repetitions,
+                            due_at=user_word.due_at,
+                            last_review_at=last_review_time(user_word.due_at, float(user_word.interval_days)))
+        if is_correct and user_word.due_at is not None and user_word.due_at > now:
+            # 未到期提前复习且答对时不延长间隔，避免同一天反复答对把间隔越拉越长
+            return state
+        new_state = self.policy.review(state, is_correct, now)
+        user_word.interval_days = round(new_state.interval_days, 4)
+        user_word.ease = round(new_state.ease, 4)
+        user_word.repetitions = new_state.repetitions
+        user_word.due_at = new_state.due_at
+        return new_state
@@ -1,10 +1,12 @@
-from typing import List
+from typing import Dict, List, Tuple
 from framework.container.container_decorator import injectable
 from framework.database.db_decorator import readonly, transactional
+from framework.util.date_util import get_current_week_range_date_only, get_week_range_date_only
 from framework.util.logger import setup_logger
-from framework.util.date_util import get_current_week_range_date_only
-from sqlalchemy import Tuple
+from sqlalchemy import text, tuple_
+from framework.cluster.job_lock import job_lock_key
 from study.domain.entity.user_study_batch_record import UserStudyBatchRecord
+from study.domain.entity.user_word import UserWord
 from framework.database.db_factory import get_db_session
 from datetime import datetime
 from sqlalchemy.orm.attributes import flag_modified
@@ -64,9 +66,16 @@ class StudyBatchRecordService:
     @transactional
     def set_words(self, id: int, words: List[WordItemDto]) -> None:
         user_study_batch_record = get_db_session().query(UserStudyBatchRecord).filter(UserStudyBatchRecord.id == id).first()
+        old_words = {item.get('word') for item in user_study_batch_record.words} if isinstance(user_study_batch_record.words, list) else set()
         # 将 Pydantic 模型列表转换为字典列表，以便存储到 JSON 字段
         words_dict_list = [word.model_dump() for word in words]
         user_study_batch_record.words = words_dict_list
+        if user_study_batch_record.batch_no.startswith('HW'):
+            # 同步hard词批次标记，从批次中移除的hard词取消标记后修改时间更新，下次定时任务时重新加入批次
+            new_words = {item.get('word') for item in words_dict_list}
+            user_id, word_bank_id = user_study_batch_record.user_id, user_study_batch_record.word_bank_id
+            self.mark_in_hard_batch(user_id, word_bank_id, list(old_words - new_words), in_hard_batch=False)
+            self.mark_in_hard_batch(user_id, word_bank_id, list(new_words - old_words))
     
 
     @transactional
@@ -95,22 +104,19 @@ class StudyBatchRecordService:
                 UserStudyBatchRecord.id == id
             ).update(update_data)
 
-    @readonly
-    def get_all_hard_word_in_batch(self,user_id:int,word_bank_id:int) -> List[str]:
+    @transactional
+    def mark_in_hard_batch(self,user_id:int,word_bank_id:int,words:List[str],in_hard_batch:bool=True) -> int:
         """
-        获取所有错词批次里的错词
+        标记用户单词是否已加入hard词批次
+        return: 更新的用户单词数
         """
-        hard_word_list = []
-        records = get_db_session().query(UserStudyBatchRecord).filter(
-            UserStudyBatchRecord.user_id == user_id, 
-            UserStudyBatchRecord.word_bank_id == word_bank_id,
-            UserStudyBatchRecord.batch_no.like('HW%')
-        ).all()
-        for record in records:
-            if record.words:
-                for word in record.words:
-                  hard_word_list.append(word.get('word',''))
-        return hard_word_list
+        if not words:
+            return 0
+        return get_db_session().query(UserWord).filter(
+            UserWord.user_id == user_id,
+            UserWord.word_bank_id == word_bank_id,
+            UserWord.word.in_(words)
+        ).update({UserWord.in_hard_batch: in_hard_batch}, synchronize_session=False)
 
     @readonly
     def get_the_last_hard_word_batch(self,user_id:int,word_bank_id:int) -> UserStudyBatchRecord:
@@ -191,69 +197,47 @@ class StudyBatchRecordService:
         """
         get_db_session().bulk_save_objects(batch_record_list,preserve_order=True)
 
-    @readonly
-    def get_this_week_incorrect_word_batch(self,user_id:int,word_bank_id:int) -> UserStudyBatchRecord:
-        this_week_batch_no = self._create_incorrect_word_batch_no()
-        return get_db_session().query(UserStudyBatchRecord).filter(
-            UserStudyBatchRecord.user_id == user_id, 
-            UserStudyBatchRecord.word_bank_id == word_bank_id,
-            UserStudyBatchRecord.batch_no == this_week_batch_no
-        ).first()  
-    
-    @transactional
-    def create_incorrect_word_batch_record(self,user_id:int,word_bank_id:int,words:List[str])->None:
-        this_week_batch_no = self._create_incorrect_word_batch_no()
-        word_dict_list = []
-        for word in words:
-            word_dict = {
-                'word':word,
-                'is_memorized':False
-            }
-            word_dict_list.append(word_dict)
-        record = UserStudyBatchRecord(user_id=user_id,word_bank_id=word_bank_id,batch_no=this_week_batch_no,words=word_dict_list)       
-        get_db_session().add(record)
-        
-    def _create_incorrect_word_batch_no(self)->str:
-        start_time,end_time = get_current_week_range_date_only()
-        # start_time 和 end_time 已经是字符串格式 'YYYY-MM-DD'，需要转换为 'YYYYMMDD' 格式
-        start_date = start_time.replace('-', '')
-        end_date = end_time.replace('-', '')
-        return "IW_"+start_date+"-"+end_date[4:]  # 只取月日部分
-    
+    def create_incorrect_word_batch_no(self,date:datetime=None)->str:
+        """
+        错词批次号：IW_周一日期-周日月日，如 IW_20240101-0107
+        param date: 按该日期所在的周生成，为空时为本周
+        """
+        week_start, week_end = get_week_range_date_only(date) if date else get_current_week_range_date_only()
+        return "IW_"+week_start.replace('-','')+"-"+week_end[5:].replace('-','')
+
     @transactional
-    def add_words_to_batch(self,word_list:List[str],batch_record_id:int)->None: 
+    def append_incorrect_words(self,batch_no:str,user_words:Dict[Tuple[int,int],List[str]])->int:
         """
-        将word_list里的单词放入batch_record,并保存入库
+        批量将错词追加到错词批次，批次不存在时创建，已在批次中的单词跳过
+        param user_words: {(user_id, word_bank_id): [word, ...]}
+        return: 追加的单词数
         """
-        if not word_list:
-            return 
-        batch_record = get_db_session().query(UserStudyBatchRecord).filter(UserStudyBatchRecord.id == batch_record_id).first()
-        
-        # 获取现有的单词列表
-        existing_words = batch_record.words if batch_record.words else []
-        
-        # 提取现有单词的word字段
-        existing_word_set = set()
-        if isinstance(existing_words, list):
-            for word_item in existing_words:
-                if isinstance(word_item, dict) and 'word' in word_item:
-                    existing_word_set.add(word_item['word'])
-        
-        # 找出需要添加的新单词
-        new_words = [word for word in word_list if word not in existing_word_set]
-        
-        if not new_words:
-            return
-        logger.info(f"将 {new_words} 加入现有批次: {batch_record.batch_no}")    
-        
-        # 将新单词转换为WordItemDto格式并添加到现有列表中
-        new_word_items = [{'word': word, 'is_memorized': False} for word in new_words]
-        existing_words.extend(new_word_items)
-        
-        # 更新batch_record的words字段
-        batch_record.words = existing_words
-        batch_record.is_finished = False
-        flag_modified(batch_record, 'words')
-        
-        # 保存到数据库
-        get_db_session().flush()
\ No newline at end of file
+        if not user_words:
+            return 0
+        db_session = get_db_session()
+        # 多个进程同时追加时串行执行，避免重复创建同一个批次
+        db_session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": job_lock_key("incorrect_word_batch_append")})
+        records = db_session.query(UserStudyBatchRecord).filter(
+            UserStudyBatchRecord.batch_no == batch_no,
+            tuple_(UserStudyBatchRecord.user_id, UserStudyBatchRecord.word_bank_id).in_(list(user_words.keys()))
+        ).all()
+        record_map = {(record.user_id, record.word_bank_id): record for record in records}
+
+        append_count = 0
+        for (user_id, word_bank_id), words in user_words.items():
+            batch_record = record_map.get((user_id, word_bank_id))
+            if batch_record is None:
+                batch_record = UserStudyBatchRecord(user_id=user_id,word_bank_id=word_bank_id,batch_no=batch_no,words=[])
+                db_session.add(batch_record)
+            existing_words = batch_record.words if isinstance(batch_record.words, list) else []
+            existing_word_set = {item.get('word') for item in existing_words if isinstance(item, dict)}
+            new_words = [word for word in words if word not in existing_word_set]
+            if not new_words:
+                continue
+            logger.info(f"将 {new_words} 加入错词批次: user_id={user_id}, word_bank_id={word_bank_id}, 批次: {batch_no}")
+            batch_record.words = existing_words + [{'word': word, 'is_memorized': False} for word in new_words]
+            batch_record.is_finished = False
+            flag_modified(batch_record, 'words')
+            append_count += len(new_words)
+        db_session.flush()
+        return append_count
@@ -0,0 +1,312 @@
+"""
+背单词调度模块，按用户、词库在进程内维护待背单词的优先队列，
+选词时无需再对用户单词做COUNT和NOT IN子查询
+启用间隔重复时，队列中只包含今天到期和从未复习过的单词，按到期时间排序
+"""
+import heapq
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, time as dt_time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from framework.cache.lru_cache import LRUCache
+from framework.cluster.notifier import get_cluster_notifier
+from framework.config.config import settings
+from framework.container.container_decorator import injectable
+from framework.database.db_decorator import readonly
+from framework.database.db_factory import get_db_session
+from framework.util.logger import setup_logger
+from sqlalchemy import event, func
+from study.domain.entity.study_record import StudyRecord
+from study.domain.entity.user_word import UserWord
+from study.domain.service.spaced_repetition_service import SpacedRepetitionService
+from study.enums.study_enums import UserWordStatusEnum
+
+logger = setup_logger(__name__)
+
+# 待背的单词状态
+STUDY_STATUS_SET = {UserWordStatusEnum.WAIT_SLAIN.code, UserWordStatusEnum.SLAINING.code}
+# 不按标签筛选
+ALL_FLAG = '全部'
+# 集群事件：单词答题、调度器失效
+WORD_ANSWERED_EVENT = "study_scheduler.word_answered"
+INVALIDATE_EVENT = "study_scheduler.invalidate"
+
+
+@dataclass
+class ScheduledWord:
+    """调度中的单词"""
+    word: str
+    word_status: int
+    updated_at: Optional[datetime]
+    id: int
+    flags: Tuple[str, ...] = ()
+    # 下次复习时间，为空表示从未按间隔重复复习过
+    due_at: Optional[datetime] = None
+    # 版本号，单词状态变化时递增，堆中版本号不一致的条目视为已失效
+    version: int = 0
+
+    def sort_key(self, due_mode: bool = False) -> tuple:
+        # 与 ORDER BY word_status, updated_at 一致，updated_at为空的排在最后
+        if self.updated_at is None:
+            key = (self.word_status, 1, 0.0, self.id)
+        else:
+            key = (self.word_status, 0, self.updated_at.timestamp(), self.id)
+        if not due_mode:
+            return key
+        # 按到期时间排序，已到期的单词优先，从未复习过的单词排在后面
+        if self.due_at is None:
+            return (1, 0.0) + key
+        return (0, self.due_at.timestamp()) + key
+
+
+class StudyScheduler:
+    """
+    单个用户、词库的背单词调度器
+    堆中按(单词状态, 更新时间)排序，单词答题后版本号递增，堆中的旧条目延迟删除；
+    今天已背过的单词不在堆中，跨天时重建堆重新加入
+    due_mode为True时，堆中只包含今天到期和从未复习过的单词
+    """
+
+    def __init__(self, words: Iterable[ScheduledWord], studied_today: Iterable[str], day: date = None, due_mode: bool = False):
+        self._lock = threading.Lock()
+        self._due_mode = due_mode
+        self._words: Dict[str, ScheduledWord] = {w.word: w for w in words if w.word_status in STUDY_STATUS_SET}
+        self._studied_today: Set[str] = set(studied_today)
+        self._day = day or date.today()
+        # 每个标签下待背单词数，用于判断是否已全部斩完
+        self._flag_counts: Dict[str, int] = {}
+        for scheduled in self._words.values():
+            self._count_flags(scheduled.flags, 1)
+        # 堆：key为None表示全部单词，否则为对应标签的单词，标签堆在首次使用时构建
+        self._heaps: Dict[Optional[str], List[tuple]] = {None: self._build_heap(None)}
+        self.loaded_at = time.time()
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def _count_flags(self, flags: Iterable[str], delta: int) -> None:
+        for flag in flags:
+            self._flag_counts[flag] = self._flag_counts.get(flag, 0) + delta
+
+    def _is_due(self, scheduled: ScheduledWord) -> bool:
+        """今天是否需要复习"""
+        if not self._due_mode or scheduled.due_at is None:
+            return True
+        return scheduled.due_at <= datetime.combine(self._day, dt_time.max)
+
+    def _build_heap(self, flag: Optional[str]) -> List[tuple]:
+        heap = [scheduled.sort_key(self._due_mode) + (scheduled.version, scheduled.word)
+                for scheduled in self._words.values()
+                if scheduled.word not in self._studied_today
+                and (flag is None or flag in scheduled.flags)
+                and self._is_due(scheduled)]
+        heapq.heapify(heap)
+        return heap
+
+    def _roll_over_if_needed(self) -> None:
+        """跨天时清空今天已背单词，并重建所有堆"""
+        today = date.today()
+        if today == self._day:
+            return
+        self._day = today
+        self._studied_today.clear()
+        self._heaps = {None: self._build_heap(None)}
+
+    def _is_valid(self, entry: tuple, flag: Optional[str]) -> bool:
+        scheduled = self._words.get(entry[-1])
+        return (scheduled is not None
+                and scheduled.version == entry[-2]
+                and (flag is None or flag in scheduled.flags))
+
+    def pick(self, flag: Optional[str] = None) -> Tuple[Optional[ScheduledWord], bool]:
+        """
+        选择下一个要背的单词
+        return: (单词, 是否已全部斩完)，今天待背的单词都背过了时单词为None
+        """
+        flag = None if not flag or flag == ALL_FLAG else flag
+        with self._lock:
+            self._roll_over_if_needed()
+            remaining = len(self._words) if flag is None else self._flag_counts.get(flag, 0)
+            if remaining == 0:
+                return None, True
+            heap = self._heaps.get(flag)
+            if heap is None:
+                heap = self._heaps[flag] = self._build_heap(flag)
+            while heap:
+                entry = heap[0]
+                if not self._is_valid(entry, flag) or entry[-1] in self._studied_today:
+                    # 失效条目或今天已背过的单词，直接丢弃（跨天时会重建）
+                    heapq.heappop(heap)
+                    continue
+                return self._words[entry[-1]], False
+            return None, False
+
+    def peek(self, flag: Optional[str] = None, count: int = 1) -> List[ScheduledWord]:
+        """
+        按顺序查看接下来要背的若干个单词，不修改堆
+        沿堆的树结构按需展开，只访问 O(count) 个节点
+        """
+        flag = None if not flag or flag == ALL_FLAG else flag
+        result = []
+        with self._lock:
+            self._roll_over_if_needed()
+            heap = self._heaps.get(flag)
+            if heap is None:
+                heap = self._heaps[flag] = self._build_heap(flag)
+            frontier = [(heap[0], 0)] if heap else []
+            while frontier and len(result) < count:
+                entry, index = heapq.heappop(frontier)
+                if self._is_valid(entry, flag) and entry[-1] not in self._studied_today:
+                    result.append(self._words[entry[-1]])
+                for child in (2 * index + 1, 2 * index + 2):
+                    if child < len(heap):
+                        heapq.heappush(frontier, (heap[child], child))
+        return result
+
+    def on_word_answered(self, word: str, word_status: int, updated_at: datetime = None, due_at: datetime = None) -> None:
+        """
+        单词答题后更新调度：标记为今天已背，并按新的状态、到期时间重新排序
+        """
+        with self._lock:
+            self._roll_over_if_needed()
+            self._studied_today.add(word)
+            scheduled = self._words.get(word)
+            if scheduled is None:
+                return
+            if word_status not in STUDY_STATUS_SET:
+                # 已斩的单词不再参与调度
+                del self._words[word]
+                self._count_flags(scheduled.flags, -1)
+                return
+            scheduled.word_status = word_status
+            scheduled.updated_at = updated_at or datetime.now()
+            if due_at is not None:
+                scheduled.due_at = due_at
+            scheduled.version += 1
+            # 今天已背过，跨天重建堆时才会重新入堆
+
+
+@injectable
+class StudySchedulerService:
+    """
+    背单词调度服务，按(用户ID, 词库ID)缓存调度器，首次使用或过期时从数据库重建
+    """
+
+    def __init__(self, spaced_repetition_service: SpacedRepetitionService):
+        self.spaced_repetition_service = spaced_repetition_service
+        self._schedulers = LRUCache(settings.STUDY_SCHEDULER_CACHE_SIZE)
+        self._load_lock = threading.Lock()
+        # 多个进程时，其他进程中的答题和失效同步到本进程的调度器
+        self._notifier = get_cluster_notifier()
+        self._notifier.subscribe(WORD_ANSWERED_EVENT, self._handle_word_answered)
+        self._notifier.subscribe(INVALIDATE_EVENT, self._handle_invalidate)
+
+    def get_scheduler(self, user_id: int, word_bank_id: int) -> StudyScheduler:
+        """
+        获取调度器，不存在或超过有效期时从数据库加载
+        """
+        key = (user_id, word_bank_id)
+        scheduler = self._schedulers.get(key)
+        if scheduler is not None and time.time() - scheduler.loaded_at < settings.STUDY_SCHEDULER_TTL_SECONDS:
+            return scheduler
+        with self._load_lock:
+            scheduler = self._schedulers.get(key)
+            if scheduler is None or time.time() - scheduler.loaded_at >= settings.STUDY_SCHEDULER_TTL_SECONDS:
+                scheduler = self.load_scheduler(user_id, word_bank_id)
+                self._schedulers.put(key, scheduler)
+        return scheduler
+
+    def get_cached_scheduler(self, user_id: int, word_bank_id: int) -> Optional[StudyScheduler]:
+        """
+        获取已加载且未过期的调度器，不存在时返回None（不访问数据库）
+        """
+        scheduler = self._schedulers.get((user_id, word_bank_id))
+        if scheduler is not None and time.time() - scheduler.loaded_at < settings.STUDY_SCHEDULER_TTL_SECONDS:
+            return scheduler
+        return None
+
+    @readonly
+    def load_scheduler(self, user_id: int, word_bank_id: int) -> StudyScheduler:
+        """
+        从数据库加载调度器：待背的用户单词和今天已背过的单词
+        """
+        start = time.time()
+        rows = get_db_session().query(
+            UserWord.id, UserWord.word, UserWord.word_status, UserWord.updated_at, UserWord.flags, UserWord.due_at
+        ).filter(
+            UserWord.user_id == user_id,
+            UserWord.word_bank_id == word_bank_id,
+            UserWord.word_status.in_(STUDY_STATUS_SET)
+        ).all()
+        studied_today = get_db_session().query(StudyRecord.word).filter(
+            StudyRecord.user_id == user_id,
+            StudyRecord.word_bank_id == word_bank_id,
+            func.date(StudyRecord.record_time) == datetime.now().date()
+        ).distinct().all()
+        scheduler = StudyScheduler(
+            (ScheduledWord(word=row.word,
+                           word_status=row.word_status,
+                           updated_at=row.updated_at,
+                           id=row.id,
+                           flags=tuple(row.flags or ()),
+                           due_at=row.due_at) for row in rows),
+            (row.word for row in studied_today),
+            due_mode=self.spaced_repetition_service.enabled
+        )
+        logger.info(f"背单词调度器加载完成: user_id={user_id}, word_bank_id={word_bank_id}, "
+                    f"待背单词数={len(scheduler)}, 耗时: {time.time() - start:.3f}秒")
+        return scheduler
+
+    def pick(self, user_id: int, word_bank_id: int, flag: str = None) -> Tuple[Optional[ScheduledWord], bool]:
+        """
+        选择下一个要背的单词
+        return: (单词, 是否已全部斩完)
+        """
+        return self.get_scheduler(user_id, word_bank_id).pick(flag)
+
+    def peek(self, user_id: int, word_bank_id: int, flag: str = None, count: int = 1) -> List[ScheduledWord]:
+        """
+        查看接下来要背的若干个单词
+        """
+        return self.get_scheduler(user_id, word_bank_id).peek(flag, count)
+
+    def on_word_answered(self, user_id: int, word_bank_id: int, word: str, word_status: int, due_at: datetime = None) -> None:
+        """
+        单词答题后更新调度器（调度器未加载时无需处理）
+        在答题事务中调用时，事务提交后才更新本进程的调度器，通知也在事务提交后才投递到其他进程，事务回滚时都不更新
+        """
+        session = get_db_session()
+        if session is not None and not session.info.get('read_only'):
+            event.listen(session, "after_commit",
+                         lambda *args: self._apply_word_answered(user_id, word_bank_id, word, word_status, due_at), once=True)
+        else:
+            self._apply_word_answered(user_id, word_bank_id, word, word_status, due_at)
+        self._notifier.publish(WORD_ANSWERED_EVENT, {
+            "user_id": user_id,
+            "word_bank_id": word_bank_id,
+            "word": word,
+            "word_status": word_status,
+            "due_at": due_at.isoformat() if due_at else None
+        })
+
+    def _apply_word_answered(self, user_id: int, word_bank_id: int, word: str, word_status: int, due_at: datetime = None) -> None:
+        scheduler = self._schedulers.get((user_id, word_bank_id))
+        if scheduler is not None:
+            scheduler.on_word_answered(word, word_status, due_at=due_at)
+
+    def invalidate(self, user_id: int, word_bank_id: int) -> None:
+        """
+        使调度器失效，下次选词时从数据库重建（单词标签、状态被批量修改时调用）
+        """
+        self._schedulers.pop((user_id, word_bank_id))
+        self._notifier.publish(INVALIDATE_EVENT, {"user_id": user_id, "word_bank_id": word_bank_id})
+
+    def _handle_word_answered(self, data: dict) -> None:
+        """处理其他进程中的单词答题"""
+        due_at = datetime.fromisoformat(data["due_at"]) if data.get("due_at") else None
+        self._apply_word_answered(data["user_id"], data["word_bank_id"], data["word"], data["word_status"], due_at)
+
+    def _handle_invalidate(self, data: dict) -> None:
+        """处理其他进程中的调度器失效"""
+        self._schedulers.pop((data["user_id"], data["word_bank_id"]))
@@ -2,12 +2,14 @@ from datetime import datetime, timedelta
 import json
 from typing import List, Tuple
 from framework.container.container_decorator import injectable
+from framework.database.async_db_decorator import async_readonly, async_transactional
+from framework.database.async_db_factory import get_async_db_session
 from framework.database.db_decorator import readonly, transactional
 from framework.database.db_factory import get_db_session
-from framework.util.dify_utill import run_workflow
+from framework.util.dify_client import get_dify_client
 from study.domain.entity.study_record import StudyRecord
 import uuid
-from sqlalchemy import func
+from sqlalchemy import func, select, text, update
 from framework.util.logger import setup_logger
 from study.domain.entity.user_word import UserWord
 from study.dto.study_dto import AnswerInfoDto, AnswerInfoItem, JudgePhraseResponse
@@ -17,6 +19,119 @@ from word.domain.entity.word import Word
 
 logger = setup_logger(__name__)
 
+# 增量处理学习记录的ID上限：当前最大ID，但不超过仍在答题中的最早记录
+STUDY_RECORD_WATERMARK_SQL = text("""
+SELECT COALESCE(
+    (SELECT min(id) - 1 FROM zcg.t_user_study_record
+     WHERE id > :after_id AND record_time IS NULL AND created_at > now() - CAST(:open_interval AS interval)),
+    (SELECT max(id) FROM zcg.t_user_study_record),
+    :after_id
+)
+""")
+
+# 需要加入hard词批次的单词，按第一次背词时间排序
+HARD_WORD_CANDIDATES_SELECT = """
+SELECT uw.user_id, uw.word_bank_id, uw.word,
+       (SELECT min(r.record_time) FROM zcg.t_user_study_record r
+        WHERE r.user_id = uw.user_id AND r.word_bank_id = uw.word_bank_id AND r.word = uw.word
+          AND r.record_time IS NOT NULL) AS first_record_time
+FROM zcg.t_user_word uw
+"""
+HARD_WORD_CANDIDATES_ORDER = """
+ORDER BY uw.user_id, uw.word_bank_id, first_record_time
+"""
+ALL_HARD_WORD_CANDIDATES_SQL = text(HARD_WORD_CANDIDATES_SELECT + """
+WHERE uw.incorrect_count >= :fault_count AND NOT uw.in_hard_batch
+""" + HARD_WORD_CANDIDATES_ORDER)
+# 增量查询：新增学习记录中答错过的单词，以及since之后修改过的用户单词
+# （从hard词批次中移除的单词、水位线推进后才重新提交答案的单词），since为空时不按修改时间过滤
+# 未加入批次的hard词很少，由部分索引 t_user_word_hard_candidate_idx 过滤
+NEW_HARD_WORD_CANDIDATES_SQL = text(HARD_WORD_CANDIDATES_SELECT + """
+WHERE uw.incorrect_count >= :fault_count AND NOT uw.in_hard_batch
+  AND (uw.updated_at > COALESCE(CAST(:since AS timestamptz), '-infinity')
+       OR EXISTS (SELECT 1 FROM zcg.t_user_study_record t
+                  WHERE t.id > :after_id AND t.id <= :upper_id AND t.study_result = 0
+                    AND t.user_id = uw.user_id AND t.word_bank_id = uw.word_bank_id AND t.word = uw.word))
+""" + HARD_WORD_CANDIDATES_ORDER)
+
+# 学习记录ID在(after_id, upper_id]范围内答错的单词，每个单词取最早的答错时间，按答错顺序排序
+INCORRECT_WORDS_SQL = text("""
+SELECT user_id, word_bank_id, word, min(record_time) AS record_time
+FROM zcg.t_user_study_record
+WHERE id > :after_id AND id <= :upper_id AND study_result = 0
+  AND record_time >= COALESCE(CAST(:since AS timestamp), '-infinity')
+GROUP BY user_id, word_bank_id, word
+ORDER BY min(id)
+""")
+
+# 提交答案：一条语句完成学习记录和用户单词的更新
+# old: 锁定学习记录，读取之前的答题结果（重复提交时统计字段只按差值更新）
+# prev: 锁定用户单词，读取之前的单词状态
+# uw: 更新答题统计，并按 decide_word_status 相同的规则计算新的单词状态
+# rec: 更新学习记录的答题信息和单词状态
+# stat: 单词状态变化时增量更新用户词库单词状态统计（旧状态的计数减1，新状态的计数加1）
+SUBMIT_ANSWER_SQL = text("""
+WITH old AS (
+    SELECT id, study_result AS old_result
+    FROM zcg.t_user_study_record
+    WHERE seq_id = :task_id
+    FOR UPDATE
+),
+delta AS (
+    SELECT (CASE WHEN :study_result = 1 THEN 1 ELSE 0 END) - (CASE WHEN old_result = 1 THEN 1 ELSE 0 END) AS correct_delta,
+           (CASE WHEN :study_result = 0 THEN 1 ELSE 0 END) - (CASE WHEN old_result = 0 THEN 1 ELSE 0 END) AS incorrect_delta
+    FROM old
+),
+prev AS (
+    SELECT id, word_status
+    FROM zcg.t_user_word
+    WHERE user_id = :user_id AND word_bank_id = :word_bank_id AND word = :word
+    ORDER BY id
+    LIMIT 1
+    FOR UPDATE
+),
+uw AS (
+    UPDATE zcg.t_user_word u
+    SET correct_count = u.correct_count + delta.correct_delta,
+        incorrect_count = u.incorrect_count + delta.incorrect_delta,
+        first_correct_time = CASE WHEN :study_result = 1 THEN COALESCE(u.first_correct_time, :record_time) ELSE u.first_correct_time END,
+        last_correct_time = CASE WHEN :study_result = 1 THEN :record_time ELSE u.last_correct_time END,
+        word_status = CASE
+            WHEN :study_result <> 1 THEN 0
+            WHEN u.correct_count + delta.correct_delta <= 1 THEN 1
+            WHEN CAST(:record_time AS timestamp) - COALESCE(u.first_correct_time, :record_time) > interval '30 days' THEN 2
+            ELSE 1
+        END
+    FROM prev, delta
+    WHERE u.id = prev.id
+    RETURNING u.word_status, prev.word_status AS old_word_status
+),
+rec AS (
+    UPDATE zcg.t_user_study_record r
+    SET record_time = :record_time,
+        study_result = :study_result,
+        answer_info = CAST(:answer_info AS json),
+        word_status = (SELECT word_status FROM uw)
+    FROM old
+    WHERE r.id = old.id
+    RETURNING r.id
+),
+stat AS (
+    UPDATE zcg.t_user_word_bank_stat s
+    SET wait_count = s.wait_count + (CASE WHEN uw.word_status = 0 THEN 1 ELSE 0 END) - (CASE WHEN uw.old_word_status = 0 THEN 1 ELSE 0 END),
+        slaining_count = s.slaining_count + (CASE WHEN uw.word_status = 1 THEN 1 ELSE 0 END) - (CASE WHEN uw.old_word_status = 1 THEN 1 ELSE 0 END),
+        slain_count = s.slain_count + (CASE WHEN uw.word_status = 2 THEN 1 ELSE 0 END) - (CASE WHEN uw.old_word_status = 2 THEN 1 ELSE 0 END),
+        updated_at = now()
+    FROM uw
+    WHERE s.user_id = :user_id AND s.word_bank_id = :word_bank_id
+      AND uw.word_status <> uw.old_word_status
+    RETURNING s.id
+)
+SELECT (SELECT word_status FROM uw) AS word_status,
+       (SELECT old_word_status FROM uw) AS old_word_status,
+       (SELECT count(*) FROM rec) AS record_count
+""")
+
 @injectable
 class StudyService:
     @transactional
@@ -31,36 +146,160 @@ class StudyService:
         get_db_session().add(study_record)
         return study_record.seq_id
     
+    @async_transactional
+    async def create_study_record_async(self,user_id:int,word_bank_id:int,word:str) -> str:
+        """
+        创建学习记录（异步）
+        """
+        study_record = StudyRecord(user_id=user_id,
+                                   word_bank_id=word_bank_id,
+                                   word=word,
+                                   seq_id=str(uuid.uuid4()))
+        get_async_db_session().add(study_record)
+        return study_record.seq_id
+
     @transactional
-    def update_study_record(self,user_id:int,word_bank_id:int,answer_info:AnswerInfoDto) -> int:
+    def submit_answer(self,user_id:int,word_bank_id:int,answer_info:AnswerInfoDto) -> Tuple[int,int]:
         """
-        根据提交的答题信息，更新学习记录
+        提交答案：一次数据库往返完成学习记录、用户单词答题统计、单词状态和用户词库单词状态统计的更新
+        return: (新的单词状态, 之前的单词状态)，用户单词不存在时之前的单词状态为None
         """
-        # 将 answer_info 转换为字典
-        answer_info_dict = [item.model_dump() for item in answer_info.answer_info]
-        
-        # 更新学习记录的record_time,study_result,answer_info
-        get_db_session().query(StudyRecord).filter(StudyRecord.seq_id == answer_info.task_id).update({
-                StudyRecord.record_time: datetime.now(),
-                StudyRecord.study_result: answer_info.study_result,
-                StudyRecord.answer_info: answer_info_dict
-        })
-        get_db_session().flush()
-        # 计算单词状态
+        answer_info_json = json.dumps([item.model_dump() for item in answer_info.answer_info], ensure_ascii=False)
+        row = get_db_session().execute(SUBMIT_ANSWER_SQL, {
+            "task_id": answer_info.task_id,
+            "user_id": user_id,
+            "word_bank_id": word_bank_id,
+            "word": answer_info.word,
+            "study_result": answer_info.study_result,
+            "record_time": datetime.now(),
+            "answer_info": answer_info_json
+        }).first()
+        if row.word_status is not None:
+            return row.word_status, row.old_word_status
+        if row.record_count == 0:
+            logger.warning(f"学习记录不存在: task_id={answer_info.task_id}")
+        # 用户单词不存在时，按学习记录计算单词状态
         word_status = self.compute_word_status(user_id,word_bank_id,answer_info.word,answer_info.study_result)
-        # 更新学习记录的word_status
         get_db_session().query(StudyRecord).filter(StudyRecord.seq_id == answer_info.task_id).update({
             StudyRecord.word_status: word_status
         })
-        get_db_session().flush()
-        return word_status
+        return word_status, None
+
+    @async_transactional
+    async def submit_answer_async(self,user_id:int,word_bank_id:int,answer_info:AnswerInfoDto) -> Tuple[int,int]:
+        """
+        提交答案（异步），与 submit_answer 一致
+        return: (新的单词状态, 之前的单词状态)，用户单词不存在时之前的单词状态为None
+        """
+        db_session = get_async_db_session()
+        record_time = datetime.now()
+        answer_info_json = json.dumps([item.model_dump() for item in answer_info.answer_info], ensure_ascii=False)
+        row = (await db_session.execute(SUBMIT_ANSWER_SQL, {
+            "task_id": answer_info.task_id,
+            "user_id": user_id,
+            "word_bank_id": word_bank_id,
+            "word": answer_info.word,
+            "study_result": answer_info.study_result,
+            "record_time": record_time,
+            "answer_info": answer_info_json
+        })).first()
+        if row.word_status is not None:
+            return row.word_status, row.old_word_status
+        if row.record_count == 0:
+            logger.warning(f"学习记录不存在: task_id={answer_info.task_id}")
+        # 用户单词不存在时，按学习记录计算单词状态
+        is_correct = StudyRecord.study_result == StudyResultEnum.CORRECT.code
+        stats = (await db_session.execute(
+            select(func.count().label('correct_count'),
+                   func.min(StudyRecord.record_time).label('first_correct_time'),
+                   func.max(StudyRecord.record_time).label('last_correct_time'))
+            .where(StudyRecord.user_id == user_id,
+                   StudyRecord.word_bank_id == word_bank_id,
+                   StudyRecord.word == answer_info.word,
+                   is_correct)
+        )).first()
+        word_status = self.decide_word_status(answer_info.study_result,stats.correct_count,stats.first_correct_time,stats.last_correct_time)
+        await db_session.execute(
+            update(StudyRecord).where(StudyRecord.seq_id == answer_info.task_id).values({StudyRecord.word_status: word_status})
+        )
+        return word_status, None
+
+    def decide_word_status(self,study_result:int,correct_count:int,first_correct_time:datetime,last_correct_time:datetime) -> int:
+        """
+        根据答题统计计算单词状态（用户单词不存在时使用，用户单词存在时由 SUBMIT_ANSWER_SQL 按相同的规则计算）
+        答错：等待斩杀；只答对过一次：斩杀中；第一次与最后一次答对间隔超过30天：斩杀成功
+        """
+        if study_result == StudyResultEnum.INCORRECT.code:
+            return UserWordStatusEnum.WAIT_SLAIN.code
+        if correct_count <= 1 or first_correct_time is None or last_correct_time is None:
+            return UserWordStatusEnum.SLAINING.code
+        if last_correct_time - first_correct_time > timedelta(days=30):
+            return UserWordStatusEnum.SLAINED.code
+        return UserWordStatusEnum.SLAINING.code
+
+    @transactional
+    def backfill_word_study_stats(self,user_id:int=None,word_bank_id:int=None) -> int:
+        """
+        根据学习记录重新计算用户单词的答题统计
+        param user_id: 用户ID，为空时计算所有用户
+        param word_bank_id: 词库ID，为空时计算所有词库
+        return: 更新的用户单词数
+        """
+        db_session = get_db_session()
+        user_word_conditions = []
+        record_conditions = [StudyRecord.record_time != None]
+        if user_id is not None:
+            user_word_conditions.append(UserWord.user_id == user_id)
+            record_conditions.append(StudyRecord.user_id == user_id)
+        if word_bank_id is not None:
+            user_word_conditions.append(UserWord.word_bank_id == word_bank_id)
+            record_conditions.append(StudyRecord.word_bank_id == word_bank_id)
+
+        # 先清零，没有学习记录的单词统计为0
+        db_session.execute(
+            update(UserWord)
+            .where(*user_word_conditions)
+            .values({UserWord.correct_count: 0,
+                     UserWord.incorrect_count: 0,
+                     UserWord.first_correct_time: None,
+                     UserWord.last_correct_time: None})
+            .execution_options(synchronize_session=False)
+        )
+
+        is_correct = StudyRecord.study_result == StudyResultEnum.CORRECT.code
+        is_incorrect = StudyRecord.study_result == StudyResultEnum.INCORRECT.code
+        stats = (
+            select(StudyRecord.user_id,
+                   StudyRecord.word_bank_id,
+                   StudyRecord.word,
+                   func.count().filter(is_correct).label('correct_count'),
+                   func.count().filter(is_incorrect).label('incorrect_count'),
+                   func.min(StudyRecord.record_time).filter(is_correct).label('first_correct_time'),
+                   func.max(StudyRecord.record_time).filter(is_correct).label('last_correct_time'))
+            .where(*record_conditions)
+            .group_by(StudyRecord.user_id, StudyRecord.word_bank_id, StudyRecord.word)
+            .subquery()
+        )
+        result = db_session.execute(
+            update(UserWord)
+            .where(UserWord.user_id == stats.c.user_id,
+                   UserWord.word_bank_id == stats.c.word_bank_id,
+                   UserWord.word == stats.c.word)
+            .values({UserWord.correct_count: stats.c.correct_count,
+                     UserWord.incorrect_count: stats.c.incorrect_count,
+                     UserWord.first_correct_time: stats.c.first_correct_time,
+                     UserWord.last_correct_time: stats.c.last_correct_time})
+            .execution_options(synchronize_session=False)
+        )
+        logger.info(f"用户单词答题统计回填完成: user_id={user_id}, word_bank_id={word_bank_id}, 更新数={result.rowcount}")
+        return result.rowcount
     
     @readonly     
     def compute_word_status(self,user_id:int,word_bank_id:int,word:str,study_result:int) -> int:
         import time
         step_start = time.time()
         """
-        计算单词状态
+        计算单词状态（按学习记录全量计算，仅在用户单词不存在时使用）
         """
         # 如果本次答题错误，则单词状态为等待斩杀
         if study_result == StudyResultEnum.INCORRECT.code:
@@ -73,16 +312,10 @@ class StudyService:
                                                             StudyRecord.word == word,
                                                             StudyRecord.study_result == StudyResultEnum.CORRECT.code).order_by(StudyRecord.record_time).all()
         logger.info(f"[性能] compute_word_status 查询耗时: {time.time() - query_start:.3f}秒, 记录数={len(records)}")
-        count = len(records)
-        if count == 1:
-            result = UserWordStatusEnum.SLAINING.code
-        else:
-            first_record = records[0]
-            last_record = records[-1]
-            if last_record.record_time - first_record.record_time > timedelta(days=30):
-                result = UserWordStatusEnum.SLAINED.code
-            else:
-                result = UserWordStatusEnum.SLAINING.code
+        result = self.decide_word_status(study_result,
+                                         len(records),
+                                         records[0].record_time if records else None,
+                                         records[-1].record_time if records else None)
         logger.info(f"[性能] compute_word_status 总耗时: {time.time() - step_start:.3f}秒")
         return result
     @readonly
@@ -95,21 +328,49 @@ class StudyService:
             StudyRecord.word_bank_id == word_bank_id,
             StudyRecord.record_time == None
         ).order_by(StudyRecord.id.desc()).first()
+
+    @async_readonly
+    async def query_empty_study_record_async(self,user_id:int,word_bank_id:int) -> StudyRecord:
+        """
+        查询 record_time 为空的 学习记录（异步）
+        """
+        result = await get_async_db_session().execute(
+            select(StudyRecord).where(
+                StudyRecord.user_id == user_id,
+                StudyRecord.word_bank_id == word_bank_id,
+                StudyRecord.record_time == None
+            ).order_by(StudyRecord.id.desc()).limit(1)
+        )
+        return result.scalars().first()
     
     def judge_phrase(self,phrase:AnswerInfoItem) -> JudgePhraseResponse:
         """
         判断短语是否正确
         """
-        inputs = {
+        api_key = settings.DIFY_API_KEY.get("DIFY_API_KEY_FOR_PHRASE")
+        result = get_dify_client().run_workflow(api_key,self._judge_phrase_inputs(phrase),"result")
+        logger.info(f"Dify result: {result}")
+        return self._judge_phrase_response(result)
+
+    async def judge_phrase_async(self,phrase:AnswerInfoItem) -> JudgePhraseResponse:
+        """
+        判断短语是否正确（异步），等待Dify响应期间不占用业务线程
+        """
+        api_key = settings.DIFY_API_KEY.get("DIFY_API_KEY_FOR_PHRASE")
+        result = await get_dify_client().run_workflow_async(api_key,self._judge_phrase_inputs(phrase),"result")
+        logger.info(f"Dify result: {result}")
+        return self._judge_phrase_response(result)
+
+    def _judge_phrase_inputs(self,phrase:AnswerInfoItem) -> dict:
+        return {
                "phrase_question": json.dumps({
                     "question": phrase.question,
                     "correct_answer": phrase.correct_answer,
                     "user_answer": phrase.user_answer
                }, ensure_ascii=False)
         }
-        api_key = settings.DIFY_API_KEY.get("DIFY_API_KEY_FOR_PHRASE")
-        result = run_workflow(api_key,inputs,"result")
-        logger.info(f"Dify result: {result}")
+
+    def _judge_phrase_response(self,result:str) -> JudgePhraseResponse:
         result_dict = json.loads(result)
         return JudgePhraseResponse(is_correct=result_dict.get("is_correct", False))
     
@@ -164,55 +425,6 @@ class StudyService:
         
         return converted_result
     
-    @readonly
-    def query_study_record_stats_last_hour(self) -> List[Tuple[int, int, int, int]]:
-        """
-        查询近1小时之内学习记录的总数和成功数，按user_id和word_bank_id分组
-        返回：[(user_id, word_bank_id, 总记录数, 成功记录数), ...]
-        """
-        # 计算1小时前的时间
-        one_hour_ago = datetime.now() - timedelta(hours=1)
-        
-        # 查询所有用户词库组合的总记录数
-        total_stats = (get_db_session().query(
-            StudyRecord.user_id,
-            StudyRecord.word_bank_id,
-            func.count(StudyRecord.id).label('total_count')
-        )
-        .filter(
-            StudyRecord.record_time >= one_hour_ago,
-            StudyRecord.record_time != None
-        )
-        .group_by(StudyRecord.user_id, StudyRecord.word_bank_id)
-        .all())
-        
-        # 查询所有用户词库组合的成功记录数 (study_result=1)
-        success_stats = (get_db_session().query(
-            StudyRecord.user_id,
-            StudyRecord.word_bank_id,
-            func.count(StudyRecord.id).label('success_count')
-        )
-        .filter(
-            StudyRecord.record_time >= one_hour_ago,
-            StudyRecord.record_time != None,
-            StudyRecord.study_result == 1
-        )
-        .group_by(StudyRecord.user_id, StudyRecord.word_bank_id)
-        .all())
-        
-        # 将成功记录数转换为字典，方便查找
-        success_dict = {(user_id, word_bank_id): success_count 
-                        for user_id, word_bank_id, success_count in success_stats}
-        
-        # 合并结果
-        result = []
-        for user_id, word_bank_id, total_count in total_stats:
-            success_count = success_dict.get((user_id, word_bank_id), 0)
-            result.append((user_id, word_bank_id, total_count, success_count))
-            logger.info(f"用户{user_id}在词库{word_bank_id}近1小时学习记录统计: 总数={total_count}, 成功数={success_count}")
-        
-        return result
-        
     @readonly
     def query_study_record_count(self,user_id:int,word_bank_id:int,study_date:str,study_result:int) -> int:
         """
@@ -244,60 +456,39 @@ class StudyService:
         ).all()
     
     @readonly
-    def query_user_id_word_bank_id_tuple_list(self) -> List[Tuple[int, int]]:
+    def get_study_record_watermark(self,after_id:int,open_hours:int) -> int:
         """
-        从study_record表中查询所有唯一的user_id和word_bank_id组合
-        返回：[(user_id, word_bank_id), ...]
+        计算本次增量处理的学习记录ID上限（新的水位线）
+        学习记录先创建、后答题，上限不超过仍在答题中（未答题且创建时间在open_hours小时内）的最早记录，
+        避免答题晚于水位线推进的记录被跳过；超过open_hours小时仍未答题的记录视为已放弃
         """
-        result = (get_db_session().query(
-            StudyRecord.user_id,
-            StudyRecord.word_bank_id
-        )
-        .group_by(StudyRecord.user_id, StudyRecord.word_bank_id)
-        .all())
-        return result
+        return get_db_session().execute(STUDY_RECORD_WATERMARK_SQL, {
+            "after_id": after_id,
+            "open_interval": f"{int(open_hours)} hours"
+        }).scalar()
 
     @readonly
-    def get_hard_word_record_list(self,user_id:int,word_bank_id:int,fault_count) -> List[str]:
-        """
-        获取困难单词学习记录列表
-        """
-        hard_word_list = []
-        study_record_list = self.query_study_record_list(user_id,word_bank_id,use_snapshot_word_status=False)
-        # 按word分组
-        word_groups = {}
-        for record in study_record_list:
-            if record.word not in word_groups:
-                word_groups[record.word] = []
-            word_groups[record.word].append(record)
-        
-        # 只留下错误次数大于等于fault_count次的困难单词
-        word_groups = {word: records for word, records in word_groups.items() 
-                       if sum(1 for record in records if record.study_result == 0) >= fault_count}
-       
-        word_min_time_list = [
-            (word, min(record.record_time for record in records))
-            for word, records in word_groups.items()
-        ]
-        # 按照min_record_time排序
-        word_min_time_list.sort(key=lambda x: x[1])
-        for word, min_record_time in word_min_time_list:
-            hard_word_list.append(word)
-
-        return hard_word_list    
+    def query_incorrect_words(self,after_id:int,upper_id:int,since:datetime=None) -> List[Tuple[int,int,str,datetime]]:
+        """
+        查询学习记录ID在(after_id, upper_id]范围内答错的单词
+        param since: 只查询答题时间不早于since的记录，为空时不限制
+        return: [(user_id, word_bank_id, word, 最早的答错时间), ...]，按答错顺序排序
+        """
+        rows = get_db_session().execute(INCORRECT_WORDS_SQL, {"after_id": after_id, "upper_id": upper_id, "since": since}).all()
+        return [(row.user_id, row.word_bank_id, row.word, row.record_time) for row in rows]
 
     @readonly
-    def get_incorrect_word_record_list(self,user_id:int,word_bank_id:int,start_time:str,end_time:str) -> List[str]:
+    def query_hard_word_candidates(self,fault_count:int,after_id:int=None,upper_id:int=None,since:datetime=None) -> List[Tuple[int,int,str]]:
         """
-        获取错词学习记录列表
+        查询需要加入hard词批次的单词：答错次数>=fault_count且未加入hard词批次
+        param after_id, upper_id: 只查询学习记录ID在(after_id, upper_id]范围内答错过的单词，after_id为空时查询所有用户单词
+        param since: 同时查询since之后修改过的用户单词（从批次中移除、重新提交答案），为空时查询所有未加入批次的hard词
+        return: [(user_id, word_bank_id, word), ...]，按用户、词库、第一次背词时间排序
         """
-        results = get_db_session().query(StudyRecord.word).filter(
-            StudyRecord.user_id == user_id, 
-            StudyRecord.word_bank_id == word_bank_id,
-            func.date(StudyRecord.created_at) >= start_time,
-            func.date(StudyRecord.created_at) <= end_time,
-            StudyRecord.study_result == StudyResultEnum.INCORRECT.code
-        ).distinct(StudyRecord.word).all()
-        
-        # 将 Row 对象转换为字符串列表
-        return [row[0] for row in results]
\ No newline at end of file
+        if after_id is None:
+            sql, params = ALL_HARD_WORD_CANDIDATES_SQL, {"fault_count": fault_count}
+        else:
+            sql, params = NEW_HARD_WORD_CANDIDATES_SQL, {"fault_count": fault_count, "after_id": after_id, "upper_id": upper_id,
+                                                         "since": since}
+        rows = get_db_session().execute(sql, params).all()
+        return [(row.user_id, row.word_bank_id, row.word) for row in rows]
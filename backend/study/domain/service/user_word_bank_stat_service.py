@@ -0,0 +1,139 @@
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from framework.container.container_decorator import injectable
+from framework.database.async_db_decorator import async_readonly
+from framework.database.async_db_factory import get_async_db_session
+from framework.database.db_decorator import readonly, transactional
+from framework.database.db_factory import get_db_session
+from framework.util.logger import setup_logger
+from study.domain.entity.user_word import UserWord
+from study.domain.entity.user_word_bank_stat import UserWordBankStat
+from study.dto.study_dto import UserWordStatusStatsDto
+from study.enums.study_enums import UserWordStatusEnum
+
+logger = setup_logger(__name__)
+
+@injectable
+class UserWordBankStatService:
+    """
+    用户词库单词状态统计服务
+    提交答案时在 StudyService 的 SUBMIT_ANSWER_SQL 中按单词状态变化增量更新统计，定时按用户单词表全量校准
+    """
+
+    @readonly
+    def get_user_word_status_stats(self,user_id:int,word_bank_id:int) -> UserWordStatusStatsDto:
+        """
+        获取用户单词状态统计，统计记录不存在时按用户单词表实时统计
+        """
+        stat = get_db_session().query(UserWordBankStat).filter(
+            UserWordBankStat.user_id == user_id,
+            UserWordBankStat.word_bank_id == word_bank_id
+        ).first()
+        if stat is None:
+            logger.warning(f"用户词库单词状态统计不存在，实时统计: user_id={user_id}, word_bank_id={word_bank_id}")
+            return self.count_user_word_status(user_id,word_bank_id)
+        return UserWordStatusStatsDto(
+            slain_word_count=stat.slain_count,
+            slaining_word_count=stat.slaining_count,
+            wait_word_count=stat.wait_count,
+            total_word_count=stat.total_count
+        )
+
+    @async_readonly
+    async def get_user_word_status_stats_async(self,user_id:int,word_bank_id:int) -> UserWordStatusStatsDto:
+        """
+        获取用户单词状态统计（异步），统计记录不存在时按用户单词表实时统计
+        """
+        stat = (await get_async_db_session().execute(
+            select(UserWordBankStat).where(
+                UserWordBankStat.user_id == user_id,
+                UserWordBankStat.word_bank_id == word_bank_id
+            )
+        )).scalars().first()
+        if stat is None:
+            logger.warning(f"用户词库单词状态统计不存在，实时统计: user_id={user_id}, word_bank_id={word_bank_id}")
+            result = (await get_async_db_session().execute(
+                self._status_count_select().where(UserWord.user_id == user_id, UserWord.word_bank_id == word_bank_id)
+            )).first()
+            return UserWordStatusStatsDto(
+                slain_word_count=result.slain_count if result else 0,
+                slaining_word_count=result.slaining_count if result else 0,
+                wait_word_count=result.wait_count if result else 0,
+                total_word_count=result.total_count if result else 0
+            )
+        return UserWordStatusStatsDto(
+            slain_word_count=stat.slain_count,
+            slaining_word_count=stat.slaining_count,
+            wait_word_count=stat.wait_count,
+            total_word_count=stat.total_count
+        )
+
+    @readonly
+    def count_user_word_status(self,user_id:int,word_bank_id:int) -> UserWordStatusStatsDto:
+        """
+        按用户单词表实时统计各状态单词数
+        """
+        result = get_db_session().execute(
+            self._status_count_select().where(UserWord.user_id == user_id, UserWord.word_bank_id == word_bank_id)
+        ).first()
+        return UserWordStatusStatsDto(
+            slain_word_count=result.slain_count if result else 0,
+            slaining_word_count=result.slaining_count if result else 0,
+            wait_word_count=result.wait_count if result else 0,
+            total_word_count=result.total_count if result else 0
+        )
+
+    @transactional
+    def refresh_stat(self,user_id:int,word_bank_id:int) -> None:
+        """
+        按用户单词表重新计算某个用户词库的统计（不存在时创建）
+        """
+        self._upsert_from_user_word(UserWord.user_id == user_id, UserWord.word_bank_id == word_bank_id)
+
+    @transactional
+    def reconcile_all(self) -> int:
+        """
+        按用户单词表全量校准统计，只更新与实际不一致的记录
+        return: 校准的记录数
+        """
+        return self._upsert_from_user_word(only_changed=True)
+
+    def _status_count_select(self):
+        """
+        按用户、词库统计各状态单词数的查询
+        """
+        return select(
+            UserWord.user_id,
+            UserWord.word_bank_id,
+            func.count().filter(UserWord.word_status == UserWordStatusEnum.WAIT_SLAIN.code).label('wait_count'),
+            func.count().filter(UserWord.word_status == UserWordStatusEnum.SLAINING.code).label('slaining_count'),
+            func.count().filter(UserWord.word_status == UserWordStatusEnum.SLAINED.code).label('slain_count'),
+            func.count().label('total_count')
+        ).group_by(UserWord.user_id, UserWord.word_bank_id)
+
+    def _upsert_from_user_word(self,*conditions,only_changed:bool=False) -> int:
+        """
+        按用户单词表统计并写入统计表
+        """
+        stmt = insert(UserWordBankStat).from_select(
+            ['user_id', 'word_bank_id', 'wait_count', 'slaining_count', 'slain_count', 'total_count'],
+            self._status_count_select().where(*conditions)
+        )
+        where = None
+        if only_changed:
+            where = ((UserWordBankStat.wait_count != stmt.excluded.wait_count) |
+                     (UserWordBankStat.slaining_count != stmt.excluded.slaining_count) |
+                     (UserWordBankStat.slain_count != stmt.excluded.slain_count) |
+                     (UserWordBankStat.total_count != stmt.excluded.total_count))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['user_id', 'word_bank_id'],
+            set_={
+                'wait_count': stmt.excluded.wait_count,
+                'slaining_count': stmt.excluded.slaining_count,
+                'slain_count': stmt.excluded.slain_count,
+                'total_count': stmt.excluded.total_count,
+                'updated_at': func.now()
+            },
+            where=where
+        )
+        return get_db_session().execute(stmt).rowcount
@@ -1,54 +1,82 @@
+import time
 from datetime import datetime
 from enum import Enum
 from typing import Dict, List, Set, Tuple
 from framework.container.container_decorator import injectable
 from framework.database.db_decorator import readonly, transactional
 from framework.database.db_factory import get_db_session
-from framework.util.word_util import mask_word as mask_word_util
+from framework.util.word_util import mask_word_batch
 from framework.util.logger import setup_logger
+from framework.config.config import settings
 from study.domain.entity.study_record import StudyRecord
 from study.domain.entity.user_word import UserWord
+from study.domain.service.study_scheduler_service import StudySchedulerService
+from study.domain.service.user_word_bank_stat_service import UserWordBankStatService
 from study.dto.study_dto import UserFlagsSetDto, UserWordStatusStatsDto
 from study.dto.word_info_dto import InflectionListDto
 from study.enums.study_enums import InflectionTypeEnum, UserFlagsOperateTypeEnum, UserWordStatusEnum
 from word.application.word_app_service import WordAppService
 from word.domain.entity.word import Word
-from sqlalchemy import and_, case, func, or_
+from sqlalchemy import and_, func, or_, text
 from sqlalchemy.dialects.postgresql import JSONB
 
 logger = setup_logger(__name__)
 
+# 用词库中的单词初始化用户单词，已存在的用户单词跳过
+INIT_USER_WORD_SQL = """
+INSERT INTO zcg.t_user_word (user_id, word_bank_id, word, word_status, flags)
+SELECT :user_id, w.word_bank_id, w.word, 0, w.flags
+FROM zcg.t_word w
+WHERE w.word_bank_id = :word_bank_id
+ON CONFLICT (user_id, word_bank_id, word) DO NOTHING
+"""
+
 @injectable
 class UserWordService:
     """用户单词服务类"""
-    def __init__(self,word_app_service:WordAppService):
+    def __init__(self,word_app_service:WordAppService,user_word_bank_stat_service:UserWordBankStatService,study_scheduler_service:StudySchedulerService):
         self.word_app_service = word_app_service
+        self.user_word_bank_stat_service = user_word_bank_stat_service
+        self.study_scheduler_service = study_scheduler_service
 
     @transactional
     def init_user_word(self, user_id:int,word_bank_id:int) -> None:
         """
-        初始化用户单词
+        初始化用户单词：在数据库中直接用词库的单词生成用户单词，不把单词加载到Python中
+        已有的用户单词由唯一索引(user_id, word_bank_id, word)跳过，重复调用时只补充词库中新增的单词
         """
-        # 先判断之前有没有数据
-        user_word = get_db_session().query(UserWord).filter(UserWord.user_id == user_id,UserWord.word_bank_id == word_bank_id).first()
-        if user_word:
+        start = time.time()
+        insert_count = get_db_session().execute(text(INIT_USER_WORD_SQL),
+                                                {"user_id": user_id, "word_bank_id": word_bank_id}).rowcount
+        logger.info(f"[性能] 初始化用户单词: user_id={user_id}, word_bank_id={word_bank_id}, "
+                    f"新增单词数={insert_count}, 耗时: {time.time() - start:.3f}秒")
+        if insert_count == 0:
             return
+        # 初始化用户词库单词状态统计
+        self.user_word_bank_stat_service.refresh_stat(user_id,word_bank_id)
+        self.study_scheduler_service.invalidate(user_id,word_bank_id)
         
-        # 没有数据，则初始化
-        word_list = self.word_app_service.query_word_list(word_bank_id)
-        user_word_list = []
-        for word in word_list:
-            user_word = UserWord(user_id=user_id,
-                                 word_bank_id=word_bank_id,
-                                 word=word.word,
-                                 word_status=0,
-                                 flags=word.flags
-                                 )
-            user_word_list.append(user_word)
-        get_db_session().bulk_save_objects(user_word_list)
-        
-    @readonly
     def select_user_word_for_study(self,user_id:int,word_bank_id:int,flag:str=None) -> Tuple[UserWord,bool]:
+        """
+        选择一个用户单词，开启背单词调度器时从进程内的优先队列中选择
+        """
+        if not settings.STUDY_SCHEDULER_ENABLED:
+            return self.select_user_word_for_study_from_db(user_id,word_bank_id,flag)
+        scheduled,is_completed = self.study_scheduler_service.pick(user_id,word_bank_id,flag)
+        if scheduled is None:
+            return None,is_completed
+        user_word = UserWord(id=scheduled.id,
+                             user_id=user_id,
+                             word_bank_id=word_bank_id,
+                             word=scheduled.word,
+                             word_status=scheduled.word_status,
+                             flags=list(scheduled.flags),
+                             updated_at=scheduled.updated_at,
+                             due_at=scheduled.due_at)
+        return user_word,is_completed
+
+    @readonly
+    def select_user_word_for_study_from_db(self,user_id:int,word_bank_id:int,flag:str=None) -> Tuple[UserWord,bool]:
         is_completed = False
         """
         选择一个用户单词
@@ -95,16 +123,6 @@ class UserWordService:
         
         return user_word, is_completed
         
-    @transactional
-    def update_user_word_status(self,user_id:int,word_bank_id:int,word:str,word_status:int) -> None:
-        """
-        更新用户单词状态
-        """
-        get_db_session().query(UserWord).filter(UserWord.user_id == user_id,UserWord.word_bank_id == word_bank_id,UserWord.word == word).update({
-            UserWord.word_status: word_status
-        })
-        get_db_session().flush()
-    
     @readonly
     def select_user_word_list(self,user_id:int,word_bank_id:int,userWordStatusEnum:Enum = None) -> List[UserWord]:
         """
@@ -135,11 +153,14 @@ class UserWordService:
             # explanation 是 Word 表中的解释，需要赋值给 UserWord 对象
             user_word.explanation = explanation or ""
             user_word.unmask_word = user_word.word
-            # user_word.word_status != UserWordStatusEnum.SLAINED.value，对单词做*化处理(除了首字母外，其余字母都替换为*)
-            if user_word.word_status != UserWordStatusEnum.SLAINED.code:
-                user_word.word = mask_word_util(user_word.word,user_word.word)
             user_words.append(user_word)
 
+        # user_word.word_status != UserWordStatusEnum.SLAINED.value，对单词做*化处理(除了首字母外，其余字母都替换为*)
+        mask_user_words = [user_word for user_word in user_words if user_word.word_status != UserWordStatusEnum.SLAINED.code]
+        masked_words = mask_word_batch((user_word.word, user_word.word) for user_word in mask_user_words)
+        for user_word, masked_word in zip(mask_user_words, masked_words):
+            user_word.word = masked_word
+
         return user_words
     
     @readonly
@@ -147,13 +168,10 @@ class UserWordService:
         """
         获取用户单词列表，并返回单词与*化后的单词的映射
         """
-        mask_word_map = {}
         user_word_list = get_db_session().query(UserWord).filter(UserWord.user_id == user_id,UserWord.word_bank_id == word_bank_id,UserWord.word.in_(word_set)).all()
-        for user_word in user_word_list:
-            mask_word = user_word.word
-            if user_word.word_status != UserWordStatusEnum.SLAINED.code:
-                mask_word = mask_word_util(user_word.word,user_word.word)
-            mask_word_map[user_word.word] = mask_word
+        mask_word_map = {user_word.word: user_word.word for user_word in user_word_list}
+        mask_words = [user_word.word for user_word in user_word_list if user_word.word_status != UserWordStatusEnum.SLAINED.code]
+        mask_word_map.update(zip(mask_words, mask_word_batch((word, word) for word in mask_words)))
         return mask_word_map
     
     @readonly
@@ -237,28 +255,11 @@ class UserWordService:
     def get_user_word_status_stats(self,user_id:int,word_bank_id:int) -> UserWordStatusStatsDto:
         """
         获取用户单词状态统计，总的待斩词数、斩中词数、已斩词数、总词数
+        从增量维护的用户词库单词状态统计中读取
         """
         import time
         step_start = time.time()
-        # 使用 case 表达式和 sum 函数一次性统计各种状态的单词数量
-        query_start = time.time()
-        result = get_db_session().query(
-            func.sum(case((UserWord.word_status == UserWordStatusEnum.SLAINED.code, 1), else_=0)).label('slain_word_count'),
-            func.sum(case((UserWord.word_status == UserWordStatusEnum.SLAINING.code, 1), else_=0)).label('slaining_word_count'),
-            func.sum(case((UserWord.word_status == UserWordStatusEnum.WAIT_SLAIN.code, 1), else_=0)).label('wait_word_count'),
-            func.count(UserWord.id).label('total_word_count')
-        ).filter(
-            UserWord.user_id == user_id,
-            UserWord.word_bank_id == word_bank_id
-        ).first()
-        logger.info(f"[性能] get_user_word_status_stats 查询耗时: {time.time() - query_start:.3f}秒")
-
-        dto = UserWordStatusStatsDto(
-            slain_word_count=result.slain_word_count or 0,
-            slaining_word_count=result.slaining_word_count or 0,
-            wait_word_count=result.wait_word_count or 0,
-            total_word_count=result.total_word_count or 0
-        )
+        dto = self.user_word_bank_stat_service.get_user_word_status_stats(user_id,word_bank_id)
         logger.info(f"[性能] get_user_word_status_stats 总耗时: {time.time() - step_start:.3f}秒")
         return dto
     
@@ -266,7 +267,17 @@ class UserWordService:
         """
         获取用户单词背词率、斩词率
         """
-        stats_dto = self.get_user_word_status_stats(user_id,word_bank_id)
+        return self._word_ratio(self.get_user_word_status_stats(user_id,word_bank_id))
+
+    async def get_word_ratio_async(self,user_id:int,word_bank_id:int) -> Tuple[float,float]:
+        """
+        获取用户单词背词率、斩词率（异步）
+        """
+        return self._word_ratio(await self.user_word_bank_stat_service.get_user_word_status_stats_async(user_id,word_bank_id))
+
+    def _word_ratio(self,stats_dto:UserWordStatusStatsDto) -> Tuple[float,float]:
+        if stats_dto.total_word_count == 0:
+            return 0.0,0.0
         memorized_ratio = round((stats_dto.slain_word_count + stats_dto.slaining_word_count) / stats_dto.total_word_count, 4)
         slained_ratio = round(stats_dto.slain_word_count / stats_dto.total_word_count, 4)
         return memorized_ratio,slained_ratio
@@ -295,4 +306,6 @@ class UserWordService:
                     user_word.flags = list(existing_flags - flags_to_remove)
         
         # 保存到数据库
-        get_db_session().flush()
\ No newline at end of file
+        get_db_session().flush()
+        # 标签变化后重建背单词调度器
+        self.study_scheduler_service.invalidate(user_id,word_bank_id)
\ No newline at end of file
@@ -47,6 +47,7 @@ class AnswerResponse(BaseModel):
     is_slain: bool = Field(...,description="是否被斩杀")
     study_result: int = Field(...,description="本次答题结果：1-完全正确，0-有错误")
     award_list: List[IncentiveResultDto] = Field(default_factory=list,description="奖品列表")
+    incentive_ticket: Optional[str] = Field(default=None,description="激励票据，延迟计算激励时返回，凭票据查询激励结果")
 
 class JudgePhraseResponse(BaseModel):
     """
@@ -1,4 +1,4 @@
-from framework.util.word_util import mask_word
+from framework.util.word_util import get_word_masker
 from pydantic import BaseModel, Field, model_validator
 from typing import List, Optional
 
@@ -40,14 +40,17 @@ class WordInfoDto(BaseModel):
     unmask_word: str = Field(default="")
 
     def mask_word(self,is_for_battle:bool=False) -> None:
-        
-        self.example_sentences = mask_word(self.word, self.example_sentences)
-        
-        self.expansions = mask_word(self.word, self.expansions)
-        self.memory_techniques = mask_word(self.word, self.memory_techniques)
-        self.discrimination = mask_word(self.word, self.discrimination)
-        self.usage = mask_word(self.word, self.usage)
-        self.notes = mask_word(self.word, self.notes)
+        # 同一个单词只构建一次*化器，所有文本字段拼接后一次扫描完成*化
+        masker = get_word_masker(self.word)
+        text_fields = ['example_sentences', 'expansions', 'memory_techniques', 'discrimination', 'usage', 'notes']
+        texts = [getattr(self, field_name) for field_name in text_fields]
+        if not is_for_battle and self.phrases:
+            for phrase in self.phrases:
+                texts.extend([phrase.phrase, phrase.exp])
+        masked_texts = masker.mask_fields(texts)
+
+        for field_name, masked in zip(text_fields, masked_texts):
+            setattr(self, field_name, masked)
 
         if not is_for_battle:
             # 处理音标
@@ -60,9 +63,10 @@ class WordInfoDto(BaseModel):
                         setattr(self.inflection, field_name, value[0] + '*' * (len(value) - 1))
             # 处理短语
             if self.phrases:
-                for phrase in self.phrases:
-                    phrase.phrase = mask_word(self.word, phrase.phrase)
-                    phrase.exp = mask_word(self.word, phrase.exp)   
+                masked_phrases = masked_texts[len(text_fields):]
+                for i, phrase in enumerate(self.phrases):
+                    phrase.phrase = masked_phrases[2 * i]
+                    phrase.exp = masked_phrases[2 * i + 1]
                     
             # 单词本身的处理放到最后
             self.word = self.word[0] + '*' * (len(self.word) - 1)        
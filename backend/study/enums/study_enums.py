@@ -207,3 +207,33 @@ class UserFlagsOperateTypeEnum(Enum):
                 return enum_item
         raise ValueError(f"Invalid name: {name}")         
 
+    
+
+class WordMaskModeEnum(Enum):
+    """
+    单词卡片*化模式枚举类
+    """
+    NONE = (0,"不*化")  # 不做*化处理
+    BATTLE = (1,"战斗")  # 背单词时的*化，保留音标、变形和短语
+    FULL = (2,"完整")  # 完整*化，音标、变形、短语和单词本身都做*化处理
+    def __init__(self, code, name):
+        self._code_ = code
+        self._name_ = name
+
+    @property
+    def code(self):
+        return self._code_
+
+    @property
+    def name(self):
+        return self._name_
+    
+    @classmethod
+    def from_code(cls, code: int) -> 'WordMaskModeEnum':
+        """
+        根据code值获取枚举值
+        """
+        for enum_item in cls:
+            if enum_item.code == code:
+                return enum_item
+        raise ValueError(f"Invalid code: {code}")
@@ -8,6 +8,7 @@ from user.dto.user_dto import UserDto
 from framework.model.common import BaseResponse
 from framework.util.logger import setup_logger
 from framework.container.container import get_service
+from framework.concurrency.executor import run_sync
 from functools import partial
 from framework.util.auth import get_current_user
 from framework.router.router_decorator import router_controller
@@ -31,7 +32,7 @@ def user_controller(router: APIRouter):
     ):
         
         logger.info(f"获取用户信息: {current_user}")
-        user_dto = user_app_service.get_user_by_username(current_user["user_name"])
+        user_dto = await run_sync(user_app_service.get_user_by_username, current_user["user_name"])
              
         return BaseResponse(
                 code=0,
@@ -49,7 +50,7 @@ def user_controller(router: APIRouter):
         current_user: str = Depends(get_current_user),
         user_app_service: UserAppService = Depends(partial(get_service, UserAppService))
     ):
-        user_dto = user_app_service.get_user_by_id(current_user["user_id"])
+        user_dto = await run_sync(user_app_service.get_user_by_id, current_user["user_id"])
         return BaseResponse(
                 code=0,
                 message="获取用户信息成功",
@@ -68,7 +69,7 @@ def user_controller(router: APIRouter):
         user_app_service: UserAppService = Depends(partial(get_service, UserAppService))
     ):
         user_dto.id = current_user["user_id"]
-        user_app_service.update_user_info(user_dto)
+        await run_sync(user_app_service.update_user_info, user_dto)
         return BaseResponse(
                 code=0,
                 message="更新用户信息成功"
@@ -84,7 +85,7 @@ def user_controller(router: APIRouter):
         current_user: str = Depends(get_current_user),
         user_app_service: UserAppService = Depends(partial(get_service, UserAppService))
     ):
-        user_flags = user_app_service.get_user_custorm_flags(current_user["user_id"])
+        user_flags = await run_sync(user_app_service.get_user_custorm_flags, current_user["user_id"])
         return BaseResponse(
                 code=0,
                 message="获取用户自定义标签列表成功",
@@ -0,0 +1,298 @@
+"""
+词典图片导入流水线，将一批词典图片的处理拆分为多个阶段：
+1. 上传、解析：有界线程池并发执行，等待Dify期间不阻塞其他图片
+2. 写入：单个写入线程，多张图片的单词合并后批量保存，保存成功后移动图片到"已完成"目录
+
+解析结果保存在检查点文件中，进程在解析之后、写入之前崩溃时，重新执行会直接使用检查点中的解析结果，不再重新上传和解析
+每个阶段分别统计处理数、失败数、耗时和吞吐量，失败的图片留在原目录，不影响其他图片
+写入线程出现意外错误时通知解析线程停止，取消还未开始的图片并清空队列后再抛出，避免解析线程阻塞在已满的队列上
+"""
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from framework.util.logger import setup_logger
+from word.dto.word_init_dto import WordInitDto
+
+logger = setup_logger(__name__)
+
+# 每个阶段最多保留的错误明细条数
+MAX_STAGE_ERRORS = 50
+# 解析线程向队列放入结果时的等待间隔（秒），每次等待后检查是否已停止
+QUEUE_PUT_TIMEOUT_SECONDS = 0.5
+
+
+class StageStats:
+    """
+    流水线阶段统计
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.failed = 0
+        self.items = 0
+        self.busy_seconds = 0.0
+        self.errors: List[Dict[str, str]] = []
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, items: int = 0) -> None:
+        with self._lock:
+            self.count += 1
+            self.items += items
+            self.busy_seconds += seconds
+
+    def record_error(self, file_path: str, seconds: float, error: Exception) -> None:
+        with self._lock:
+            self.failed += 1
+            self.busy_seconds += seconds
+            if len(self.errors) < MAX_STAGE_ERRORS:
+                self.errors.append({"file": file_path, "error": f"{type(error).__name__}: {error}"})
+
+    def report(self, wall_seconds: float) -> Dict:
+        with self._lock:
+            return {
+                "count": self.count,
+                "failed": self.failed,
+                "items": self.items,
+                "busy_seconds": round(self.busy_seconds, 3),
+                "files_per_second": round(self.count / wall_seconds, 3) if wall_seconds > 0 else 0.0,
+                "items_per_second": round(self.items / wall_seconds, 3) if wall_seconds > 0 else 0.0,
+                "errors": list(self.errors)
+            }
+
+
+class IngestCheckpoint:
+    """
+    解析结果检查点，每张图片一个JSON文件，写入临时文件后再原子替换，避免崩溃时留下不完整的检查点
+    图片大小变化时（图片被替换）检查点失效
+    """
+
+    def __init__(self, checkpoint_dir: str):
+        self.checkpoint_dir = checkpoint_dir
+        os.makedirs(checkpoint_dir, exist_ok=True)
+
+    def load(self, file_path: str) -> Optional[List[WordInitDto]]:
+        path = self._path(file_path)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("file_path") != file_path or data.get("size") != os.path.getsize(file_path):
+                return None
+            return [WordInitDto.model_validate(item) for item in data.get("words", [])]
+        except Exception as e:
+            logger.warning(f"读取检查点失败，重新解析: {file_path}, 错误: {e}")
+            return None
+
+    def save(self, file_path: str, words: List[WordInitDto]) -> None:
+        path = self._path(file_path)
+        data = {
+            "file_path": file_path,
+            "size": os.path.getsize(file_path),
+            "words": [word.model_dump() for word in words]
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def remove(self, file_path: str) -> None:
+        try:
+            os.remove(self._path(file_path))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            # 检查点删除失败不影响已保存的单词，图片已移走，残留的检查点不会再被使用
+            logger.warning(f"删除检查点失败: {file_path}, 错误: {e}")
+
+    def _path(self, file_path: str) -> str:
+        name = hashlib.sha1(os.path.abspath(file_path).encode("utf-8")).hexdigest()
+        return os.path.join(self.checkpoint_dir, f"{name}.json")
+
+
+class WordIngestPipeline:
+    """
+    词典图片导入流水线
+
+    使用方式:
+    pipeline = WordIngestPipeline(upload, parse, save_words, complete_file, checkpoint, workers=4, write_batch_files=20)
+    report = pipeline.run(image_files)
+    """
+
+    def __init__(self,
+                 upload: Callable[[str], str],
+                 parse: Callable[[str, str], List[WordInitDto]],
+                 save_words: Callable[[List[WordInitDto]], Tuple[int, int]],
+                 complete_file: Callable[[str], str],
+                 checkpoint: IngestCheckpoint,
+                 workers: int = 4,
+                 write_batch_files: int = 20):
+        """
+        param upload: 上传图片，返回文件ID
+        param parse: 根据图片路径和文件ID解析图片，返回单词列表
+        param save_words: 在一个事务中保存单词，返回(新增单词数, 更新单词数)
+        param complete_file: 将处理完的图片移动到"已完成"目录
+        """
+        self.upload = upload
+        self.parse = parse
+        self.save_words = save_words
+        self.complete_file = complete_file
+        self.checkpoint = checkpoint
+        self.workers = max(1, workers)
+        self.write_batch_files = max(1, write_batch_files)
+        self.stages = {name: StageStats(name) for name in ("checkpoint", "upload", "parse", "write")}
+        self.inserted_count = 0
+        self.updated_count = 0
+
+    def run(self, image_files: List[str]) -> Dict:
+        """
+        处理一批图片，返回各阶段的统计报告
+        """
+        start = time.time()
+        # 有界队列：写入跟不上时解析线程等待，避免解析结果在内存中堆积
+        parsed: "queue.Queue[Tuple[str, Optional[List[WordInitDto]]]]" = queue.Queue(maxsize=self.workers * 2)
+        stop = threading.Event()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="word-ingest") as executor:
+            futures = [executor.submit(self._upload_and_parse, file_path, parsed, stop) for file_path in image_files]
+            try:
+                self._write(len(image_files), parsed)
+            except BaseException:
+                # 写入线程异常退出，通知解析线程停止并取消还未开始的图片，清空队列唤醒等待中的解析线程
+                stop.set()
+                for future in futures:
+                    future.cancel()
+                self._drain(parsed)
+                raise
+        wall_seconds = time.time() - start
+        report = {
+            "files": len(image_files),
+            "succeeded": self.stages["write"].count,
+            "inserted": self.inserted_count,
+            "updated": self.updated_count,
+            "wall_seconds": round(wall_seconds, 3),
+            "stages": {name: stats.report(wall_seconds) for name, stats in self.stages.items()}
+        }
+        logger.info(f"[性能] 词典图片导入完成: 文件数={len(image_files)}, 成功={report['succeeded']}, "
+                    f"新增单词={self.inserted_count}, 更新单词={self.updated_count}, 耗时: {wall_seconds:.3f}秒")
+        for name, stage_report in report["stages"].items():
+            logger.info(f"[性能] 词典图片导入阶段 {name}: " + ", ".join(f"{k}={v}" for k, v in stage_report.items() if k != "errors"))
+            for error in stage_report["errors"]:
+                logger.error(f"词典图片导入阶段 {name} 失败: {error['file']}, {error['error']}")
+        return report
+
+    def _upload_and_parse(self, file_path: str, parsed: queue.Queue, stop: threading.Event) -> None:
+        """
+        解析线程：优先使用检查点，否则上传并解析图片，解析结果写入检查点后交给写入线程
+        无论成功还是失败都向队列放入一条结果，失败时单词列表为None；已停止时不再处理
+        """
+        if stop.is_set():
+            return
+        words = None
+        try:
+            words = self._load_checkpoint(file_path)
+            if words is None:
+                file_id = self._run_stage("upload", file_path, lambda: self.upload(file_path))
+                if file_id is not None:
+                    words = self._run_stage("parse", file_path, lambda: self.parse(file_path, file_id), counted=len)
+                if words is not None:
+                    self.checkpoint.save(file_path, words)
+        except Exception as e:
+            # 检查点写入失败等意外错误，这张图片本次不写入
+            self.stages["checkpoint"].record_error(file_path, 0.0, e)
+            words = None
+        finally:
+            self._put(parsed, (file_path, words), stop)
+
+    def _put(self, parsed: queue.Queue, item: Tuple[str, Optional[List[WordInitDto]]], stop: threading.Event) -> None:
+        """
+        向队列放入解析结果，队列已满时等待，写入线程已停止时放弃
+        """
+        while not stop.is_set():
+            try:
+                parsed.put(item, timeout=QUEUE_PUT_TIMEOUT_SECONDS)
+                return
+            except queue.Full:
+                continue
+
+    def _drain(self, parsed: queue.Queue) -> None:
+        """清空队列"""
+        while True:
+            try:
+                parsed.get_nowait()
+            except queue.Empty:
+                return
+
+    def _load_checkpoint(self, file_path: str) -> Optional[List[WordInitDto]]:
+        start = time.time()
+        words = self.checkpoint.load(file_path)
+        if words is not None:
+            self.stages["checkpoint"].record(time.time() - start, len(words))
+            logger.info(f"使用检查点中的解析结果: {file_path}, 单词数: {len(words)}")
+        return words
+
+    def _run_stage(self, stage: str, file_path: str, action: Callable, counted: Callable = None):
+        """
+        执行一个阶段并记录统计，失败时返回None
+        """
+        start = time.time()
+        try:
+            result = action()
+            if result is None:
+                raise ValueError("返回结果为空")
+        except Exception as e:
+            self.stages[stage].record_error(file_path, time.time() - start, e)
+            return None
+        self.stages[stage].record(time.time() - start, counted(result) if counted else 0)
+        return result
+
+    def _write(self, total: int, parsed: queue.Queue) -> None:
+        """
+        写入线程（调用线程）：合并已解析的图片批量保存，队列暂时为空或攒够一批时立即写入
+        """
+        batch: List[Tuple[str, List[WordInitDto]]] = []
+        for received in range(1, total + 1):
+            file_path, words = parsed.get()
+            if words is not None:
+                batch.append((file_path, words))
+            if batch and (len(batch) >= self.write_batch_files or received == total or parsed.empty()):
+                self._flush(batch)
+                batch = []
+
+    def _flush(self, batch: List[Tuple[str, List[WordInitDto]]]) -> None:
+        """
+        在一个事务中保存一批图片的单词，失败时逐张图片重试，找出出错的图片
+        """
+        start = time.time()
+        try:
+            inserted_count, updated_count = self.save_words([word for _, words in batch for word in words])
+        except Exception as e:
+            if len(batch) == 1:
+                self.stages["write"].record_error(batch[0][0], time.time() - start, e)
+                return
+            logger.warning(f"批量保存单词失败，逐张图片重试: 图片数={len(batch)}, 错误: {e}")
+            for item in batch:
+                self._flush([item])
+            return
+        self.inserted_count += inserted_count
+        self.updated_count += updated_count
+        seconds = (time.time() - start) / len(batch)
+        for file_path, words in batch:
+            self._complete(file_path, words, seconds)
+
+    def _complete(self, file_path: str, words: List[WordInitDto], seconds: float) -> None:
+        start = time.time()
+        try:
+            target_path = self.complete_file(file_path)
+        except Exception as e:
+            # 单词已保存，下次重新处理时使用检查点重新保存（覆盖）即可
+            self.stages["write"].record_error(file_path, seconds + time.time() - start, e)
+            return
+        self.checkpoint.remove(file_path)
+        self.stages["write"].record(seconds + time.time() - start, len(words))
+        logger.info(f"文件  {file_path}  处理成功，已移动到 {target_path}")
@@ -5,13 +5,14 @@ import urllib.parse
 from framework.container.container_decorator import injectable
 from word.domain.service.word_service import WordService
 from framework.config.config import settings
-from word.dto.word_init_dto import StatisticResponse, WordInitDto
+from word.dto.word_init_dto import SaveWordsResponse, StatisticResponse, WordInitDto
 import os
-from framework.util.dify_utill import upload_file, run_workflow
+from framework.util.dify_client import get_dify_client
 from word.domain.entity.word import Word
 from framework.util.file_util import is_system_file
 from framework.util.logger import setup_logger
 from framework.util.file_util import move_file
+from word.application.word_ingest_pipeline import IngestCheckpoint, WordIngestPipeline
 
 logger = setup_logger(__name__)
 
@@ -59,10 +60,22 @@ class WordInitAppService:
         """
         将文件上传到dify，并返回解析结果
         """
+        return self.parse_uploaded_picture(file_path,self.upload_picture(file_path))
+
+    def upload_picture(self,file_path:str) -> str:
+        """
+        将文件上传到dify，返回文件ID
+        """
+        api_key = settings.DIFY_API_KEY.get("DIFY_API_KEY_FOR_PARSE_PICTURE")
+        return get_dify_client().upload_file(api_key,file_path)
+
+    def parse_uploaded_picture(self,file_path:str,file_id:str) -> List[WordInitDto]:
+        """
+        解析已上传到dify的文件，返回解析结果
+        """
         api_key = settings.DIFY_API_KEY.get("DIFY_API_KEY_FOR_PARSE_PICTURE")
         result = []
         word_type_flag = os.path.basename(os.path.dirname(file_path))
-        file_id = upload_file(api_key,file_path)
         if file_id:
             inputs = {
                "dictionay_picture": {
@@ -71,7 +84,7 @@ class WordInitAppService:
                     "type": "image"
                }
             }
-            word_desc = run_workflow(api_key,inputs,"word_desc")
+            word_desc = get_dify_client().run_workflow(api_key,inputs,"word_desc")
             word_list = json.loads(word_desc)
             for item in word_list:
                 # 添加默认标签
@@ -103,14 +116,27 @@ class WordInitAppService:
                 result.append(WordInitDto.model_validate(item))
         return result
         
-    def save_words(self,request:List[WordInitDto],file_path:str) -> str:
+    def save_words(self,request:List[WordInitDto],file_path:str) -> SaveWordsResponse:
         """
         初始化单词并移动文件
         """
         # 保存单词
-        words = [Word(**item.model_dump()) for item in request]
-        self.word_service.save_words(words)
-        
+        inserted_count, updated_count = self.save_word_list(request)
+        # 移动文件
+        target_path = self.complete_file(file_path)
+        return SaveWordsResponse(inserted_count=inserted_count, updated_count=updated_count, target_path=target_path)
+
+    def save_word_list(self,request:List[WordInitDto]) -> Tuple[int,int]:
+        """
+        在一个事务中批量保存单词
+        return: (新增单词数, 更新单词数)
+        """
+        return self.word_service.save_words([Word(**item.model_dump()) for item in request])
+
+    def complete_file(self,file_path:str) -> str:
+        """
+        将处理完的文件移动到"已完成"目录，返回目标路径
+        """
         # 构建目标路径
         target_dir = os.path.join(settings.DICTIONARY_PATH,"已完成",os.path.dirname(file_path).split("/")[-1])
         target_path = os.path.join(target_dir, os.path.basename(file_path))
@@ -120,39 +146,32 @@ class WordInitAppService:
         
         return target_path
     
-    def batch_process(self,size:int=10) -> str:
+    def batch_process(self,size:int=10) -> dict:
         """
-        批量处理
+        批量处理：并发上传、解析图片，单线程批量保存单词，返回各阶段的统计报告
+        已解析但未保存的图片保存有检查点，重新执行时不再重新上传和解析
         """
         # 获取要处理的文件
         image_files = []
-        count = 0
-        try:
-            should_break = False
-            for root, dirs, files in os.walk(settings.DICTIONARY_PATH):
-                if should_break:
-                    break
-                if "已完成" not in root:
-                    for file in files:  
-                       if file.lower().endswith(('.png', '.jpg', '.jpeg', '.gif')):
-                           file_path = os.path.join(root, file)
-                           image_files.append(file_path)
-                           count += 1
-                           if count >= size:
-                              should_break = True
-                              break
-            logger.info(f"词典初始化任务开始，本批待处理文件个数  {len(image_files)}  ===============================================")
-            succ_count = 0
-            for file in image_files:
-                wordInitDtos = self.parse_picture(file)
-                self.save_words(wordInitDtos,file)
-                logger.info(f"文件  {file}  处理成功  ===============================================")
-                succ_count += 1
-        except Exception as e:
-            logger.error(f"词典初始化任务处理失败: {str(e)} ===============================================")
-            raise e
-        finally:
-           logger.info(f"词典初始化任务结束，本批待处理文件个数{len(image_files)}，成功处理文件个数 {succ_count} ===============================================")
-           statistic = self.query_statistic()
-           logger.info(f"词典初始化任务处理进度 {statistic.model_dump()} ===============================================")
-                        
+        for root, dirs, files in os.walk(settings.DICTIONARY_PATH):
+            if "已完成" not in root:
+                for file in files:  
+                   if file.lower().endswith(('.png', '.jpg', '.jpeg', '.gif')):
+                       image_files.append(os.path.join(root, file))
+                       if len(image_files) >= size:
+                          break
+            if len(image_files) >= size:
+                break
+        logger.info(f"词典初始化任务开始，本批待处理文件个数  {len(image_files)}  ===============================================")
+        pipeline = WordIngestPipeline(upload=self.upload_picture,
+                                      parse=self.parse_uploaded_picture,
+                                      save_words=self.save_word_list,
+                                      complete_file=self.complete_file,
+                                      checkpoint=IngestCheckpoint(settings.WORD_INIT_CHECKPOINT_DIR),
+                                      workers=settings.WORD_INIT_PARSE_WORKERS,
+                                      write_batch_files=settings.WORD_INIT_WRITE_BATCH_FILES)
+        report = pipeline.run(image_files)
+        logger.info(f"词典初始化任务结束，本批待处理文件个数{len(image_files)}，成功处理文件个数 {report['succeeded']} ===============================================")
+        statistic = self.query_statistic()
+        logger.info(f"词典初始化任务处理进度 {statistic.model_dump()} ===============================================")
+        return report
@@ -9,6 +9,7 @@ from word.dto.word_dto import  WordBankDto
 from framework.model.common import BaseResponse
 from framework.util.logger import setup_logger
 from framework.container.container import get_service
+from framework.concurrency.executor import run_sync
 from functools import partial
 from framework.router.router_decorator import router_controller
 
@@ -31,7 +32,7 @@ def word_controller(router: APIRouter):
         return BaseResponse(
                 code=0,
                 message="获取词库列表成功",
-                data=word_app_service.query_word_bank_list()
+                data=await run_sync(word_app_service.query_word_bank_list)
         )
     
     return router
@@ -6,8 +6,9 @@ from typing import List
 import urllib.parse
 from fastapi import APIRouter, Body, Header, Query, Response, Depends
 from framework.container.container import get_service
+from framework.concurrency.executor import run_sync
 from word.application.word_init_app_service import WordInitAppService
-from word.dto.word_init_dto import StatisticResponse, WordInitDto
+from word.dto.word_init_dto import SaveWordsResponse, StatisticResponse, WordInitDto
 from framework.model.common import BaseResponse
 from framework.util.logger import setup_logger
 from framework.router.router_decorator import router_controller
@@ -32,7 +33,7 @@ def word_init_controller(router: APIRouter):
         return BaseResponse(
             code=0,
             message="获取词典初始化统计信息成功",
-            data=word_init_app_service.query_statistic()
+            data=await run_sync(word_init_app_service.query_statistic)
         )
     
     @router.get(
@@ -43,7 +44,7 @@ def word_init_controller(router: APIRouter):
     async def load_picture(
         word_init_app_service: WordInitAppService = Depends(partial(get_service, WordInitAppService))
     ):
-        image_content, file_path = word_init_app_service.load_picture()
+        image_content, file_path = await run_sync(word_init_app_service.load_picture)
         
         # 根据文件扩展名确定媒体类型
         media_type = "image/jpeg"  # 默认值
@@ -74,12 +75,12 @@ def word_init_controller(router: APIRouter):
         return BaseResponse(
             code=0,
             message="解析图片成功",
-            data=word_init_app_service.parse_picture(urllib.parse.unquote(file_path))
+            data=await run_sync(word_init_app_service.parse_picture, urllib.parse.unquote(file_path))
         )
     
     @router.post(
         "/save_words",
-        response_model=BaseResponse,
+        response_model=BaseResponse[SaveWordsResponse],
         summary="保存单词列表",
         description="保存单词列表"
     )
@@ -88,10 +89,10 @@ def word_init_controller(router: APIRouter):
         file_path: str = Header(..., description="文件路径", alias="file-path"),
         word_init_app_service: WordInitAppService = Depends(partial(get_service, WordInitAppService))
     ):    
-        word_init_app_service.save_words(request, urllib.parse.unquote(file_path))
         return BaseResponse(
             code=0,
-            message="保存单词列表成功"
+            message="保存单词列表成功",
+            data=await run_sync(word_init_app_service.save_words, request, urllib.parse.unquote(file_path))
         )
     
     @router.get(
@@ -107,7 +108,7 @@ def word_init_controller(router: APIRouter):
         return BaseResponse(
             code=0,
             message="解析图片成功",
-            data=word_init_app_service.batch_process(size)
+            data=await run_sync(word_init_app_service.batch_process, size)
         )
         
     return router
@@ -1,12 +1,27 @@
-from typing import List
-from sqlalchemy import String, and_, or_
+import time
+from collections import defaultdict
+from typing import List, Tuple
+from sqlalchemy import String, and_, event, literal_column, or_
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.sql import func
 
 from framework.container.container_decorator import injectable
 from framework.database.db_decorator import readonly, transactional
 from framework.database.db_factory import get_db_session
+from framework.events.event_bus import get_event_bus
+from framework.util.logger import setup_logger
 from word.domain.entity.word import Word
 
+logger = setup_logger(__name__)
+
+# 批量保存单词时每条语句的单词数（每个单词15个参数，需小于PostgreSQL单条语句的参数上限65535）
+SAVE_CHUNK_SIZE = 1000
+# 单词已存在时更新的字段
+UPDATE_FIELDS = ('phonetic_symbol', 'inflection', 'explanation', 'example_sentences', 'phrases', 'expansions',
+                 'memory_techniques', 'discrimination', 'usage', 'notes', 'flags', 'page')
+# 新增单词时插入的字段
+INSERT_FIELDS = ('word_bank_id', 'word') + UPDATE_FIELDS
+
 @injectable
 class WordService:
     """
@@ -14,36 +29,48 @@ class WordService:
     """
 
     @transactional
-    def save_words(self,words:List[Word]):
+    def save_words(self,words:List[Word]) -> Tuple[int,int]:
+        """
+        批量保存单词：INSERT ... ON CONFLICT (word_bank_id, word) DO UPDATE，已存在的单词更新，不存在的新增
+        每SAVE_CHUNK_SIZE个单词一条语句，同一批中重复的单词以最后一个为准
+        return: (新增单词数, 更新单词数)
+        """
+        start = time.time()
         db_session = get_db_session()
+        unique_words = {}
         for word in words:
-            # 提取公共的过滤条件
-            filter_conditions = [
-                Word.word == word.word,
-                Word.word_bank_id == word.word_bank_id
-            ]
-            # 查询是否存在相同word的记录
-            existing_word = db_session.query(Word).filter(*filter_conditions).first()
-            if existing_word:
-                # 如果存在，更新需要更新的字段
-                update_data = {
-                    'phonetic_symbol': word.phonetic_symbol,
-                    'inflection': word.inflection,
-                    'explanation': word.explanation,
-                    'example_sentences': word.example_sentences,
-                    'phrases': word.phrases,
-                    'expansions': word.expansions,
-                    'memory_techniques': word.memory_techniques,
-                    'discrimination': word.discrimination,
-                    'usage': word.usage,
-                    'notes': word.notes,
-                    'flags': word.flags,
-                    'page': word.page
-                }
-                db_session.query(Word).filter(*filter_conditions).update(update_data)
-            else:
-                # 如果不存在，直接添加新记录
-                db_session.add(word)
+            unique_words.pop((word.word_bank_id, word.word), None)
+            unique_words[(word.word_bank_id, word.word)] = word
+        rows = [{column: getattr(word, column) for column in INSERT_FIELDS} for word in unique_words.values()]
+
+        inserted_count = 0
+        for i in range(0, len(rows), SAVE_CHUNK_SIZE):
+            statement = insert(Word).values(rows[i:i + SAVE_CHUNK_SIZE])
+            statement = statement.on_conflict_do_update(
+                index_elements=[Word.word_bank_id, Word.word],
+                set_={column: statement.excluded[column] for column in UPDATE_FIELDS}
+            ).returning(literal_column("xmax = 0").label("inserted"))
+            # xmax为0表示本条语句新插入的行，否则为冲突后更新的行
+            inserted_count += sum(1 for inserted in db_session.execute(statement).scalars() if inserted)
+        updated_count = len(rows) - inserted_count
+        self._notify_words_saved_after_commit(db_session, words)
+        logger.info(f"[性能] 批量保存单词: 单词数={len(rows)}, 新增={inserted_count}, 更新={updated_count}, "
+                    f"耗时: {time.time() - start:.3f}秒")
+        return inserted_count, updated_count
+
+    def _notify_words_saved_after_commit(self, db_session, words:List[Word]):
+        """
+        事务提交后触发单词保存事件，避免在提交前失效缓存又被并发请求用旧数据重新填充
+        """
+        bank_words = defaultdict(list)
+        for word in words:
+            bank_words[word.word_bank_id].append(word.word)
+
+        def on_after_commit(session):
+            for word_bank_id, word_list in bank_words.items():
+                get_event_bus().trigger_words_saved(word_bank_id, word_list)
+
+        event.listen(db_session, "after_commit", on_after_commit, once=True)
     
     @readonly            
     def query_word_list(self,word_bank_id:int) -> List[Word]:
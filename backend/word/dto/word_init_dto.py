@@ -9,6 +9,14 @@ class StatisticResponse(BaseModel):
     completed_files: int = Field(..., description="已完成文件数")
     completion_percentage: str = Field(..., description="完成百分比")
 
+class SaveWordsResponse(BaseModel):
+    """
+    保存单词列表响应数据传输对象
+    """
+    inserted_count: int = Field(..., description="新增单词数")
+    updated_count: int = Field(..., description="更新单词数")
+    target_path: str = Field(..., description="文件移动后的路径")
+
 class WordInitDto(BaseModel):        
     """
     词典初始化请求数据传输对象
@@ -6,6 +6,7 @@ import { SoundOutlined, CheckCircleFilled, CloseCircleFilled, LoadingOutlined, T
 import styles from './index.module.css';
 import { WordTaskInfo, AnswerInfo, SubmitAnswerParams, AwardItem } from '@/types';
 import { studyApi } from '@/services/study';
+import { incentiveApi, IncentiveTicketResult } from '@/services/incentive';
 import { getWordDetail } from '@/services/word';
 import RewardModal from '../RewardModal';
 import ResultAnimation from '../ResultAnimation';
@@ -26,6 +27,10 @@ interface BusinessAreaProps {
 
 const { Title } = Typography;
 
+// 延迟激励：每次查询激励结果的最长等待时间（秒）、最长查询时间（毫秒）
+const INCENTIVE_POLL_WAIT_SECONDS = 3;
+const INCENTIVE_POLL_TIMEOUT_MS = 30000;
+
 const BusinessArea: React.FC<BusinessAreaProps> = ({
   taskInfo,
   onNext,
@@ -78,6 +83,56 @@ const BusinessArea: React.FC<BusinessAreaProps> = ({
   // 新增：音效相关ref
   const correctAudioRef = useRef<HTMLAudioElement>(null);
 
+  // 延迟激励：正在查询的激励票据，合并计算时多张票据指向同一张票据，只查询并显示一次
+  const polledTicketsRef = useRef<Set<string>>(new Set());
+  const unmountedRef = useRef(false);
+  useEffect(() => {
+    unmountedRef.current = false;
+    return () => {
+      unmountedRef.current = true;
+    };
+  }, []);
+
+  // 后台查询延迟计算的激励结果，获得奖品时显示奖品弹窗，不阻塞答题结果的显示
+  const pollIncentiveResult = useCallback(async (ticket: string) => {
+    const deadline = Date.now() + INCENTIVE_POLL_TIMEOUT_MS;
+    let current = ticket;
+    if (polledTicketsRef.current.has(current)) return;
+    polledTicketsRef.current.add(current);
+    try {
+      while (!unmountedRef.current && Date.now() < deadline) {
+        let incentiveResult: IncentiveTicketResult;
+        try {
+          const response = await incentiveApi.getIncentiveResult(current, INCENTIVE_POLL_WAIT_SECONDS);
+          incentiveResult = response.data.data;
+        } catch (error) {
+          console.error('查询激励结果失败:', error);
+          await new Promise(resolve => setTimeout(resolve, 1000));
+          continue;
+        }
+        if (incentiveResult.status === 'pending') {
+          continue;
+        }
+        if (incentiveResult.merged_into) {
+          // 与后续答题合并计算，奖品在后续答题的票据中返回；该票据已在查询时不再重复查询
+          if (polledTicketsRef.current.has(incentiveResult.merged_into)) return;
+          polledTicketsRef.current.delete(current);
+          current = incentiveResult.merged_into;
+          polledTicketsRef.current.add(current);
+          continue;
+        }
+        if (!unmountedRef.current && incentiveResult.award_list && incentiveResult.award_list.length > 0) {
+          setAwards(incentiveResult.award_list);
+          pendingAwardsRef.current = incentiveResult.award_list;
+          setShowRewardModal(true);
+        }
+        return;
+      }
+    } finally {
+      polledTicketsRef.current.delete(current);
+    }
+  }, []);
+
   // 新增：监听taskInfo变化，重置所有状态
   useEffect(() => {
     // 防护检查：如果正在翻页中，不重置状态
@@ -357,6 +412,11 @@ const BusinessArea: React.FC<BusinessAreaProps> = ({
       };
       const response = await studyApi.submitAnswerInfo(submitData);
       const result = response.data.data;
+
+      // 后端延迟计算激励时，先显示答题结果，再在后台凭激励票据查询奖品
+      if (result.incentive_ticket && !(result.award_list && result.award_list.length > 0)) {
+        pollIncentiveResult(result.incentive_ticket);
+      }
       
       // 新增：处理奖品信息
       if (result.award_list && result.award_list.length > 0) {
@@ -397,7 +457,7 @@ const BusinessArea: React.FC<BusinessAreaProps> = ({
     } catch (error) {
       console.error('提交答题信息失败:', error);
     }
-  }, [taskInfo, answerInfo, hasSubmittedAllCorrect, onWordSlain]);
+  }, [taskInfo, answerInfo, hasSubmittedAllCorrect, onWordSlain, pollIncentiveResult]);
 
   // 新增：处理奖品弹窗关闭
   const handleRewardModalClose = () => {
@@ -43,6 +43,14 @@ export interface UserWordBankProfile {
   image_path: string;
 }
 
+// 延迟激励结果接口
+export interface IncentiveTicketResult {
+  ticket: string;
+  status: 'pending' | 'done' | 'failed'; // pending 计算中；done 已完成；failed 计算失败
+  award_list: AwardItem[];
+  merged_into?: string; // 与后续答题合并计算时，奖品在该票据的结果中返回
+}
+
 // incentive API
 export const incentiveApi = {
   // 获取用户词库奖品信息
@@ -52,5 +60,9 @@ export const incentiveApi = {
   // 获取用户词库个人Profile信息
   getUserWordBankProfile: () => {
     return request.get<BaseResponse<UserWordBankProfile>>('/incentive/get_user_word_bank_profile');
+  },
+  // 凭激励票据查询延迟计算的激励结果，wait为最长等待时间（秒）
+  getIncentiveResult: (ticket: string, wait = 3) => {
+    return request.get<BaseResponse<IncentiveTicketResult>>('/incentive/get_incentive_result', { params: { ticket, wait } });
   }
 }; 
\ No newline at end of file
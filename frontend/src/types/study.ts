@@ -102,6 +102,8 @@ export interface SubmitAnswerResponse {
   is_slain: boolean;
   /** 奖品列表 */
   award_list?: AwardItem[];
+  /** 激励票据，后端延迟计算激励时返回，凭票据查询奖品 */
+  incentive_ticket?: string;
 }
 
 /**